@@ -0,0 +1,107 @@
+# /analysis/analysis_frame.py
+
+# ==============================================================================
+#  数据分析模块 - 共享的内存分析数据集
+# ==============================================================================
+#
+#  说明:
+#  分析函数 f1..f18 原先各自向数据库发送查询，其中 f3、f11、f14、f15、f17
+#  还会对每个职位分类视图分别查询一次，每次都把结果转换为新的元组列表和 DataFrame。
+#  此模块在一次分析运行开始时把清洗后的 `qcwy` 数据和职位分类各读取一次，
+#  转换为带类型的 DataFrame，所有分析函数都基于这份数据做向量化计算。
+#
+#  核心功能:
+#  1. `AnalysisFrame.load(cursor)` 读取数据时直接在数据库中按分析用到的列
+#     `GROUP BY`，每种取值组合只返回一行，并以 `COUNT(*)` 作为权重列 `number`。
+#     分析函数使用带权重的分组求和与加权平均，结果与逐行计算相同，
+#     而传输和转换的行数只取决于取值组合的数量，而不是职位的数量。
+#     - 低基数的文本列 (城市、学历、行业、经验原文) 编码为 category 类型，
+#       节省内存并加快分组；
+#     - 工作经验额外转换为数值列 `experience_years`，无法转换的为 NaN。
+#  2. `category(name)` 返回某个分类（即原来同名视图）中的职位。
+#  3. `by_category(names)` 返回若干分类的职位，附带 `category` 列，
+#     便于一次 groupby 得到每个分类的统计值，代替逐个视图查询。
+#  4. `titles(name)` 返回某个分类中每种职位标题及其数量。
+#
+# ==============================================================================
+
+import pandas as pd
+
+# 分析用到的职位属性列（不含标题），数据按这些列的取值组合聚合
+PROFILE_COLUMNS = ['place', 'education', 'experience', 'industry', 'ave_pay']
+CATEGORICAL_COLUMNS = ['place', 'education', 'experience', 'industry']
+# 需要按标题统计的分类
+TITLE_CATEGORIES = ['新兴职业']
+
+
+def _typed(df):
+    """
+    转换列类型: 薪资转为数值，经验额外转为数值年数，低基数文本列编码为 category。
+    """
+    df['number'] = df['number'].astype(int)
+    if 'ave_pay' in df:
+        df['ave_pay'] = pd.to_numeric(df['ave_pay'], errors='coerce')
+    if 'experience' in df:
+        df['experience_years'] = pd.to_numeric(df['experience'], errors='coerce')
+    for column in CATEGORICAL_COLUMNS + ['category']:
+        if column in df:
+            df[column] = df[column].astype('category')
+    return df
+
+
+class AnalysisFrame(object):
+    """
+    一次分析运行共享的数据集。每一行是一种取值组合，`number` 列为该组合的职位数。
+
+    Args:
+        jobs (pd.DataFrame): 全部职位。
+        members (pd.DataFrame): 各分类中的职位，额外包含 category 列。
+        titles (pd.DataFrame): TITLE_CATEGORIES 中各分类的职位标题，包含 category、title 和 number 列。
+    """
+
+    def __init__(self, jobs, members, titles):
+        self.jobs = jobs
+        self.members = members
+        self._titles = titles
+
+    @classmethod
+    def load(cls, cursor):
+        """
+        从数据库读取聚合后的职位数据、分类数据和标题数据，各执行一次查询。
+        """
+        columns = ', '.join(PROFILE_COLUMNS)
+        cursor.execute(f"SELECT {columns}, COUNT(*) FROM qcwy GROUP BY {columns}")
+        jobs = pd.DataFrame(list(cursor.fetchall()), columns=PROFILE_COLUMNS + ['number'])
+
+        q_columns = ', '.join(f"q.{c}" for c in PROFILE_COLUMNS)
+        cursor.execute(f"SELECT c.category, {q_columns}, COUNT(*) FROM job_category c "
+                       f"JOIN qcwy q ON q.id = c.job_id GROUP BY c.category, {q_columns}")
+        members = pd.DataFrame(list(cursor.fetchall()), columns=['category'] + PROFILE_COLUMNS + ['number'])
+
+        cursor.execute(f"SELECT c.category, q.title, COUNT(*) FROM job_category c "
+                       f"JOIN qcwy q ON q.id = c.job_id WHERE c.category IN "
+                       f"({', '.join(['%s'] * len(TITLE_CATEGORIES))}) GROUP BY c.category, q.title",
+                       TITLE_CATEGORIES)
+        titles = pd.DataFrame(list(cursor.fetchall()), columns=['category', 'title', 'number'])
+        return cls(_typed(jobs), _typed(members), _typed(titles))
+
+    def category(self, name):
+        """
+        返回属于某个分类的职位，与查询同名视图的结果相同。
+        """
+        return self.members[self.members['category'] == name]
+
+    def by_category(self, names):
+        """
+        返回属于给定分类的职位，`category` 列为分类名称。
+        """
+        result = self.members[self.members['category'].isin(names)].copy()
+        # 只保留给定的分类，分组时不会出现其他分类的空组
+        result['category'] = result['category'].astype(str)
+        return result
+
+    def titles(self, name):
+        """
+        返回某个分类中的每种职位标题及其数量。分类必须在 TITLE_CATEGORIES 中。
+        """
+        return self._titles[self._titles['category'] == name]
@@ -1,6 +1,5 @@
 # /analysis/analysis_main.py
 
-import configparser
 import os
 import pymysql
 import sys
@@ -23,8 +22,14 @@ class Analyze:
     # 用于存储所有可用的数据视图名称，可能用于数据清洗或校验。
     available_views = []
 
-    # --- 共享配置 ---
-    conf = configparser.ConfigParser()
+    # --- 增量导入状态 ---
+    # 由 input_data 读取水位后设置：最新的导入批次，以及预处理步骤已处理到的批次。
+    ingest_batch = 0
+    processed_batch = 0
+    # 预处理步骤写入的职位表和分类成员表。通常就是正式表；全量重建时为新表，
+    # 预处理完成后由 input_data.publish_build 一起替换正式表。
+    job_table = 'qcwy'
+    category_table = 'job_category'
 
     # --- 数据库配置 ---
     # 注意: 在生产环境中，建议将用户名和密码移至更安全的位置，如环境变量或加密的配置文件。
@@ -33,7 +38,8 @@ class Analyze:
 
     # 在类加载时尝试建立全局数据库连接。
     try:
-        db = pymysql.connect(host="localhost", user=user, password=password, charset="utf8")
+        # local_infile 允许 input_data 在数据库不在本机时使用 LOAD DATA LOCAL INFILE 导入
+        db = pymysql.connect(host="localhost", user=user, password=password, charset="utf8", local_infile=True)
         cursor = db.cursor()
         cursor.execute('USE `ujn_a`;')
     except pymysql.Error as e:
@@ -49,7 +55,8 @@ class Analyze:
     def main(cls):
         """
         数据分析流程的主入口。
-        按顺序执行数据导入、数据处理和数据分析三个核心步骤。
+        按顺序执行数据导入、数据处理和数据分析三个核心步骤，然后预渲染全部图表，
+        最后原子地发布新的分析结果快照。发布之前，服务器始终读取完整的旧快照。
         """
         # --- 动态导入子模块 ---
         # 【设计说明】将 import 语句置于方法内部是一种特殊设计，通常用于以下目的：
@@ -64,6 +71,8 @@ class Analyze:
         import input_data
         import process_data
         import analyze_data
+        import create_chart
+        from result_store import ResultStore
 
         # 安全检查：如果数据库未连接，则终止后续所有操作。
         if not cls.db:
@@ -77,10 +86,23 @@ class Analyze:
         # --- 步骤 2: 数据预处理 ---
         print("开始执行 process_data...")
         process_data.main()
+        # 全量重建时，清洗、分类完成的新表在此一起替换正式表
+        input_data.publish_build()
+        # 预处理成功后记录已处理的批次，下次只处理新导入的数据
+        input_data.mark_processed()
 
         # --- 步骤 3: 数据分析与计算 ---
         print("开始执行 analyze_data...")
-        analyze_data.main()
+        generation = analyze_data.main()
+
+        # --- 步骤 4: 预渲染新快照的全部图表 ---
+        print("开始预渲染图表...")
+        count = create_chart.prerender(generation)
+        print(f"图表预渲染完成，共 {count} 个。")
+
+        # --- 步骤 5: 发布新快照 ---
+        ResultStore().publish(generation)
+        print(f"已发布分析结果快照 {generation}。")
 
 
 # --- 模块测试入口 ---
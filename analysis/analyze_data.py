@@ -6,445 +6,538 @@
 #
 #  说明:
 #  此模块是数据分析流程的最后一步。它负责查询经过预处理的数据库，
-#  执行各种统计和聚合计算，并将最终用于生成图表的数据写入 `conf.ini` 文件。
+#  执行各种统计和聚合计算，并将最终用于生成图表的数据写入分析结果存储 (`result_store`)。
 #
 #  核心功能:
 #  1. 使用装饰器 `@ways` 自动注册所有分析函数。
-#  2. `main` 函数作为调度器，按顺序执行所有已注册的分析函数。
+#  2. `main` 函数作为调度器执行所有已注册的分析函数。函数可以通过 `@ways(depends=...)`
+#     声明依赖的其他函数的产出；互不依赖的函数并行执行，被依赖的函数只执行一次。
+#     pandas 分组和纯 Python 循环大多持有 GIL，多个线程不能同时计算，因此以
+#     `@ways(cpu_bound=True)` 标记的函数在进程池中执行：每个进程启动时接收一份
+#     共享的数据集，执行函数后把写入的结果项送回主进程。其余的轻量函数仍在线程中执行。
 #  3. 每个 `fX` 函数对应一个独立的分析任务，通常为一个图表准备数据。
 #  4. 大量使用 Pandas 和 NumPy 库进行高效的数据处理和计算。
-#  5. 最终产出是更新后的 `conf.ini` 文件，其中的 `[chart]` 部分包含了
-#     所有图表所需的数据。
+#     分析开始时把职位数据和分类成员表一次性读入共享的 `AnalysisFrame`，
+#     各分析函数都基于它做向量化的分组计算，不再各自查询数据库。
+#     数据在数据库中按取值组合聚合，每行附带职位数量 `number`，计数和平均值均按权重计算。
+#  5. 各分析函数把结果以 Python 原生类型存入 `results` 字典（键如 'chart.3.1'），
+#     全部完成后写入结果存储的一代新快照 `data/results/<代号>/<编号>.json`，
+#     服务器读取时不再需要 eval。新快照由 `Analyze.main` 在预渲染图表后发布。
 #
 # ==============================================================================
 
 import analysis_main as A  # 导入中心枢纽以访问共享资源
-import numpy as np
-import pandas as pd
-import pyecharts
+import multiprocessing
+import os
 import re
+import threading
 import traceback  # 仅在异常处理时导入，以减少不必要的加载
+from analysis_frame import AnalysisFrame
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from process_data import TITLE_MATCHER
+from quantile import QuantileAggregator
+from result_store import ResultStore
 
 
-def ways(func):
+# 并行执行分析函数的最大线程数
+MAX_WORKERS = 4
+# 执行 CPU 密集分析函数的进程数；不超过 1（例如单核机器）时这些函数也在线程中执行
+PROCESS_WORKERS = min(MAX_WORKERS, os.cpu_count() or 1)
+# 多个线程同时输出时，避免不同函数的输出交错在同一行
+_print_lock = threading.Lock()
+
+
+def ways(func=None, depends=(), outputs=None, cpu_bound=False):
     """
     装饰器：将分析函数注册到 `Analyze` 类的 `analyze_fn_list` 中。
     这使得 `main` 函数可以自动发现并执行所有被此装饰器标记的函数。
+
+    可以直接写作 `@ways`，也可以声明依赖和产出，例如 `@ways(depends=['chart.15'])`:
+        depends: 该函数需要读取的其他函数的产出，产出它们的函数会先执行且只执行一次。
+        outputs: 该函数写入的图表编号前缀，默认由函数名推出 (f15 -> 'chart.15')。
+        cpu_bound: 该函数的计算量较大且持有 GIL，在进程池中执行。
+            函数只能通过全局的 `frame` 和 `results` 读取数据、写入结果。
     """
-    A.Analyze.analyze_fn_list.append(func)
+    def register(fn):
+        fn.depends = tuple(depends)
+        fn.cpu_bound = cpu_bound
+        fn.outputs = tuple(outputs) if outputs is not None else (f"chart.{fn.__name__[1:]}",)
+        A.Analyze.analyze_fn_list.append(fn)
+        return fn
 
-    def wrapper(*args, **kw):
-        return func(*args, **kw)
-    return wrapper
+    if func is not None:
+        return register(func)
+    return register
+
+
+def _init_worker(shared_frame, views):
+    """
+    进程池中每个进程启动时执行一次：接收共享的数据集和可用的分类列表。
+    """
+    global frame, results
+    frame = shared_frame
+    A.Analyze.available_views = views
+    results = {}
+
+
+def _run_in_worker(name, inputs):
+    """
+    在进程池中执行一个分析函数，返回它写入的结果项。
+
+    Args:
+        name (str): 分析函数名。
+        inputs (dict): 它所依赖的其他函数的结果项。
+    """
+    results.clear()
+    results.update(inputs)
+    globals()[name]()
+    return {key: value for key, value in results.items() if key not in inputs}
+
+
+def _run_one(fn, pool=None):
+    """
+    执行单个分析函数，捕获异常以免影响其他函数。返回是否成功。
+    给定进程池且函数标记为 cpu_bound 时，在进程池中执行并把结果合并回 `results`，
+    调度线程在等待期间不占用 GIL。
+    """
+    try:
+        if pool is not None and fn.cpu_bound:
+            inputs = {key: value for key, value in results.items() if key.rsplit('.', 1)[0] in fn.depends}
+            results.update(pool.apply(_run_in_worker, (fn.__name__, inputs)))
+        else:
+            fn()
+        with _print_lock:
+            print(f"  -> {fn.__name__} 完成")
+        return True
+    except Exception as e:
+        # 捕获单个分析函数的异常，防止整个流程中断
+        with _print_lock:
+            print(f"  -> !!! 分析函数 {fn.__name__} 执行出错: {e}")
+            traceback.print_exc()
+        return False
+
+
+def run_scheduled(functions, max_workers=MAX_WORKERS, processes=PROCESS_WORKERS):
+    """
+    按声明的依赖关系并行执行分析函数。
+    依赖都已成功完成的函数会立即提交到线程池，互不依赖的函数同时运行，
+    其中 cpu_bound 的函数由线程转交给进程池，真正在多个 CPU 核心上同时计算，
+    总耗时接近依赖链上最长的一条，而不是所有函数耗时之和。
+    依赖失败或无法满足的函数会被跳过。
+
+    Returns:
+        dict: 函数名 -> 是否成功。
+    """
+    producers = {output: fn for fn in functions for output in fn.outputs}
+    requires = {}
+    for fn in functions:
+        missing = [d for d in fn.depends if d not in producers]
+        if missing:
+            print(f"  -> !!! 分析函数 {fn.__name__} 的依赖 {missing} 没有对应的函数，已跳过。")
+        requires[fn] = None if missing else {producers[d] for d in fn.depends}
+
+    results = {}
+    pending = [fn for fn in functions if requires[fn] is not None]
+    for fn in functions:
+        if requires[fn] is None:
+            results[fn.__name__] = False
+    running = {}
+    pool = None
+    if processes > 1 and any(fn.cpu_bound for fn in pending):
+        pool = multiprocessing.Pool(processes, _init_worker, (frame, list(A.Analyze.available_views)))
+    try:
+        _schedule(pending, requires, results, running, max_workers, pool)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return results
+
+
+def _schedule(pending, requires, results, running, max_workers, pool):
+    """
+    `run_scheduled` 的调度循环：提交依赖已满足的函数，等待任意一个完成后继续。
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for fn in list(pending):
+                if any(results.get(dep.__name__) is False for dep in requires[fn]):
+                    print(f"  -> !!! 分析函数 {fn.__name__} 的依赖执行失败，已跳过。")
+                    results[fn.__name__] = False
+                    pending.remove(fn)
+                elif all(results.get(dep.__name__) for dep in requires[fn]):
+                    running[executor.submit(_run_one, fn, pool)] = fn
+                    pending.remove(fn)
+            if not running:
+                # 剩余的函数之间存在循环依赖
+                for fn in pending:
+                    print(f"  -> !!! 分析函数 {fn.__name__} 存在循环依赖，已跳过。")
+                    results[fn.__name__] = False
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future).__name__] = future.result()
 
 
 def main():
     """
     数据分析流程的主入口函数。
     负责初始化环境、调度并执行所有注册的分析函数。
+
+    Returns:
+        str: 写入结果的新快照代号（尚未发布）。
     """
-    global cursor, db, conf
-    # 从共享上下文中获取数据库连接和配置对象
+    global cursor, db, results, frame
+    # 从共享上下文中获取数据库连接
     cursor = A.Analyze.cursor
     db = A.Analyze.db
-    conf = A.Analyze.conf
+    # 一次性读取所有分析函数共用的数据集
+    frame = AnalysisFrame.load(cursor)
 
-    # 在每次运行时，清空旧的图表配置，确保生成全新的配置
-    if conf.has_section('chart'):
-        conf.remove_section('chart')
-    conf.add_section('chart')
+    # 每次运行都生成全新的结果
+    results = {}
 
     print("开始执行分析...")
-    # 遍历并执行所有通过 @ways 装饰器注册的分析函数
-    for fn in A.Analyze.analyze_fn_list:
-        try:
-            fn()
-            print(f"  -> {fn.__name__} 完成")
-        except Exception as e:
-            # 捕获单个分析函数的异常，防止整个流程中断
-            print(f"  -> !!! 分析函数 {fn.__name__} 执行出错: {e}")
-            traceback.print_exc()
+    # 按依赖关系并行执行所有通过 @ways 装饰器注册的分析函数。
+    # 分析函数只读取共享的数据集，并各自写入不同的结果项。
+    run_scheduled(A.Analyze.analyze_fn_list)
 
-    # 将所有分析结果写入配置文件
-    with open('conf.ini', 'w', encoding='utf-8') as configfile:
-        conf.write(configfile)
-    print("分析完成！")
+    # 将所有分析结果写入一代新的快照，发布之前服务器仍然读取旧的快照
+    generation = ResultStore().create(results)
+    print(f"分析完成！结果已写入快照 {generation}。")
+    return generation
 
 
-def execute_and_fetch_with_mock_number(sql_query):
+def _hot_views(condition):
     """
-    执行SQL查询并为每行结果附加一个模拟的计数值(1)。
-    这是一个辅助函数，用于统一处理那些本身不包含计数的查询结果，
-    使其数据结构与包含计数的查询结果一致。
+    按条件筛选可用的职位分类（视图）名称，保持注册顺序。
     """
-    cursor.execute(sql_query)
-    results = cursor.fetchall()
-    return [row + (1,) for row in results]
+    return [v for v in A.Analyze.available_views if condition(v)]
 
 
-@ways
+def _is_hot_job(view_name):
+    return '工程师' in view_name or '经理' in view_name or '总监' in view_name or '负责人' in view_name
+
+
+def _weighted_mean(df, keys, column):
+    """
+    按 `keys` 分组，以 `number` 为权重计算 `column` 的平均值，等价于逐行数据的平均值。
+    """
+    df = df.dropna(subset=[column])
+    totals = df.assign(_weighted=df[column] * df['number']).groupby(keys, observed=True)[['_weighted', 'number']].sum()
+    totals = totals[totals['number'] > 0]
+    return totals['_weighted'] / totals['number']
+
+
+def _rank_by_category(names, column):
+    """
+    一次分组计算多个分类中某列的平均值，按平均值从高到低排序。
+    平均值相同时保持分类的注册顺序，与原先逐个视图查询再排序的结果一致。
+
+    Returns:
+        pd.Series: 以分类名称为索引的平均值，不含没有数据的分类。
+    """
+    means = _weighted_mean(frame.by_category(names), 'category', column).reindex(names).dropna()
+    return means.sort_values(ascending=False, kind='mergesort')
+
+
+@ways(cpu_bound=True)
 def f1():
     """为图表1：传统职业与新兴职业的薪资分布箱线图准备数据。"""
-    # 查询传统职业薪资
-    re1 = execute_and_fetch_with_mock_number("select ave_pay from 传统职业 where ave_pay is not null limit 10000")
-    m = [x[0] for x in re1]
-    n = [x[1] for x in re1]
-    a = np.repeat(m, n) if m else np.array([])
-    a1 = a[(a != a.max()) & (a != a.min())].tolist() if a.size > 0 else []
-
-    # 查询新兴职业薪资
-    re2 = execute_and_fetch_with_mock_number("select ave_pay from 新兴职业 where ave_pay is not null limit 10000")
-    m = [x[0] for x in re2]
-    n = [x[1] for x in re2]
-    a = np.repeat(m, n) if m else np.array([])
-    b1 = a[(a != a.max()) & (a != a.min())].tolist() if a.size > 0 else []
-
-    # 使用pyecharts工具准备箱线图数据格式
-    q = [a1, b1]
-    re1 = pyecharts.Boxplot.prepare_data(q)
-    conf.set('chart', 'chart.1.1', str(re1))
+    re1 = []
+    for name in ('传统职业', '新兴职业'):
+        df = frame.category(name)
+        # 对全部职位精确统计（而不是前 10000 条），内存只与不同薪资取值的数量有关；
+        # 与原先一样，去掉等于最高和最低薪资的职位后再计算箱线图
+        box = QuantileAggregator().add(df['ave_pay'], df['number']).trimmed().boxplot()
+        if box is not None:
+            re1.append(box)
+    results['chart.1.1'] = re1
 
 
 @ways
 def f2():
     """为图表2：大数据职位的行业分布条形图准备数据。"""
-    results = execute_and_fetch_with_mock_number("select industry from 大数据职位 where industry is not null and industry != ''")
-    industries = [row[0] for row in results]
-    nums = [row[1] for row in results]
+    df = frame.category('大数据职位')
+    industries = df[df['industry'] != ''].groupby('industry', observed=True)['number'].sum()
 
-    # 清洗和聚合行业数据，处理 "互联网/游戏" 这样的组合字段
+    # 清洗和聚合行业数据，处理 "互联网/游戏" 这样的组合字段；
+    # 相同的行业组合只拆分一次，按职位数量累加
     a = {}
-    for i, industry_str in enumerate(industries):
+    for industry_str, num in industries.items():
+        if num == 0: continue
         x = re.split(r'[,/]', industry_str)
         for k in x:
             k = k.strip()
-            if k: a[k] = a.get(k, 0) + nums[i]
+            if k: a[k] = a.get(k, 0) + int(num)
 
     b = sorted(a.items(), key=lambda item: item[1], reverse=True)
     hy = [x[0] for x in b[:10]]
     n = [x[1] for x in b[:10]]
-    conf.set('chart', 'chart.2.1', str(hy))
-    conf.set('chart', 'chart.2.2', str(n))
+    results['chart.2.1'] = hy
+    results['chart.2.2'] = n
 
 
-@ways
+@ways(cpu_bound=True)
 def f3():
     """为图表3：热门职位-城市需求热力图准备数据。"""
-    l_views = [v for v in A.Analyze.available_views if '工程师' in v or '经理' in v or '总监' in v or '负责人' in v]
+    l_views = _hot_views(_is_hot_job)
     if not l_views: return
 
     city = ['上海', '深圳', '广州', '北京', '武汉', '成都', '杭州', '南京', '西安', '苏州']
-    v = []
+    df = frame.by_category(l_views)
     # 1. 找出职位数量排名前10的职位类别
-    for view_name in l_views:
-        safe_view_name = '`' + view_name.replace("'", "''") + '`'
-        re_data = execute_and_fetch_with_mock_number(f"select 1 from {safe_view_name} limit 10000")
-        s = sum(row[1] for row in re_data)
-        if s > 0: v.append([s, view_name])
-
-    v.sort(key=lambda item: item[0], reverse=True)
-    if not v: return
-    top_10_jobs = [item[1] for item in v[:10]]
+    sizes = df.groupby('category')['number'].sum().reindex(l_views).dropna()
+    sizes = sizes[sizes > 0].sort_values(ascending=False, kind='mergesort')
+    if sizes.empty: return
+    top_10_jobs = sizes.index[:10].tolist()
 
     # 2. 对每个热门职位，统计其在主要城市的分布
+    df = df[df['category'].isin(top_10_jobs) & df['place'].isin(city)]
+    counts = df.groupby(['category', df['place'].astype(str)])['number'].sum()
     x = []
     for job_name in top_10_jobs:
-        safe_view_name = '`' + job_name.replace("'", "''") + '`'
-        re_data = execute_and_fetch_with_mock_number(f"select place from {safe_view_name} limit 10000")
-        a = {}
-        for row in re_data:
-            if row[0] in city:
-                a[row[0]] = a.get(row[0], 0) + row[1]
-        for key, value in a.items():
+        if job_name not in counts.index.get_level_values(0): continue
+        for key, value in counts[job_name].items():
             # 格式化为 [城市, 职位, 数量] 的热力图数据格式
-            x.append([key, job_name, value])
+            x.append([key, job_name, int(value)])
 
     ct = list(set([w[0] for w in x]))
-    conf.set('chart', 'chart.3.1', str(ct))
-    conf.set('chart', 'chart.3.2', str(top_10_jobs))
-    conf.set('chart', 'chart.3.3', str(x))
+    results['chart.3.1'] = ct
+    results['chart.3.2'] = top_10_jobs
+    results['chart.3.3'] = x
 
 
 @ways
 def f4():
     """为图表4：全国平均薪资Top10城市条形图准备数据。"""
-    re = execute_and_fetch_with_mock_number("select place, ave_pay from qcwy where ave_pay is not null limit 10000")
-    df = pd.DataFrame(re, columns=["place", "ave_pay", "number"])
-    df = df.dropna()
-
     # 按城市分组计算平均薪资并排序
-    avg_pay_by_city = df.groupby('place')['ave_pay'].mean().round(2).sort_values(ascending=False)
+    avg_pay_by_city = _weighted_mean(frame.jobs, 'place', 'ave_pay').round(2).sort_values(ascending=False)
     # 过滤掉省级、自治区等非城市单位
     valid_cities = [city for city in avg_pay_by_city.index if '省' not in city and '自治' not in city and '台湾' not in city and '国外' not in city]
 
     top_10 = avg_pay_by_city[valid_cities][:10]
-    conf.set('chart', 'chart.4.1', str(top_10.index.tolist()))
-    conf.set('chart', 'chart.4.2', str(top_10.values.tolist()))
+    results['chart.4.1'] = top_10.index.tolist()
+    results['chart.4.2'] = top_10.values.tolist()
 
 
 @ways
 def f5():
     """为图表5：大数据职位需求量Top10城市条形图准备数据。"""
-    re = execute_and_fetch_with_mock_number("select place from 大数据职位")
-    df = pd.DataFrame(re, columns=['place', 'num'])
-    df = df.dropna()
-    a = df.groupby('place')['num'].sum().sort_values(ascending=False)
+    a = frame.category('大数据职位').groupby('place', observed=True)['number'].sum().sort_values(ascending=False)
+    a = a[a > 0]
 
     c = a.index[:10].tolist()
     b = a.values[:10].tolist()
-    conf.set('chart', 'chart.5.1', str(c))
-    conf.set('chart', 'chart.5.2', str(b))
+    results['chart.5.1'] = c
+    results['chart.5.2'] = b
 
 
 @ways
 def f6():
     """为图表6：学历-经验与薪资关系3D散点图准备数据。"""
-    sql = "SELECT education, experience, ave_pay FROM qcwy WHERE ave_pay IS NOT NULL AND experience IS NOT NULL AND experience REGEXP '^[0-9]+$' LIMIT 10000"
-    re = execute_and_fetch_with_mock_number(sql)
-    if not re: return
-
-    df = pd.DataFrame(re, columns=['education', 'experience', 'ave_pay', 'number'])
-    df['experience'] = pd.to_numeric(df['experience'], errors='coerce')
-    df.dropna(subset=['experience'], inplace=True)
-    df['experience'] = df['experience'].astype(int)
+    df = frame.jobs.dropna(subset=['ave_pay', 'experience_years', 'education'])
+    df = df[df['number'] > 0]
     if df.empty: return
 
     # 定义学历和经验的展示顺序
     p = ['', '中专', '大专', '本科', '硕士']
-    w = sorted(df['experience'].unique())
+    w = sorted(int(exp) for exp in df['experience_years'].unique())
 
     # 按学历和经验分组，计算平均薪资
-    grouped = df.groupby(['education', 'experience'])['ave_pay'].mean().round(2)
+    df = df.assign(education=df['education'].astype(str), experience_years=df['experience_years'].astype(int))
+    grouped = _weighted_mean(df, ['education', 'experience_years'], 'ave_pay').round(2)
 
     t = []
     for i in p:
         for j in w:
-            try:
-                if (i, j) in grouped.index:
-                    v = grouped.loc[(i, j)]
-                    j_str = str(j) + '年'
-                    i_str = i if i else '不限'
-                    t.append([i_str, j_str, v])
-            except KeyError:
-                continue
+            if (i, j) in grouped.index:
+                v = float(grouped.loc[(i, j)])
+                j_str = str(j) + '年'
+                i_str = i if i else '不限'
+                t.append([i_str, j_str, v])
 
     w_str = [str(exp) + '年' for exp in w]
     p[0] = '不限'  # 将空字符串替换为更友好的标签
-    conf.set('chart', 'chart.6.1', str(p))
-    conf.set('chart', 'chart.6.2', str(w_str))
-    conf.set('chart', 'chart.6.3', str(t))
+    results['chart.6.1'] = p
+    results['chart.6.2'] = w_str
+    results['chart.6.3'] = t
 
 
 @ways
 def f7():
     """为图表7：学历与薪资、需求量关系图准备数据。"""
-    re = execute_and_fetch_with_mock_number("select education, ave_pay from qcwy where ave_pay is not null and education is not null and education != '' limit 10000")
-    if not re: return
-    df = pd.DataFrame(re, columns=['education', 'pay', 'num'])
+    df = frame.jobs.dropna(subset=['ave_pay', 'education'])
+    df = df[df['education'] != '']
+    pay = _weighted_mean(df, 'education', 'ave_pay')
+    if pay.empty: return
 
     # 按学历分组，聚合计算平均薪资和职位总数
-    result = df.groupby('education').agg({'pay': 'mean', 'num': 'sum'}).round(2)
-    result.index = [idx if idx else '不限' for idx in result.index]
+    num = df.groupby('education', observed=True)['number'].sum()[pay.index]
+    index = [idx if idx else '不限' for idx in pay.index]
 
-    conf.set('chart', 'chart.7.1', str(result.index.tolist()))
-    conf.set('chart', 'chart.7.2', str(result['pay'].tolist()))
-    conf.set('chart', 'chart.7.3', str(result['num'].tolist()))
+    results['chart.7.1'] = index
+    results['chart.7.2'] = pay.round(2).tolist()
+    results['chart.7.3'] = num.tolist()
 
 
-@ways
+def _education_experience(view_name):
+    """
+    返回某个分类中工作经验和学历都不为空的职位。
+    """
+    df = frame.category(view_name).dropna(subset=['experience', 'education'])
+    return df[(df['experience'] != '') & (df['education'] != '') & (df['number'] > 0)]
+
+
+def _experience_counts(df):
+    """按经验年数统计职位数量，按年数排序。"""
+    df = df.dropna(subset=['experience_years'])
+    return df.groupby(df['experience_years'].astype(int))['number'].sum().sort_index()
+
+
+@ways(cpu_bound=True)
 def f10():
     """为图表10：传统与新兴职业对学历、经验要求的对比饼图准备数据。"""
-    re1 = execute_and_fetch_with_mock_number("select experience, education from 传统职业 where experience is not null and education is not null and experience != '' and education != '' limit 10000")
-    if not re1: return
-    df1 = pd.DataFrame(re1, columns=['experience', 'education', 'number'])
-    df1['experience'] = pd.to_numeric(df1['experience'], errors='coerce').dropna().astype(int)
-
-    re2 = execute_and_fetch_with_mock_number("select experience, education from 新兴职业 where experience is not null and education is not null and experience != '' and education != '' limit 10000")
-    if not re2: return
-    df2 = pd.DataFrame(re2, columns=['experience', 'education', 'number'])
-    df2['experience'] = pd.to_numeric(df2['experience'], errors='coerce').dropna().astype(int)
+    df1 = _education_experience('传统职业')
+    if df1.empty: return
+    df2 = _education_experience('新兴职业')
+    if df2.empty: return
 
     a = ['', '中专', '大专', '本科', '硕士']
     # 传统职业学历分布
-    q1 = df1.groupby('education')['number'].sum()
+    q1 = df1.groupby('education', observed=True)['number'].sum()
     b = [idx for idx in q1.index if idx in a]
     c = q1[b].values.tolist()
     if '' in b: b[b.index('')] = '不限'
 
     # 新兴职业学历分布
-    q2 = df2.groupby('education')['number'].sum()
+    q2 = df2.groupby('education', observed=True)['number'].sum()
     d = [idx for idx in q2.index if idx in a]
     f = q2[d].values.tolist()
     if '' in d: d[d.index('')] = '不限'
 
     # 传统职业经验分布
-    p1 = df1.groupby('experience')['number'].sum()
+    p1 = _experience_counts(df1)
     k = [str(idx) + '年' for idx in p1.index]
 
     # 新兴职业经验分布
-    p2 = df2.groupby('experience')['number'].sum()
+    p2 = _experience_counts(df2)
     j = [str(idx) + '年' for idx in p2.index]
 
-    conf.set('chart', 'chart.10.1', str(b))
-    conf.set('chart', 'chart.10.2', str(c))
-    conf.set('chart', 'chart.10.3', str(d))
-    conf.set('chart', 'chart.10.4', str(f))
-    conf.set('chart', 'chart.10.5', str(k))
-    conf.set('chart', 'chart.10.6', str(p1.values.tolist()))
-    conf.set('chart', 'chart.10.7', str(j))
-    conf.set('chart', 'chart.10.8', str(p2.values.tolist()))
+    results['chart.10.1'] = b
+    results['chart.10.2'] = c
+    results['chart.10.3'] = d
+    results['chart.10.4'] = f
+    results['chart.10.5'] = k
+    results['chart.10.6'] = p1.values.tolist()
+    results['chart.10.7'] = j
+    results['chart.10.8'] = p2.values.tolist()
 
 
-@ways
+@ways(cpu_bound=True)
 def f11():
     """为图表11：热门职位对工作经验要求条形图准备数据。"""
-    l_views = [v for v in A.Analyze.available_views if '工程师' in v or '经理' in v or '总监' in v or '负责人' in v]
+    l_views = _hot_views(_is_hot_job)
     if not l_views: return
-    a = []
-    for view_name in l_views:
-        safe_view_name = '`' + view_name.replace("'", "''") + '`'
-        re_data = execute_and_fetch_with_mock_number(f"select experience from {safe_view_name} where experience is not null and experience != '' limit 10000")
-        if not re_data: continue
-        df = pd.DataFrame(re_data, columns=['experience', 'number'])
-        df['experience'] = pd.to_numeric(df['experience'], errors='coerce').dropna().astype(int)
-        if df.empty: continue
-        # 加权平均计算平均经验要求
-        avg_exp = (df['experience'] * df['number']).sum() / df['number'].sum()
-        a.append([avg_exp, view_name])
-
-    a.sort(key=lambda item: item[0], reverse=True)
-    if not a: return
-    x = [item[1] for item in a[:10]]
-    y = [round(item[0], 2) for item in a[:10]]
-    conf.set('chart', 'chart.11.1', str(x))
-    conf.set('chart', 'chart.11.2', str(y))
+    # 各热门职位的平均经验要求
+    a = _rank_by_category(l_views, 'experience_years')
+    if a.empty: return
+    x = a.index[:10].tolist()
+    y = [round(v, 2) for v in a.values[:10].tolist()]
+    results['chart.11.1'] = x
+    results['chart.11.2'] = y
 
 
 @ways
 def f12():
     """为图表12：工作经验与薪资、需求量关系气泡图准备数据。"""
-    re = execute_and_fetch_with_mock_number("select experience, ave_pay from qcwy where experience is not null and experience != '' and ave_pay is not null limit 10000")
-    if not re: return
-    df = pd.DataFrame(re, columns=['experience', 'pay', 'num'])
-    df['experience'] = pd.to_numeric(df['experience'], errors='coerce').dropna().astype(int)
-
-    result = df.groupby('experience').agg({'pay': 'mean', 'num': 'sum'}).round(2)
+    df = frame.jobs.dropna(subset=['experience_years', 'ave_pay'])
+    df = df.assign(experience_years=df['experience_years'].astype(int))
+    pay = _weighted_mean(df, 'experience_years', 'ave_pay')
+    if pay.empty: return
+    num = df.groupby('experience_years')['number'].sum()
 
     # 格式化为 [经验, 需求量, 平均薪资] 的气泡图数据
-    data = [[idx, row['num'], row['pay']] for idx, row in result.iterrows()]
-    conf.set('chart', 'chart.12.1', str(data))
+    data = [[int(idx), int(num[idx]), round(float(v), 2)] for idx, v in pay.items()]
+    results['chart.12.1'] = data
 
 
-@ways
+@ways(depends=['chart.15'])
 def f13():
     """为图表13：热门职位薪资词云图准备数据。"""
-    # 此函数复用 f15 的计算结果来生成词云图的数据。
-    f15()
-    if A.Analyze.conf.has_option('chart', 'chart.15.1'):
-        conf.set('chart', 'chart.13.1', conf.get('chart', 'chart.15.1'))
-        conf.set('chart', 'chart.13.2', conf.get('chart', 'chart.15.2'))
-        conf.set('chart', 'chart.13.3', str([1] * 10))  # 词云权重，此处简化为相同权重
+    # 此函数复用 f15 的计算结果来生成词云图的数据，调度器保证 f15 已先执行完毕。
+    if 'chart.15.1' in results:
+        results['chart.13.1'] = results['chart.15.1']
+        results['chart.13.2'] = results['chart.15.2']
+        results['chart.13.3'] = [1] * 10  # 词云权重，此处简化为相同权重
 
 
-@ways
+@ways(cpu_bound=True)
 def f14():
     """为图表14：非技术岗位的薪资排行条形图准备数据。"""
     # 筛选出非“工程师”类的职位视图
-    l_views = [v for v in A.Analyze.available_views if 'view' not in v and ('工程师' not in v or '师' not in v)]
+    l_views = _hot_views(lambda v: 'view' not in v and ('工程师' not in v or '师' not in v))
     if not l_views: return
-    a = {}
-    for view_name in l_views:
-        safe_view_name = '`' + view_name.replace("'", "''") + '`'
-        re_data = execute_and_fetch_with_mock_number(f"select ave_pay from {safe_view_name} where ave_pay is not null limit 10000")
-        if not re_data: continue
-        df = pd.DataFrame(re_data, columns=['ave_pay', 'number'])
-        avg_pay = (df['ave_pay'] * df['number']).sum() / df['number'].sum()
-        a[view_name.replace('\\', '/')] = avg_pay
-
-    list_words = sorted(a.items(), key=lambda item: item[1], reverse=True)
-    if not list_words: return
-    p = [item[0] for item in list_words[:10]]
-    q = [round(item[1]) for item in list_words[:10]]
-    conf.set('chart', 'chart.14.1', str(p))
-    conf.set('chart', 'chart.14.2', str(q))
+    a = _rank_by_category(l_views, 'ave_pay')
+    if a.empty: return
+    p = [name.replace('\\', '/') for name in a.index[:10]]
+    q = [round(v) for v in a.values[:10].tolist()]
+    results['chart.14.1'] = p
+    results['chart.14.2'] = q
 
 
-@ways
+@ways(cpu_bound=True)
 def f15():
     """为图表15：热门职位薪资排行条形图准备数据。"""
-    l_views = [v for v in A.Analyze.available_views if '工程师' in v or '经理' in v or '总监' in v or '负责人' in v]
+    l_views = _hot_views(_is_hot_job)
     if not l_views: return
-    a = []
-    for view_name in l_views:
-        safe_view_name = '`' + view_name.replace("'", "''") + '`'
-        re_data = execute_and_fetch_with_mock_number(f"select ave_pay from {safe_view_name} where ave_pay is not null limit 10000")
-        if not re_data: continue
-        df = pd.DataFrame(re_data, columns=['ave_pay', 'number'])
-        avg_pay = (df['ave_pay'] * df['number']).sum() / df['number'].sum()
-        a.append([avg_pay, view_name])
-
-    a.sort(key=lambda item: item[0], reverse=True)
-    if not a: return
-    x = [item[1] for item in a[:10]]
-    y = [round(item[0]) for item in a[:10]]
-    conf.set('chart', 'chart.15.1', str(x))
-    conf.set('chart', 'chart.15.2', str(y))
+    a = _rank_by_category(l_views, 'ave_pay')
+    if a.empty: return
+    x = a.index[:10].tolist()
+    y = [round(v) for v in a.values[:10].tolist()]
+    results['chart.15.1'] = x
+    results['chart.15.2'] = y
 
 
 @ways
 def f16():
     """为图表16：全国职位需求量Top10城市条形图准备数据。"""
-    re = execute_and_fetch_with_mock_number("select place from qcwy where place is not null")
-    df = pd.DataFrame(re, columns=['place', 'num']).dropna()
-    w = df.groupby('place')['num'].sum().sort_values(ascending=False)
+    w = frame.jobs.groupby('place', observed=True)['number'].sum().sort_values(ascending=False)
+    w = w[w > 0]
 
     c = w.index[:10].tolist()
     d = w.values[:10].tolist()
-    conf.set('chart', 'chart.16.1', str(c))
-    conf.set('chart', 'chart.16.2', str(d))
+    results['chart.16.1'] = c
+    results['chart.16.2'] = d
 
 
-@ways
+@ways(cpu_bound=True)
 def f17():
     """为图表17：热门技术岗位薪资排行条形图准备数据。"""
-    l_views = [v for v in A.Analyze.available_views if '工程师' in v]
+    l_views = _hot_views(lambda v: '工程师' in v)
     if not l_views: return
-    x = []
-    for view_name in l_views:
-        safe_view_name = '`' + view_name.replace("'", "''") + '`'
-        re_data = execute_and_fetch_with_mock_number(f"select ave_pay from {safe_view_name} where ave_pay is not null")
-        if not re_data: continue
-        df = pd.DataFrame(re_data, columns=['ave_pay', 'number'])
-        avg_pay = (df['ave_pay'] * df['number']).sum() / df['number'].sum()
-        x.append([avg_pay, view_name])
-
-    x.sort(key=lambda item: item[0], reverse=True)
-    if not x: return
-    jn = [item[1] for item in x[:10]]
-    mo = [round(item[0]) for item in x[:10]]
-    conf.set('chart', 'chart.17.1', str(jn))
-    conf.set('chart', 'chart.17.2', str(mo))
+    x = _rank_by_category(l_views, 'ave_pay')
+    if x.empty: return
+    jn = x.index[:10].tolist()
+    mo = [round(v) for v in x.values[:10].tolist()]
+    results['chart.17.1'] = jn
+    results['chart.17.2'] = mo
 
 
-@ways
+@ways(cpu_bound=True)
 def f18():
     """为图表18：新兴职业内部构成饼图准备数据。"""
-    re = execute_and_fetch_with_mock_number("select title from 新兴职业 limit 10000")
-    if not re: return
-    df = pd.DataFrame(re, columns=['job', 'number'])
-
-    keywords = ['学习', '人工智能', '数据', '区块链', '算法', '物联网', '视觉', '自然语言']
-    b = {}
-    total_num = df['number'].sum()
+    titles = frame.titles('新兴职业')
+    total_num = int(titles['number'].sum())
     if total_num == 0: return
 
-    for kw in keywords:
-        count = df[df['job'].str.contains(kw)]['number'].sum()
-        if count > 0:
-            b[kw] = count
+    keywords = ['学习', '人工智能', '数据', '区块链', '算法', '物联网', '视觉', '自然语言']
+    # 使用预处理步骤的分类自动机，对每种标题只扫描一次，得到各关键词对应的职位数量
+    counts = TITLE_MATCHER.count(titles['title'], titles['number'])
+    b = {kw: int(counts[kw]) for kw in keywords if counts.get(kw, 0) > 0}
 
     # 格式化标签名称
     job = [k.replace('数据', '大数据').replace('学习', '机器学习').replace('视觉', '机器视觉') for k in b.keys()]
     num = [round(v / total_num, 2) for v in b.values()]
-    conf.set('chart', 'chart.18.1', str(job))
-    conf.set('chart', 'chart.18.2', str(num))
\ No newline at end of file
+    results['chart.18.1'] = job
+    results['chart.18.2'] = num
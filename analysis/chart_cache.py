@@ -0,0 +1,85 @@
+# /analysis/chart_cache.py
+
+# ==============================================================================
+#  数据分析模块 - 已渲染图表的缓存
+# ==============================================================================
+#
+#  说明:
+#  `/chart/<id>` 原先在每次请求时都重新读取分析结果、
+#  重建 pyecharts 图表对象并调用 `render_embed()`；`/展示` 页面每次打开都会
+#  发出约 21 个这样的请求。而图表内容只在数据分析重新运行、写出新的分析结果
+#  之后才会变化。
+#
+#  核心功能:
+#  1. 分析结果的版本由结果存储的 `version()` 决定（当前快照的发布时间和代号），
+#     发布新的分析结果快照后版本随之改变。
+#  2. 渲染结果按 (图表 ID, 分析版本) 缓存，每次分析之后每个图表只渲染一次；
+#     版本变化时，旧版本的缓存条目被丢弃。
+#  3. 每个条目附带 ETag（内容哈希）和 Last-Modified（分析结果的写入时间），
+#     浏览器再次请求时可以得到 304 响应，不必重新传输。
+#
+# ==============================================================================
+
+import hashlib
+import threading
+
+
+class CachedChart(object):
+    """
+    一个已渲染的图表片段。
+
+    Args:
+        html (str): 图表的 HTML 片段。
+        last_modified (float): 分析结果的发布时间戳。
+    """
+
+    def __init__(self, html, last_modified):
+        self.html = html
+        self.etag = hashlib.sha1(html.encode('utf-8')).hexdigest()
+        self.last_modified = last_modified
+
+
+class ChartCache(object):
+    """
+    按 (图表 ID, 分析版本) 缓存已渲染的图表，可在多个请求线程之间共享。
+
+    Args:
+        store (ResultStore): 分析结果存储。
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._entries = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def version(self):
+        """
+        返回当前分析结果的版本 (发布时间, 代号)；尚未发布分析结果时返回 None。
+        """
+        return self.store.version()
+
+    def get(self, chart_id, render):
+        """
+        返回图表的缓存条目，缓存中没有当前版本的条目时调用 `render(chart_id)` 生成。
+        渲染失败时异常向上抛出，失败的结果不会被缓存。
+
+        Returns:
+            CachedChart: 缓存条目。
+        """
+        version = self.version()
+        with self._lock:
+            if version != self._version:
+                # 分析结果已更新，丢弃旧版本的全部条目
+                self._entries = {}
+                self._version = version
+            entry = self._entries.get(chart_id)
+        if entry is not None:
+            return entry
+
+        # 在锁外渲染，不同图表可以同时渲染；同一图表被并发请求时可能重复渲染一次，结果相同
+        entry = CachedChart(render(chart_id), version[0] if version else None)
+        with self._lock:
+            if version == self._version:
+                self._entries[chart_id] = entry
+        return entry
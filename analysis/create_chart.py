@@ -12,17 +12,24 @@
 #  1. `@ways` 装饰器: 自动将每个图表生成函数注册到一个全局列表中
 #     (`A.Analyze.chart_fn_list`)。这使得服务器端代码可以按 ID 动态调用它们。
 #
-#  2. 数据传递: 每个图表函数接收一个生成器 `pa` 作为参数。这个生成器
-#     从 `conf.ini` 文件中读取由 `analyze_data.py` 模块计算并存储的数据。
-#     通过 `next(pa)` 依次获取所需的数据片段。
+#  2. 数据传递: 每个图表函数接收一个迭代器 `pa` 作为参数。它依次提供
+#     `analyze_data.py` 模块计算并存入结果存储 (`result_store`) 的数据，
+#     只读取该图表自己的结果文件。通过 `next(pa)` 依次获取所需的数据片段。
+#
+#  3. `render(chart_id, store)`: 按图表 ID 生成可嵌入的 HTML 片段。
+#
+#  4. `prerender(generation)`: 数据分析完成后、发布新快照之前由 `Analyze.main` 调用，
+#     用进程池并行渲染所有图表，写入该快照的 `charts/<id>.html.gz`，
+#     服务器直接发送当前快照中这些静态的压缩片段。
 #
 # ==============================================================================
 
 import os
 import sys
+import gzip
 import pyecharts as p
-import configparser
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from pyecharts import Style
 
@@ -33,6 +40,12 @@ sys.path.append(script_dir)
 
 # 导入中心枢纽，以访问共享的应用上下文（特别是函数注册列表）
 import analysis_main as A
+from result_store import RESULT_DIR, ResultStore
+
+# 预渲染的图表片段在每一代分析结果快照中的子目录
+CHART_DIR = 'charts'
+# 分析数据不足时返回的提示片段
+MISSING_DATA_HTML = "<p style='color:red; text-align:center;'>生成图表(ID:{id})失败：分析数据不足或不存在。</p>"
 
 
 def ways(func):
@@ -41,23 +54,102 @@ def ways(func):
     所有被此装饰器标记的函数都会被添加到 `A.Analyze.chart_fn_list` 中，
     以便服务器可以按索引动态调用它们。
     """
-    A.Analyze.chart_fn_list.append(func)
+    # 服务器以 `analysis.create_chart` 导入此模块，而 `Analyze.main` 预渲染时以
+    # `create_chart` 导入，同一个模块会被执行两次；按函数名去重，保持图表 ID 不变。
+    if not any(fn.__name__ == func.__name__ for fn in A.Analyze.chart_fn_list):
+        A.Analyze.chart_fn_list.append(func)
 
     def wrapper(*args, **kw):
         return func(*args, **kw)
     return wrapper
 
 
-def parameter(fn):
+def chart_parameters(fn, store):
     """
-    (测试/旧版功能) 参数生成器。
-    从配置文件中读取与指定函数相关的数据。
-    注意：在 Web 服务器中，此逻辑被 `.server.py` 中的 `parameter_generator` 替代。
+    返回一个迭代器，依次提供图表函数所需的参数。
+    只读取该图表自己的结果文件，参数已是 JSON 解析出的列表、数值等类型，无需 eval。
+    """
+    # 从函数名推断图表编号，例如 't3' -> '3'
+    return iter(store.read(fn.__name__.replace('t', '')))
+
+
+def render(chart_id, store):
+    """
+    按图表 ID（`chart_fn_list` 中的下标）生成图表，返回可嵌入页面的 HTML 片段。
+
+    Args:
+        store (ResultStore): 分析结果存储。
+
+    Raises:
+        FileNotFoundError: 尚未生成分析结果。
+        StopIteration / KeyError: 分析结果中缺少该图表需要的数据。
+    """
+    # 根据 ID 获取对应的图表生成函数，并传入参数
+    target_fn = A.Analyze.chart_fn_list[chart_id]
+    chart_obj = target_fn(chart_parameters(target_fn, store))
+    chart_obj.width = '100%'
+
+    # 对特定图表应用自定义的尺寸
+    if target_fn.__name__ in ['t3', 't12', 't21']:
+        chart_obj.width = 650
+        chart_obj.height = 500
+    elif target_fn.__name__ == 't6':
+        chart_obj.width = 1200
+        chart_obj.height = 600
+
+    # 渲染图表为可嵌入的 HTML
+    return chart_obj.render_embed()
+
+
+def fragment_path(store, generation, chart_id):
+    """返回某一代快照中预渲染的图表片段文件路径（gzip 压缩的 HTML）。"""
+    return os.path.join(store.generation_path(generation), CHART_DIR, f'{chart_id}.html.gz')
+
+
+def _prerender_one(chart_id, result_dir, generation):
+    """
+    在工作进程中渲染一个图表，压缩后原子地写入片段文件。
+    分析数据不足的图表写入提示信息，与按需渲染时返回的内容相同。
+    """
+    store = ResultStore(result_dir, generation)
+    try:
+        html = render(chart_id, store)
+    except (StopIteration, KeyError, FileNotFoundError):
+        html = MISSING_DATA_HTML.format(id=chart_id)
+    path = fragment_path(store, generation, chart_id)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with gzip.open(tmp_path, 'wb') as f:
+        f.write(html.encode('utf-8'))
+    os.replace(tmp_path, path)
+    return chart_id
+
+
+def prerender(generation, result_dir=RESULT_DIR, processes=None):
+    """
+    在数据分析完成后，用进程池并行渲染某一代快照的所有图表，写入静态的压缩片段文件。
+    pyecharts 渲染是 CPU 密集型的，使用多进程可以利用多个核心；
+    服务器随后直接发送这些文件，不必在请求中渲染。
+
+    Args:
+        generation (str): 快照代号，通常是尚未发布的新一代。
+        processes (int): 工作进程数，默认为 CPU 核数。
+
+    Returns:
+        int: 成功写入的片段数。
     """
-    name = fn.__name__.replace('t', '')
-    for i in range(1, 50):
-        pa = 'chart.' + name + '.' + str(i)
-        yield eval(conf_chart[pa])
+    os.makedirs(os.path.join(ResultStore(result_dir).generation_path(generation), CHART_DIR), exist_ok=True)
+    chart_ids = range(len(A.Analyze.chart_fn_list))
+    done = 0
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(_prerender_one, i, result_dir, generation): i for i in chart_ids}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                done += 1
+            except Exception as e:
+                # 单个图表失败时，服务器会在请求时按需渲染该图表
+                print(f"  -> !!! 预渲染图表 {futures[future]} 失败: {e}")
+    return done
 
 
 def main():
@@ -66,16 +158,12 @@ def main():
     用于在命令行环境中一次性生成所有已注册的图表。
     不用于 Web 服务器的正常运行。
     """
-    global conf_chart
-    conf = configparser.ConfigParser()
-    conf.read('./conf/conf.ini')
-    conf_chart = conf['chart']
+    store = ResultStore()
     p.configure(global_theme='macarons')  # 设置全局主题
 
     charts = []
     for fn in A.Analyze.chart_fn_list:
-        pa = parameter(fn)
-        x = fn(pa)
+        x = fn(chart_parameters(fn, store))
         x.width = '100%'
         # 为特定图表设置自定义尺寸
         if fn.__name__ == 't3':
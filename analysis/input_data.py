@@ -10,39 +10,92 @@
 #
 #  核心功能:
 #  1. 确保数据库连接有效。
-#  2. 每次运行时，先删除旧的数据表 (`DROP TABLE`)，保证数据是全新的。
-#  3. 根据预设的 schema 重新创建数据表 (`CREATE TABLE`)。
-#  4. 使用 MySQL 高效的 `LOAD DATA INFILE` 命令，将 CSV 文件中的数据
-#     批量导入到新创建的表中。
+#  2. 增量导入 (默认, INGEST_MODE = 'upsert'):
+#     - 不再删除 `qcwy` 表。每条职位以爬虫生成的指纹 `job_key` 为唯一键，
+#       并保存原始内容的哈希 `content_hash`。
+#     - 水位表 `ingest_watermark` 记录上次导入到 CSV 的哪个字节位置。CSV 只会
+#       被追加（增量爬取），因此每次只把水位之后的新记录写入一个增量文件，
+#       用 `LOAD DATA INFILE` 载入暂存表 `qcwy_staging`。
+#     - 在一个事务中把暂存表合并进 `qcwy` (INSERT ... ON DUPLICATE KEY UPDATE)：
+#       新职位插入，内容变化的职位更新并清空已计算的薪资，内容未变的职位保持不动。
+#       合并期间 `qcwy` 始终可以查询。
+#     - 新插入或内容变化的行被标记为本批次 (`ingest_batch`)，后续的预处理步骤
+#       只需处理尚未处理过的批次。
+#  3. 若 CSV 被重写（全量爬取），通过文件开头的校验值发现，并从头重新扫描；
+#     未变化的职位在合并时不会产生任何改动。
+#  4. 全量重建 (INGEST_MODE = 'replace'): 导入全部数据。数据先合并进一张新表
+#     `qcwy_build`，预处理步骤随后在新表上清洗数据，并把分类写入 `job_category_build`；
+#     全部完成后由 `publish_build` 用一条 `RENAME TABLE` 同时替换两张正式表，
+#     重建期间其他连接（如 /互动 接口）始终可以查询完整的旧数据。
+#  5. 批量载入方式 (LOADER):
+#     - 'server': `LOAD DATA INFILE`，由 MySQL 服务器读取文件，要求数据库与项目在同一台
+#                 机器上，并正确配置 secure_file_priv。
+#     - 'local' : `LOAD DATA LOCAL INFILE`，由客户端把文件流式上传给服务器，
+#                 适用于数据库在其他主机或容器中（需服务器开启 local_infile）。
+#     - 'insert': 客户端按 BATCH_SIZE 行一批读取 CSV，使用多行 INSERT 写入，
+#                 不依赖任何服务器端文件权限。
+#     - 'auto'  : 默认值，依次尝试以上三种方式。
+#     载入、合并与水位更新在同一个事务中完成；`qcwy` 为空（首次或全量导入）时，
+#     二级索引在数据合并之后才建立。
 #
 # ==============================================================================
 
 # 导入中心枢纽 `analysis_main` 并使用别名 `A`，以访问共享的数据库连接和配置。
 import analysis_main as A
-import os
 import csv
+import os
+import zlib
 
+# 导入模式: 'upsert' 为增量导入，'replace' 为删除旧表后全量导入。
+INGEST_MODE = 'upsert'
+# 批量载入方式: 'server'、'local'、'insert' 或 'auto'（依次尝试）。
+LOADER = 'auto'
+# 'insert' 方式下每批写入的行数
+BATCH_SIZE = 5000
 
-def main():
-    """
-    执行数据导入的核心函数。
-    该函数完成从 CSV 到 MySQL 数据库的整个导入流程。
-    """
-    # 安全检查：如果数据库连接在初始化时失败，则中止此模块的执行。
-    if not A.Analyze.db:
-        print("错误：数据库未连接，跳过数据导入。")
-        return
+TABLE_NAME = 'qcwy'
+# 全量重建时新数据先写入此表，预处理完成后替换 TABLE_NAME
+BUILD_TABLE = 'qcwy_build'
+# 职位分类成员表（与 process_data.CATEGORY_TABLE 相同）及全量重建时对应的新表
+CATEGORY_TABLE = 'job_category'
+CATEGORY_BUILD_TABLE = 'job_category_build'
+STAGING_TABLE = 'qcwy_staging'
+WATERMARK_TABLE = 'ingest_watermark'
+CSV_FILE_NAME = 'qcwy.csv'
+# 本次需要导入的新记录会先写入此文件（与 CSV 位于同一目录，满足 secure_file_priv 的限制）
+DELTA_FILE_NAME = 'qcwy_delta.csv'
+
+# CSV 中的原始数据列（与爬虫 CSV_FIELDS 的顺序一致，最后一列 fingerprint 单独处理）
+RAW_COLUMNS = ['provider', 'keyword', 'title', 'place', 'salary', 'experience', 'education',
+               'companytype', 'industry', 'description']
+# 合并时若内容变化，需要清空的由预处理步骤计算的列
+DERIVED_COLUMNS = ['min_pay', 'max_pay', 'ave_pay']
 
-    table_name = 'qcwy'
-    csv_file_name = 'qcwy.csv'
+# 全量重建完成导入、等待预处理后发布的水位 (字节偏移, 校验字节数, 校验值, 批次)
+_pending_watermark = None
 
-    # --- 步骤 1: 清理并重建数据表 ---
-    # 每次运行时都删除旧表，确保从一个干净的状态开始。
-    A.Analyze.cursor.execute(f'DROP TABLE IF EXISTS `{table_name}`;')
+# 扫描 CSV 时每次读取的字节数，以及用于判断 CSV 是否被重写的文件开头字节数
+CHUNK_SIZE = 1 << 20
+HEAD_BYTES = 1 << 16
 
-    # 定义新表的结构。包含原始数据列和后续处理步骤将填充的列 (如 min_pay, max_pay)。
-    sql_create_table = f'''
-    CREATE TABLE `{table_name}` (
+
+def _create_tables(cursor, table=TABLE_NAME):
+    """
+    创建职位表 `table`（默认为 `qcwy`）、暂存表和水位表（已存在时保持不变）。
+    旧版本创建的 `qcwy` 表没有 `job_key` 列，此时删除重建一次，并清空水位。
+    """
+    cursor.execute(f"SHOW TABLES LIKE '{table}'")
+    if cursor.fetchone():
+        cursor.execute(f"SHOW COLUMNS FROM `{table}` LIKE 'job_key'")
+        if not cursor.fetchone():
+            print("检测到旧版本的数据表结构，将重建数据表并重新导入全部数据。")
+            cursor.execute(f'DROP TABLE IF EXISTS `{table}`;')
+            cursor.execute(f'DROP TABLE IF EXISTS `{WATERMARK_TABLE}`;')
+
+    # 定义数据表的结构。包含原始数据列、后续处理步骤将填充的列 (如 min_pay, max_pay)，
+    # 以及增量导入使用的唯一键、内容哈希和导入批次。
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS `{table}` (
       `id` INT NOT NULL AUTO_INCREMENT,
       `provider` VARCHAR(255) DEFAULT NULL,
       `keyword` VARCHAR(255) DEFAULT NULL,
@@ -57,46 +110,337 @@ def main():
       `min_pay` DOUBLE DEFAULT NULL,
       `max_pay` DOUBLE DEFAULT NULL,
       `ave_pay` DOUBLE DEFAULT NULL,
-      PRIMARY KEY (`id`)
+      `job_key` CHAR(16) NOT NULL,
+      `content_hash` CHAR(40) NOT NULL,
+      `ingest_batch` INT NOT NULL DEFAULT 0,
+      PRIMARY KEY (`id`),
+      UNIQUE KEY `uk_job_key` (`job_key`),
+      KEY `idx_ingest_batch` (`ingest_batch`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+
+    # 暂存表只保存原始数据列和职位指纹，每次导入前清空。
+    raw_defs = ",\n".join(f"`{c}` TEXT" if c == 'description' else f"`{c}` VARCHAR(255) DEFAULT NULL"
+                          for c in RAW_COLUMNS)
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS `{STAGING_TABLE}` (
+      {raw_defs},
+      `job_key` CHAR(16) DEFAULT NULL
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-    '''
-    A.Analyze.cursor.execute(sql_create_table)
+    ''')
+
+    # 上次导入若在建立二级索引之前中断，在此补建
+    cursor.execute(f"SHOW INDEX FROM `{table}` WHERE Key_name = 'idx_ingest_batch'")
+    if not cursor.fetchall():
+        cursor.execute(f"ALTER TABLE `{table}` ADD INDEX `idx_ingest_batch` (`ingest_batch`)")
+
+    cursor.execute(f'''
+    CREATE TABLE IF NOT EXISTS `{WATERMARK_TABLE}` (
+      `source` VARCHAR(255) NOT NULL,
+      `byte_offset` BIGINT NOT NULL DEFAULT 0,
+      `head_len` INT NOT NULL DEFAULT 0,
+      `head_crc` BIGINT NOT NULL DEFAULT 0,
+      `batch` INT NOT NULL DEFAULT 0,
+      `processed_batch` INT NOT NULL DEFAULT 0,
+      `updated_at` DATETIME DEFAULT NULL,
+      PRIMARY KEY (`source`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    ''')
+
+
+def get_watermark(cursor, source=CSV_FILE_NAME):
+    """
+    读取导入水位，返回 (字节偏移, 校验字节数, 校验值, 最新批次, 已处理批次)。
+    """
+    cursor.execute(f"SELECT byte_offset, head_len, head_crc, batch, processed_batch "
+                   f"FROM `{WATERMARK_TABLE}` WHERE source = %s", (source,))
+    row = cursor.fetchone()
+    return tuple(row) if row else (0, 0, 0, 0, 0)
+
+
+def mark_processed(source=CSV_FILE_NAME):
+    """
+    记录预处理步骤已经处理完的批次。由 Analyze.main 在 process_data 完成后调用。
+    """
+    batch = A.Analyze.ingest_batch
+    A.Analyze.cursor.execute(f"UPDATE `{WATERMARK_TABLE}` SET processed_batch = %s WHERE source = %s",
+                             (batch, source))
+    A.Analyze.db.commit()
+
+
+def _head_crc(path, length):
+    with open(path, 'rb') as f:
+        return zlib.crc32(f.read(length))
+
+
+def _csv_rewritten(csv_path, offset, head_len, head_crc):
+    """
+    判断 CSV 是否在上次导入之后被重写（全量爬取）：文件比水位还短，或文件开头发生了变化。
+    """
+    if not offset:
+        return False
+    return os.path.getsize(csv_path) < offset or _head_crc(csv_path, head_len) != head_crc
+
+
+def extract_delta(csv_path, delta_path, offset):
+    """
+    把 CSV 中从 `offset` 开始的完整记录连同表头写入增量文件。
+    记录边界按引号奇偶判断（职位描述中可能含有换行）；末尾不完整的记录
+    （爬虫正在写入）不导入，留到下次。
+
+    Returns:
+        tuple: (新的水位字节偏移, 写入的记录数)。
+    """
+    rows = 0
+    with open(csv_path, 'rb') as src, open(delta_path, 'wb') as dst:
+        header = src.readline()
+        dst.write(header)
+        position = max(offset, src.tell())
+        src.seek(position)
+        record, in_quotes, tail = [], False, b''
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b'\n')
+            tail = lines.pop()
+            for line in lines:
+                record.append(line)
+                # 转义的双引号 "" 会让奇偶性翻转两次，结果不变
+                if line.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                if not in_quotes:
+                    data = b'\n'.join(record) + b'\n'
+                    dst.write(data)
+                    position += len(data)
+                    rows += 1
+                    record = []
+    return position, rows
+
+
+def _load_data(cursor, path, table, local):
+    """
+    使用 `LOAD DATA [LOCAL] INFILE` 把 CSV 文件载入指定的表。
+    """
+    columns_to_load = f"({', '.join(RAW_COLUMNS)}, @fingerprint)"
+    # LOAD DATA INFILE 是 MySQL 原生的批量数据导入命令，性能远高于逐行 INSERT。
+    # 注意: 服务器端方式要求 MySQL 配置文件 my.ini 中的 'secure_file_priv' 选项已正确配置，
+    # 以允许从该路径读取文件；LOCAL 方式则要求服务器开启 local_infile。
+    cursor.execute(f"""
+    LOAD DATA {'LOCAL ' if local else ''}INFILE '{path}' INTO TABLE `{table}`
+    CHARACTER SET 'utf8mb4' FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+    ESCAPED BY '"' LINES TERMINATED BY '\\r\\n' IGNORE 1 LINES {columns_to_load}
+    SET job_key = NULLIF(@fingerprint, '');
+    """)
+
+
+def _load_server(cursor, path, table, batch_size):
+    _load_data(cursor, path, table, local=False)
+
+
+def _load_local(cursor, path, table, batch_size):
+    _load_data(cursor, path, table, local=True)
+
+
+def _load_insert(cursor, path, table, batch_size):
+    """
+    客户端流式读取 CSV，每 `batch_size` 行执行一次多行 INSERT。
+    pymysql 的 executemany 会把同一批数据拼接为尽可能少的多行 INSERT 语句。
+    """
+    width = len(RAW_COLUMNS)
+    sql = (f"INSERT INTO `{table}` ({', '.join(RAW_COLUMNS)}, job_key) "
+           f"VALUES ({', '.join(['%s'] * (width + 1))})")
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # 跳过表头
+        batch = []
+        for row in reader:
+            values = (row + [''] * width)[:width]
+            fingerprint = row[width] if len(row) > width else ''
+            batch.append(values + [fingerprint or None])
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+LOADERS = {'server': _load_server, 'local': _load_local, 'insert': _load_insert}
+
+
+def load_csv(cursor, path, table, loader=LOADER, batch_size=BATCH_SIZE):
+    """
+    按配置的方式把 CSV 文件批量载入指定的表，返回实际使用的方式。
+    'auto' 时依次尝试服务器端、客户端 LOAD DATA 和批量 INSERT，失败的语句不会留下部分数据。
+    最后一列 fingerprint 是爬虫生成的职位指纹，作为 `job_key`；旧格式的 CSV 没有该列时，
+    以原始内容的哈希代替。
+    """
+    names = ['server', 'local', 'insert'] if loader == 'auto' else [loader]
+    for i, name in enumerate(names):
+        try:
+            LOADERS[name](cursor, path, table, batch_size)
+            break
+        except Exception as e:
+            if i == len(names) - 1:
+                raise
+            print(f"  -> 使用 '{name}' 方式载入失败 ({e})，改用 '{names[i + 1]}' 方式。")
+    cursor.execute(f"UPDATE `{table}` SET job_key = LEFT(SHA1(CONCAT_WS('|', {', '.join(RAW_COLUMNS)})), 16) "
+                   f"WHERE job_key IS NULL")
+    return name
+
+
+def merge_staging(cursor, batch, table=TABLE_NAME):
+    """
+    把暂存表合并进职位表 `table`（默认为 `qcwy`）。
+    新职位直接插入；已存在且内容哈希变化的职位更新原始列、清空已计算的列并标记为本批次；
+    内容未变的职位保持不动。MySQL 按书写顺序执行赋值，因此 content_hash 必须最后更新。
+
+    Returns:
+        int: 受影响的行数（插入计 1，更新计 2）。
+    """
+    content_hash = f"SHA1(CONCAT_WS('|', {', '.join(RAW_COLUMNS)}))"
+    unchanged = "content_hash = VALUES(content_hash)"
+    assignments = [f"`{c}` = IF({unchanged}, `{c}`, VALUES(`{c}`))" for c in RAW_COLUMNS]
+    assignments += [f"`{c}` = IF({unchanged}, `{c}`, NULL)" for c in DERIVED_COLUMNS]
+    assignments += [f"ingest_batch = IF({unchanged}, ingest_batch, VALUES(ingest_batch))",
+                    "content_hash = VALUES(content_hash)"]
+    columns = ', '.join(f"`{c}`" for c in RAW_COLUMNS)
+    return cursor.execute(f"""
+    INSERT INTO `{table}` ({columns}, job_key, content_hash, ingest_batch)
+    SELECT {columns}, job_key, {content_hash}, %s FROM `{STAGING_TABLE}`
+    ON DUPLICATE KEY UPDATE {', '.join(assignments)};
+    """, (batch,))
+
+
+def _write_watermark(cursor, new_offset, head_len, head_crc, batch, processed_batch=None):
+    """
+    写入导入水位。`processed_batch` 为 None 时保持已处理批次不变。
+    """
+    cursor.execute(f"""
+    INSERT INTO `{WATERMARK_TABLE}` (source, byte_offset, head_len, head_crc, batch, processed_batch, updated_at)
+    VALUES (%s, %s, %s, %s, %s, COALESCE(%s, 0), NOW())
+    ON DUPLICATE KEY UPDATE byte_offset = VALUES(byte_offset), head_len = VALUES(head_len),
+      head_crc = VALUES(head_crc), batch = VALUES(batch), updated_at = VALUES(updated_at),
+      processed_batch = COALESCE(%s, processed_batch);
+    """, (CSV_FILE_NAME, new_offset, head_len, head_crc, batch, processed_batch, processed_batch))
+
+
+def publish_build():
+    """
+    全量重建时，在预处理完成之后调用: 用一条 `RENAME TABLE` 同时把新的职位表和分类成员表
+    替换为正式表，再写入新的水位。其他连接在整个重建期间查询的都是完整的旧表，
+    替换之后立即看到完整清洗、分类过的新数据。视图按名称引用正式表，替换后自动指向新表。
+    不是全量重建时什么也不做。
+    """
+    global _pending_watermark
+    if _pending_watermark is None:
+        return
+    cursor = A.Analyze.cursor
+    renames, old_tables = [], []
+    for live, build in ((TABLE_NAME, BUILD_TABLE), (CATEGORY_TABLE, CATEGORY_BUILD_TABLE)):
+        cursor.execute(f"SHOW TABLES LIKE '{live}'")
+        if cursor.fetchone():
+            cursor.execute(f'DROP TABLE IF EXISTS `{live}_old`;')
+            renames.append(f"`{live}` TO `{live}_old`")
+            old_tables.append(f'{live}_old')
+        renames.append(f"`{build}` TO `{live}`")
+    cursor.execute(f"RENAME TABLE {', '.join(renames)}")
+    for table in old_tables:
+        cursor.execute(f'DROP TABLE `{table}`;')
+
+    # 新表中的数据都已处理，水位与已处理批次一起写入
+    new_offset, head_len, head_crc, batch = _pending_watermark
+    _write_watermark(cursor, new_offset, head_len, head_crc, batch, processed_batch=batch)
+    A.Analyze.db.commit()
+    A.Analyze.job_table, A.Analyze.category_table = TABLE_NAME, CATEGORY_TABLE
+    _pending_watermark = None
+    print(f"已用新导入的数据替换 `{TABLE_NAME}` 和 `{CATEGORY_TABLE}` 表。")
+
+
+def main():
+    """
+    执行数据导入的核心函数。
+    该函数完成从 CSV 到 MySQL 数据库的整个导入流程。
+    """
+    global _pending_watermark
+    # 安全检查：如果数据库连接在初始化时失败，则中止此模块的执行。
+    if not A.Analyze.db:
+        print("错误：数据库未连接，跳过数据导入。")
+        return
+
+    cursor = A.Analyze.cursor
+
+    # --- 步骤 1: 准备数据表 ---
+    if INGEST_MODE == 'replace':
+        # 全量模式：在新表中从头导入，预处理完成后再替换正式表，旧表在此期间保持可查询。
+        target = BUILD_TABLE
+        cursor.execute(f'DROP TABLE IF EXISTS `{BUILD_TABLE}`;')
+        cursor.execute(f'DROP TABLE IF EXISTS `{CATEGORY_BUILD_TABLE}`;')
+    else:
+        target = TABLE_NAME
+    _create_tables(cursor, target)
+    offset, head_len, head_crc, batch, processed_batch = get_watermark(cursor)
+    A.Analyze.ingest_batch = batch
+    A.Analyze.processed_batch = processed_batch
+    if target == BUILD_TABLE:
+        # 从头扫描 CSV；批次号继续递增，替换中断时新表的行仍会被视为未处理
+        offset = 0
 
     # --- 步骤 2: 定位并校验 CSV 源文件 ---
     # 使用共享的根路径来构建 CSV 文件的绝对路径。
-    csv_path = os.path.join(A.Analyze.path, 'data', csv_file_name).replace('\\', '/')
+    csv_path = os.path.join(A.Analyze.path, 'data', CSV_FILE_NAME).replace('\\', '/')
+    delta_path = os.path.join(A.Analyze.path, 'data', DELTA_FILE_NAME).replace('\\', '/')
 
     if not os.path.exists(csv_path.replace('/', os.sep)):
         print(f"错误: CSV文件不存在于 {csv_path}。")
         return
 
-    # 尝试读取 CSV 文件以检查其是否为空。如果文件行数不足（如少于2行），会触发 StopIteration。
-    try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as f:
-            reader = csv.reader(f)
-            next(reader)  # 跳过表头
-            next(reader)  # 验证至少存在一行数据
-    except (StopIteration, FileNotFoundError):
-        print(f"警告: CSV文件 '{csv_path}' 为空或不包含足够的数据行，跳过数据导入。")
-        return
-
-    # --- 步骤 3: 使用 LOAD DATA INFILE 高效导入数据 ---
-    # 指定要加载的列，与 CSV 文件中的列顺序对应。
-    columns_to_load = '(provider, keyword, title, place, salary, experience, education, companytype, industry, description)'
+    # CSV 被重写（全量爬取）时需要从头扫描。
+    if _csv_rewritten(csv_path, offset, head_len, head_crc):
+        print("检测到 CSV 文件已被重写，将从头扫描，仅合并新增或变化的职位。")
+        offset = 0
 
-    # LOAD DATA INFILE 是 MySQL 原生的批量数据导入命令，性能远高于逐行 INSERT。
-    # 注意: 这要求 MySQL 配置文件 my.ini 中的 'secure_file_priv' 选项已正确配置，以允许从该路径读取文件。
-    sql_load_data = f"""
-    LOAD DATA INFILE '{csv_path}' INTO TABLE `{table_name}`
-    CHARACTER SET 'utf8mb4' FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
-    ESCAPED BY '"' LINES TERMINATED BY '\\r\\n' IGNORE 1 LINES {columns_to_load};
-    """
+    # --- 步骤 3: 提取水位之后的新记录 ---
+    new_offset, rows = extract_delta(csv_path, delta_path, offset)
+    if rows == 0:
+        print("没有需要导入的新数据。")
+        os.remove(delta_path)
+        return
 
+    # --- 步骤 4: 载入暂存表，并在一个事务中合并进正式表 ---
+    batch += 1
+    cursor.execute(f'TRUNCATE TABLE `{STAGING_TABLE}`;')
+    # 正式表为空时（首次或全量导入），先去掉二级索引，合并完成后再一次性建立，
+    # 避免逐行维护索引。唯一键 job_key 是合并所必需的，予以保留。
+    cursor.execute(f"SELECT 1 FROM `{target}` LIMIT 1")
+    defer_indexes = cursor.fetchone() is None
+    if defer_indexes:
+        cursor.execute(f"ALTER TABLE `{target}` DROP INDEX `idx_ingest_batch`")
+    imported = False
     try:
-        print(f"正在从 {csv_path} 导入数据...")
-        A.Analyze.cursor.execute(sql_load_data)
-        # 提交事务，使导入的数据永久生效。
+        print(f"正在从 {csv_path} 导入 {rows} 条新记录（批次 {batch}）...")
+        loader = load_csv(cursor, delta_path, STAGING_TABLE)
+        print(f"  -> 已使用 '{loader}' 方式载入暂存表。")
+        affected = merge_staging(cursor, batch, target)
+        new_head_len = min(HEAD_BYTES, new_offset)
+        watermark = (new_offset, new_head_len, _head_crc(csv_path, new_head_len), batch)
+        if target == TABLE_NAME:
+            _write_watermark(cursor, *watermark)
+        # 提交事务，合并结果与新的水位同时生效。
         A.Analyze.db.commit()
-        print("数据导入成功！")
+        A.Analyze.ingest_batch = batch
+        imported = True
+        print(f"数据导入成功！合并影响 {affected} 行（新增计 1，更新计 2）。")
     except Exception as e:
-        print(f"错误：使用 LOAD DATA INFILE 导入数据失败: {e}")
\ No newline at end of file
+        A.Analyze.db.rollback()
+        print(f"错误：导入数据失败: {e}")
+    finally:
+        os.remove(delta_path)
+        if defer_indexes:
+            cursor.execute(f"ALTER TABLE `{target}` ADD INDEX `idx_ingest_batch` (`ingest_batch`)")
+
+    # --- 步骤 5: 全量模式下，预处理步骤改为处理新表，完成后由 publish_build 替换正式表 ---
+    if imported and target == BUILD_TABLE:
+        _pending_watermark = watermark
+        A.Analyze.job_table, A.Analyze.category_table = BUILD_TABLE, CATEGORY_BUILD_TABLE
+        A.Analyze.processed_batch = 0
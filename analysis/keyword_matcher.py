@@ -0,0 +1,109 @@
+# /analysis/keyword_matcher.py
+
+# ==============================================================================
+#  数据分析模块 - 多关键词单次扫描匹配 (Aho-Corasick)
+# ==============================================================================
+#
+#  说明:
+#  职位分类规则、新兴职业关键词以及新兴职业构成的统计，原先都是对每个关键词
+#  分别扫描一遍职位标题。此模块把所有关键词编译为一个 Aho-Corasick 自动机，
+#  对每个标题只扫描一次，即可得到其中出现的全部关键词。
+#
+#  核心功能:
+#  1. `KeywordMatcher(keywords)` 构建自动机: 先把关键词插入字典树 (trie)，
+#     再按广度优先计算每个状态的失败指针和输出集合。
+#  2. `find(text)` 逐字符转移状态，返回文本中出现的关键词集合，
+#     耗时与文本长度成正比，与关键词的数量无关。
+#  3. `count(texts, weights)` 对每个文本调用一次 `find`，统计每个关键词出现在
+#     多少个文本中（可按权重累加），用于按关键词汇总职位数量。
+#  4. 默认不区分大小写，与 MySQL 中 `LIKE` 的比较方式一致。
+#
+# ==============================================================================
+
+from collections import deque
+from itertools import repeat
+
+
+class KeywordMatcher(object):
+    """
+    由一组关键词编译而成的 Aho-Corasick 自动机。
+
+    Args:
+        keywords (iterable): 关键词，重复的关键词只保留一个。
+        ignore_case (bool): 是否忽略大小写。
+    """
+
+    def __init__(self, keywords, ignore_case=True):
+        self.ignore_case = ignore_case
+        # 每个状态的转移表、失败指针和输出（在该状态结束的关键词，使用原始写法）
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+        for keyword in keywords:
+            if keyword:
+                self._insert(keyword)
+        self._build()
+
+    def _normalize(self, text):
+        return text.lower() if self.ignore_case else text
+
+    def _insert(self, keyword):
+        state = 0
+        for char in self._normalize(keyword):
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(set())
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._output[state].add(keyword)
+
+    def _build(self):
+        """
+        按广度优先计算失败指针，并把失败状态的输出合并到当前状态，
+        匹配时无需再沿失败链收集输出。
+        """
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, target in self._goto[state].items():
+                queue.append(target)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[target] = self._goto[fail].get(char, 0)
+                self._output[target] |= self._output[self._fail[target]]
+
+    def find(self, text):
+        """
+        返回文本中出现的全部关键词（原始写法）。文本为空或不是字符串（None、NaN）时返回空集合。
+        """
+        found = set()
+        if not text or not isinstance(text, str):
+            return found
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for char in self._normalize(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+    def count(self, texts, weights=None):
+        """
+        统计每个关键词出现在多少个文本中。每个文本只扫描一次，同一文本中多次出现只计一次。
+
+        Args:
+            texts (iterable): 文本。
+            weights (iterable): 每个文本的权重（如职位数量），默认均为 1。
+
+        Returns:
+            dict: 关键词（原始写法） -> 包含它的文本的权重之和，不含没有出现的关键词。
+        """
+        counts = {}
+        for text, weight in zip(texts, repeat(1) if weights is None else weights):
+            for keyword in self.find(text):
+                counts[keyword] = counts.get(keyword, 0) + weight
+        return counts
@@ -0,0 +1,98 @@
+# /analysis/normalize.py
+
+# ==============================================================================
+#  数据分析模块 - 薪资与工作经验的向量化解析
+# ==============================================================================
+#
+#  说明:
+#  原先的清洗步骤逐行调用 `re.findall` 并在 Python 中分支判断。此模块用
+#  pandas 的 `str.extract` / `str.count` 和 NumPy 数组运算一次性解析整列数据，
+#  解析规则与原先的逐行实现完全一致:
+#
+#  薪资 (结果为月薪，单位: 元):
+#  1. 含 '年' 时乘以 1/12，否则含 '天' 时乘以 30。
+#  2. 含 '万' 时单位为 10000，否则含 '千' 时单位为 1000。
+#  3. 恰好两个数字时为范围薪资 (最低、最高、平均)，恰好一个数字时三者相同，
+#     其他情况无法解析，结果为空。数值按 Python `round` 的规则取整（银行家舍入）。
+#
+#  工作经验 (结果为字符串形式的年数):
+#  1. 恰好两个整数时取二者的平均值（向下取整），恰好一个时取该数字本身。
+#  2. 否则若包含 '无'、'不限'、'应届' 之一，结果为 '0'。
+#  3. 空字符串或其他情况无法解析，结果为空。
+#
+# ==============================================================================
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# 解析规则的版本号。修改解析规则时需递增，持久化的解析字典中旧版本的结果会被丢弃。
+VERSION = 1
+
+SALARY_NUMBER = r'\d+\.?\d*'
+EXPERIENCE_NUMBER = r'\d+'
+NO_EXPERIENCE_KEYWORDS = ['无', '不限', '应届']
+
+
+def _first_two(series, pattern):
+    """
+    提取前两个匹配的数字，与 `re.findall(pattern)[:2]` 的结果相同。
+    """
+    # re.S: 职位信息中可能含有换行，两个数字之间的任意字符也需要匹配换行
+    return series.str.extract(f'({pattern})(?:.*?({pattern}))?', flags=re.S, expand=True)
+
+
+def normalize_salary(salary):
+    """
+    解析一列薪资字符串。
+
+    Args:
+        salary (pd.Series): 薪资字符串，空值视为空字符串。
+
+    Returns:
+        pd.DataFrame: 与输入索引相同，包含 min_pay、max_pay、ave_pay 三列，无法解析的行为 NaN。
+    """
+    s = salary.fillna('').astype(str)
+    multiplier = np.where(s.str.contains('年', regex=False), 1 / 12,
+                          np.where(s.str.contains('天', regex=False), 30, 1))
+    unit = np.where(s.str.contains('万', regex=False), 10000,
+                    np.where(s.str.contains('千', regex=False), 1000, 1))
+    count = s.str.count(SALARY_NUMBER).values
+    numbers = _first_two(s, SALARY_NUMBER).astype(float)
+    # 与逐行实现保持相同的运算顺序: 数字 * 单位 * 周期系数
+    low = numbers[0].values * unit * multiplier
+    high = numbers[1].values * unit * multiplier
+    is_range, is_single = count == 2, count == 1
+    min_pay = np.where(is_range | is_single, np.round(low), np.nan)
+    max_pay = np.where(is_range, np.round(high), np.where(is_single, np.round(low), np.nan))
+    ave_pay = np.where(is_range, np.round((low + high) / 2), np.where(is_single, np.round(low), np.nan))
+    return pd.DataFrame({'min_pay': min_pay, 'max_pay': max_pay, 'ave_pay': ave_pay},
+                        index=salary.index, columns=['min_pay', 'max_pay', 'ave_pay'])
+
+
+def normalize_experience(experience):
+    """
+    解析一列工作经验字符串。
+
+    Args:
+        experience (pd.Series): 工作经验字符串，空值视为空字符串。
+
+    Returns:
+        pd.Series: 与输入索引相同，值为年数字符串，无法解析的行为 None。
+    """
+    s = experience.fillna('').astype(str)
+    count = s.str.count(EXPERIENCE_NUMBER).values
+    numbers = _first_two(s, EXPERIENCE_NUMBER)
+    first = numbers[0].values
+    average = ((pd.to_numeric(numbers[0]) + pd.to_numeric(numbers[1])) // 2).values
+    no_experience = np.zeros(len(s), dtype=bool)
+    for keyword in NO_EXPERIENCE_KEYWORDS:
+        no_experience |= s.str.contains(keyword, regex=False).values
+    result = np.full(len(s), None, dtype=object)
+    # 优先级与逐行实现相同: 两个数字 > 一个数字 > 无经验关键词
+    keyword_rows = no_experience & (count != 2) & (count != 1) & (s.values != '')
+    result[keyword_rows] = '0'
+    result[count == 1] = first[count == 1]
+    result[count == 2] = [str(int(v)) for v in average[count == 2]]
+    return pd.Series(result, index=experience.index, dtype=object)
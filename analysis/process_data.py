@@ -13,14 +13,60 @@
 #  2. `main` 函数按注册顺序依次调用这些函数。
 #  3. 清洗薪资字段，从中提取并计算最低、最高和平均薪资（月薪）。
 #  4. 统一工作经验字段的格式，将其转换为数字。
-#  5. 基于职位名称中的关键词，创建多个 SQL 视图 (VIEW)，对职位进行分类。
-#     这样做的好处是避免了修改原始数据，并且可以灵活地进行多维度分析。
+#     第 3、4 步由 `normalize` 模块向量化解析。每种原始写法只解析一次，结果保存在
+#     字典表 `norm_salary` / `norm_experience` 中跨运行复用，再通过联表更新一次性写回。
+#  5. 基于职位名称中的关键词对职位进行分类。每个职位只在导入后被分类一次，结果写入
+#     成员表 `job_category(job_id, category)`。全部规则的关键词编译为一个 Aho-Corasick
+#     自动机 (`keyword_matcher`)，每个标题只扫描一次；再为每个分类创建同名的 SQL 视图 (VIEW)，
+#     视图通过索引联表查询成员表，分析步骤仍然可以按原来的视图名称查询。
+#     视图和成员表都是原地原子替换的，预处理期间其他连接始终能查询到完整的旧版本。
+#     全量重建时，清洗和分类都在新表上进行，由 input_data.publish_build 一起替换正式表。
 #
 # ==============================================================================
 
-import re
+import hashlib
 import jieba  # 注意：jieba 模块被导入但在此文件中未被使用。
+import pandas as pd
 import analysis_main as A  # 导入中心枢纽以访问共享资源。
+import normalize
+from keyword_matcher import KeywordMatcher
+
+# 持久化的解析字典表（原始字符串 -> 解析结果），以及每批写入字典的行数
+SALARY_DICT_TABLE = 'norm_salary'
+EXPERIENCE_DICT_TABLE = 'norm_experience'
+NORM_BATCH_SIZE = 5000
+
+# 职位分类成员表，以及记录分类规则指纹的表
+CATEGORY_TABLE = 'job_category'
+CATEGORY_RULES_TABLE = 'job_category_rules'
+
+# 职位分类规则，分类名称同时也是对应视图的名称
+# 格式: '分类名称': (['包含的关键词列表'], ['排除的关键词列表' or None])
+JOB_CATEGORY_RULES = {
+    'XXXX讲师': (['讲师'], None), '项目开发经理': (['经理'], None), '技术/研发总监': (['总监'], None),
+    '大数据开发工程师': (['大数据'], None), '技术/研究/项目负责人': (['负责人'], None), '服务器工程师': (['服务器'], None),
+    '数据库工程师': (['数据库'], None), '软件开发工程师': (['软件'], ['测试']), '建模工程师': (['建模'], None),
+    '硬件工程师': (['硬件'], None), '网络工程师': (['网络'], None), '人工智能开发工程师': (['人工智能'], None),
+    '后端工程师': (['后端'], None), '机器学习工程师': (['机器学习', '学习'], None), '数据挖掘/分析/处理工程师': (['数据'], ['管理']),
+    '数据管理工程师': (['数据管理'], None), 'Web前端工程师': (['前端'], None), '计算机维修/维护工程师': (['维修', '维护'], None),
+    'Java工程师': (['Java'], None), 'C++工程师': (['C++'], None), 'PHP工程师': (['PHP'], None),
+    'C#工程师': (['C#'], None), '.NET工程师': (['.Net'], None), 'Hadoop工程师': (['Hadoop'], None),
+    'Python工程师': (['Python'], None), 'Go工程师': (['Go'], None), 'Javascript工程师': (['Javascript'], None),
+    'Android开发工程师': (['Android'], None), 'IOS开发工程师': (['IOS'], None), 'BI工程师': (['BI'], None),
+    '软件开发': (['软件'], ['测试']), '人工智能': (['人工智能'], None),
+    '深度\\机器学习': (['学习'], None),
+    '数据': (['数据'], None), '算法': (['算法'], None), '测试': (['测试'], None),
+    '安全': (['安全'], None), '运维': (['运维'], None), 'UI': (['UI'], ['GUI']),
+    '区块链': (['区块链'], None), '网络': (['网络'], None), '硬件': (['硬件'], None), '物联网': (['物联网'], None), '游戏': (['游戏'], None)
+}
+# 用于宏观分析的分类: 标题包含新兴关键词的为新兴职业，其余为传统职业
+EMERGING_CATEGORY, TRADITIONAL_CATEGORY, BIG_DATA_CATEGORY = '新兴职业', '传统职业', '大数据职位'
+EMERGING_KEYWORDS = ['学习', '人工智能', '数据', '算法', '区块链', '视觉', '物联网', '自然语言']
+BIG_DATA_KEYWORDS = ['数据']
+# 由以上全部关键词编译的多关键词匹配器，与原先视图中的 LIKE 一样不区分大小写
+TITLE_MATCHER = KeywordMatcher(
+    [kw for include_kws, exclude_kws in JOB_CATEGORY_RULES.values() for kw in include_kws + (exclude_kws or [])]
+    + EMERGING_KEYWORDS + BIG_DATA_KEYWORDS)
 
 
 def ways(func):
@@ -43,142 +89,234 @@ def main():
     cursor = A.Analyze.cursor
     db = A.Analyze.db
 
-    # --- 1. 清理环境：删除上一次运行时创建的所有视图 ---
-    try:
-        cursor.execute("SHOW FULL TABLES WHERE TABLE_TYPE LIKE 'VIEW';")
-        views = cursor.fetchall()
-        for view in views:
-            cursor.execute(f"DROP VIEW IF EXISTS `{view[0]}`;")
-        db.commit()
-    except Exception as e:
-        print(f"清空旧视图时发生错误（可忽略）: {e}")
+    # 本次运行重新登记可用的视图（同一进程中多次运行分析时不会重复）
+    del A.Analyze.available_views[:]
 
-    # --- 2. 依次执行所有已注册的预处理函数 ---
+    # --- 1. 依次执行所有已注册的预处理函数 ---
+    # 视图不再预先全部删除，而是由 CREATE OR REPLACE 原子地替换，
+    # 预处理期间其他连接（如 /互动 接口）查询视图时不会遇到视图不存在的错误。
     print("开始执行数据预处理...")
     for fn in A.Analyze.process_fn_list:
         print(f"正在执行: {fn.__name__}...")
         fn()
         db.commit()  # 每个步骤后提交事务，确保数据更改生效。
+
+    # --- 2. 清理环境：删除分类规则中已不存在的旧视图 ---
+    try:
+        current = set(JOB_CATEGORY_RULES) | {EMERGING_CATEGORY, TRADITIONAL_CATEGORY, BIG_DATA_CATEGORY}
+        cursor.execute("SHOW FULL TABLES WHERE TABLE_TYPE LIKE 'VIEW';")
+        for view in cursor.fetchall():
+            if view[0] not in current:
+                cursor.execute(f"DROP VIEW IF EXISTS `{view[0]}`;")
+        db.commit()
+    except Exception as e:
+        print(f"清理旧视图时发生错误（可忽略）: {e}")
     print("数据预处理完成！")
 
 
+def _create_parse_dictionaries():
+    """
+    创建持久化的解析字典表（已存在时保持不变），并清除由旧版本解析规则生成的条目。
+    """
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS `{SALARY_DICT_TABLE}` (
+      `raw` VARCHAR(255) NOT NULL,
+      `min_pay` DOUBLE DEFAULT NULL,
+      `max_pay` DOUBLE DEFAULT NULL,
+      `ave_pay` DOUBLE DEFAULT NULL,
+      `version` INT NOT NULL,
+      PRIMARY KEY (`raw`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS `{EXPERIENCE_DICT_TABLE}` (
+      `raw` VARCHAR(255) NOT NULL,
+      `experience` VARCHAR(255) DEFAULT NULL,
+      `version` INT NOT NULL,
+      PRIMARY KEY (`raw`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    for table in (SALARY_DICT_TABLE, EXPERIENCE_DICT_TABLE):
+        cursor.execute(f"DELETE FROM `{table}` WHERE version <> %s", (normalize.VERSION,))
+
+
+def _extend_dictionary(table, column, parse, processed_batch):
+    """
+    找出待处理批次中字典里还没有的原始字符串，解析后写入字典。
+    无法解析的字符串同样写入（结果为 NULL），以后不会再被重复解析。
+
+    Returns:
+        int: 新增的字典条目数。
+    """
+    cursor.execute(f"""
+    SELECT DISTINCT q.`{column}` FROM `{A.Analyze.job_table}` q LEFT JOIN `{table}` d ON d.raw = q.`{column}`
+    WHERE q.ingest_batch > %s AND d.raw IS NULL
+    """, (processed_batch,))
+    raw = pd.Series([row[0] for row in cursor.fetchall()], dtype=object)
+    if raw.empty:
+        return 0
+    result = parse(raw)
+    if isinstance(result, pd.Series):
+        result = result.to_frame(column)
+    result.insert(0, 'raw', raw)
+    result['version'] = normalize.VERSION
+    # NaN 转换为 None，写入数据库时即为 NULL
+    rows = [tuple(None if pd.isnull(v) else v for v in row)
+            for row in result.astype(object).itertuples(index=False)]
+    # 排序规则下视为相同的字符串（如大小写不同）解析结果相同，重复的条目直接忽略。
+    # pymysql 的 executemany 会把同一批数据拼接为多行 INSERT 语句。
+    sql = (f"INSERT IGNORE INTO `{table}` ({', '.join(result.columns)}) "
+           f"VALUES ({', '.join(['%s'] * len(result.columns))})")
+    for i in range(0, len(rows), NORM_BATCH_SIZE):
+        cursor.executemany(sql, rows[i:i + NORM_BATCH_SIZE])
+    return len(rows)
+
+
 @ways
 def qcwy_clean_salary_and_experience():
     """
-    负责清洗 `qcwy` 表中的薪资 (salary) 和工作经验 (experience) 字段。
+    负责清洗 `qcwy` 表（全量重建时为新表 `A.Analyze.job_table`）中的薪资 (salary) 和工作经验 (experience) 字段。
     将非结构化的文本转换为结构化的数值，并填充到 `min_pay`, `max_pay`, `ave_pay` 等列。
+    只处理尚未清洗过的导入批次（新增或内容变化的职位），已清洗的行不会被重复处理。
+
+    不同的原始字符串只有几千种，解析结果保存在持久化的字典表中，跨运行复用；
+    每次只解析字典中尚未出现的字符串，再用一条 `UPDATE ... JOIN` 把字典应用到所有待处理的行。
     """
-    print("  -> 正在清洗薪资和经验数据...")
+    processed_batch = A.Analyze.processed_batch
+    table = A.Analyze.job_table
+    print(f"  -> 正在清洗薪资和经验数据（导入批次 {processed_batch + 1} 至 {A.Analyze.ingest_batch}）...")
     # 将 NULL 值更新为空字符串，便于后续处理。
-    cursor.execute("UPDATE qcwy SET salary = '' WHERE salary IS NULL;")
-    cursor.execute("UPDATE qcwy SET experience = '' WHERE experience IS NULL;")
-
-    cursor.execute("SELECT id, salary, experience FROM qcwy")
-    all_data = cursor.fetchall()
-
-    update_salary_list = []      # 存储待更新的薪资数据 (min, max, avg, id)
-    update_experience_list = []  # 存储待更新的经验数据 (exp_str, id)
-
-    for row in all_data:
-        row_id, salary_str, exp_str = row
-        min_pay, max_pay, ave_pay = None, None, None
-
-        # --- 薪资清洗逻辑 ---
-        if salary_str:
-            multiplier = 1
-            if '年' in salary_str:
-                multiplier = 1 / 12  # 年薪转月薪
-            elif '天' in salary_str:
-                multiplier = 30      # 日薪转月薪
-            unit_multiplier = 1
-            if '万' in salary_str:
-                unit_multiplier = 10000
-            elif '千' in salary_str:
-                unit_multiplier = 1000
-
-            # 提取所有数字
-            numbers = re.findall(r'(\d+\.?\d*)', salary_str)
-            if len(numbers) == 2:  # 处理范围薪资，如 "1.5-2万/月"
-                try:
-                    min_val = float(numbers[0]) * unit_multiplier * multiplier
-                    max_val = float(numbers[1]) * unit_multiplier * multiplier
-                    min_pay, max_pay, ave_pay = round(min_val), round(max_val), round((min_val + max_val) / 2)
-                except (ValueError, IndexError):
-                    pass
-            elif len(numbers) == 1:  # 处理固定薪资，如 "15万/年"
-                try:
-                    val = float(numbers[0]) * unit_multiplier * multiplier
-                    min_pay = max_pay = ave_pay = round(val)
-                except (ValueError, IndexError):
-                    pass
-
-        if ave_pay is not None:
-            update_salary_list.append((min_pay, max_pay, ave_pay, row_id))
-
-        # --- 工作经验清洗逻辑 ---
-        exp_num_str = None
-        if exp_str:
-            exp_numbers = re.findall(r'\d+', exp_str)
-            if len(exp_numbers) == 2:  # 处理范围经验，如 "3-4年" -> "3"
-                exp_num_str = str((int(exp_numbers[0]) + int(exp_numbers[1])) // 2)
-            elif len(exp_numbers) == 1:  # 处理固定经验，如 "1年" -> "1"
-                exp_num_str = exp_numbers[0]
-            elif any(kw in exp_str for kw in ['无', '不限', '应届']) or exp_str == '':
-                exp_num_str = '0'  # 无经验统一为 0
-
-        if exp_num_str is not None:
-            update_experience_list.append((exp_num_str, row_id))
-
-    # --- 批量更新数据库 ---
-    # 使用 executemany 进行批量更新，比单条循环更新效率高得多。
-    if update_salary_list:
-        cursor.executemany("UPDATE qcwy SET min_pay=%s, max_pay=%s, ave_pay=%s WHERE id=%s", update_salary_list)
-        print(f"  -> 已更新 {len(update_salary_list)} 条薪资数据。")
-
-    if update_experience_list:
-        cursor.executemany("UPDATE qcwy SET experience=%s WHERE id=%s", update_experience_list)
-        print(f"  -> 已更新 {len(update_experience_list)} 条经验数据。")
+    cursor.execute(f"UPDATE `{table}` SET salary = '' WHERE salary IS NULL AND ingest_batch > %s;",
+                   (processed_batch,))
+    cursor.execute(f"UPDATE `{table}` SET experience = '' WHERE experience IS NULL AND ingest_batch > %s;",
+                   (processed_batch,))
+
+    # --- 只解析新出现的字符串，扩充字典 ---
+    _create_parse_dictionaries()
+    new_salary = _extend_dictionary(SALARY_DICT_TABLE, 'salary', normalize.normalize_salary, processed_batch)
+    new_experience = _extend_dictionary(EXPERIENCE_DICT_TABLE, 'experience', normalize.normalize_experience,
+                                        processed_batch)
+    print(f"  -> 新解析 {new_salary} 种薪资写法、{new_experience} 种经验写法。")
+
+    # --- 用字典一次性更新待处理的行；无法解析的字段保持原值 ---
+    salary_rows = cursor.execute(f"""
+    UPDATE `{table}` q JOIN `{SALARY_DICT_TABLE}` d ON d.raw = q.salary
+    SET q.min_pay = d.min_pay, q.max_pay = d.max_pay, q.ave_pay = d.ave_pay
+    WHERE q.ingest_batch > %s AND d.ave_pay IS NOT NULL;
+    """, (processed_batch,))
+    experience_rows = cursor.execute(f"""
+    UPDATE `{table}` q JOIN `{EXPERIENCE_DICT_TABLE}` d ON d.raw = q.experience
+    SET q.experience = d.experience
+    WHERE q.ingest_batch > %s AND d.experience IS NOT NULL;
+    """, (processed_batch,))
+    print(f"  -> 已更新 {salary_rows} 条薪资数据，{experience_rows} 条经验数据。")
+
+
+def _match_rule(found, include_kws, exclude_kws):
+    """
+    判断一条分类规则是否成立: 标题中出现了任一 include 关键词，且没有出现任何 exclude 关键词。
+
+    Args:
+        found (set): 由 `TITLE_MATCHER` 找出的、标题中出现的全部关键词。
+    """
+    return any(kw in found for kw in include_kws) and not any(kw in found for kw in exclude_kws or ())
+
+
+def classify_title(title):
+    """
+    计算一个职位标题所属的全部分类。标题为空 (NULL) 的职位不属于任何分类。
+    所有规则的关键词由同一个自动机在一次扫描中找出，再按集合判断每条规则。
+
+    Returns:
+        list: 分类名称列表，名称与同名视图一致。
+    """
+    if title is None:
+        return []
+    found = TITLE_MATCHER.find(title)
+    categories = [name for name, (include_kws, exclude_kws) in JOB_CATEGORY_RULES.items()
+                  if _match_rule(found, include_kws, exclude_kws)]
+    categories.append(EMERGING_CATEGORY if _match_rule(found, EMERGING_KEYWORDS, None) else TRADITIONAL_CATEGORY)
+    if _match_rule(found, BIG_DATA_KEYWORDS, None):
+        categories.append(BIG_DATA_CATEGORY)
+    return categories
+
+
+def _rules_signature():
+    """
+    分类规则的指纹。规则被修改后指纹随之变化，已有的分类结果需要全部重新计算。
+    """
+    rules = (list(JOB_CATEGORY_RULES.items()), EMERGING_KEYWORDS, BIG_DATA_KEYWORDS)
+    return hashlib.sha1(repr(rules).encode('utf-8')).hexdigest()
 
 
 @ways
-def qcwy_create_job_views():
+def qcwy_classify_jobs():
     """
-    根据职位标题的关键词，创建一系列 SQL 视图 (VIEW) 来对工作进行分类。
+    对职位进行一次性分类，把结果写入成员表 `job_category(job_id, category)`。
+    每个职位只在导入（新增或标题变化）后被分类一次，所有规则在同一次遍历中求值；
+    分类视图随后通过 (category, job_id) 索引联表查询，不再对 `qcwy` 反复执行前导通配符的 LIKE 扫描。
+    全量重建时，职位表和成员表分别为新表 `A.Analyze.job_table` 和 `A.Analyze.category_table`。
     """
-    print("  -> 正在创建职位分类视图...")
+    table, category_table = A.Analyze.job_table, A.Analyze.category_table
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS `{category_table}` (
+      `job_id` INT NOT NULL,
+      `category` VARCHAR(64) NOT NULL,
+      PRIMARY KEY (`category`, `job_id`),
+      KEY `idx_job_id` (`job_id`)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS `{CATEGORY_RULES_TABLE}` (
+      `signature` CHAR(40) NOT NULL
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+    """)
+    cursor.execute(f"SELECT signature FROM `{CATEGORY_RULES_TABLE}`")
+    row = cursor.fetchone()
+    signature = _rules_signature()
+
+    processed_batch = A.Analyze.processed_batch
+    # 首次运行、全量重新导入 (职位 id 会被复用) 或规则变化时，清空后对全部职位重新分类
+    if processed_batch == 0 or not row or row[0] != signature:
+        print("  -> 对全部职位重新分类...")
+        # 使用 DELETE 而不是 TRUNCATE（会隐式提交），中断时分类结果与规则指纹一起回滚
+        cursor.execute(f"DELETE FROM `{category_table}`")
+        cursor.execute(f"DELETE FROM `{CATEGORY_RULES_TABLE}`")
+        cursor.execute(f"INSERT INTO `{CATEGORY_RULES_TABLE}` (signature) VALUES (%s)", (signature,))
+        processed_batch = 0
+    else:
+        # 只重新分类待处理批次中的职位，先删除它们旧的分类
+        cursor.execute(f"DELETE c FROM `{category_table}` c JOIN `{table}` q ON q.id = c.job_id "
+                       f"WHERE q.ingest_batch > %s", (processed_batch,))
+
+    cursor.execute(f"SELECT id, title FROM `{table}` WHERE ingest_batch > %s", (processed_batch,))
+    rows = [(job_id, category) for job_id, title in cursor.fetchall() for category in classify_title(title)]
+    sql = f"INSERT INTO `{category_table}` (job_id, category) VALUES (%s, %s)"
+    for i in range(0, len(rows), NORM_BATCH_SIZE):
+        cursor.executemany(sql, rows[i:i + NORM_BATCH_SIZE])
+    print(f"  -> 已写入 {len(rows)} 条职位分类记录。")
+
+
+def _create_category_view(view_name):
+    """
+    创建一个按分类成员表筛选 `qcwy` 的视图，视图名即分类名。
+    """
+    # 对视图名称进行转义，防止SQL注入（虽然这里是内部定义，但仍是好习惯）
+    safe_view_name = view_name.replace("`", "``")
+    # 分类名作为参数由 pymysql 转义（例如 '深度\\机器学习' 中的反斜杠）
+    cursor.execute(f"CREATE OR REPLACE VIEW `{safe_view_name}` AS SELECT q.* FROM qcwy q "
+                   f"JOIN `{CATEGORY_TABLE}` c ON c.job_id = q.id WHERE c.category = %s", (view_name,))
 
-    # 定义视图名称与关键词的映射关系
-    # 格式: '视图名称': (['包含的关键词列表'], ['排除的关键词列表' or None])
-    views_to_create = {
-        'XXXX讲师': (['讲师'], None), '项目开发经理': (['经理'], None), '技术/研发总监': (['总监'], None),
-        '大数据开发工程师': (['大数据'], None), '技术/研究/项目负责人': (['负责人'], None), '服务器工程师': (['服务器'], None),
-        '数据库工程师': (['数据库'], None), '软件开发工程师': (['软件'], ['测试']), '建模工程师': (['建模'], None),
-        '硬件工程师': (['硬件'], None), '网络工程师': (['网络'], None), '人工智能开发工程师': (['人工智能'], None),
-        '后端工程师': (['后端'], None), '机器学习工程师': (['机器学习', '学习'], None), '数据挖掘/分析/处理工程师': (['数据'], ['管理']),
-        '数据管理工程师': (['数据管理'], None), 'Web前端工程师': (['前端'], None), '计算机维修/维护工程师': (['维修', '维护'], None),
-        'Java工程师': (['Java'], None), 'C++工程师': (['C++'], None), 'PHP工程师': (['PHP'], None),
-        'C#工程师': (['C#'], None), '.NET工程师': (['.Net'], None), 'Hadoop工程师': (['Hadoop'], None),
-        'Python工程师': (['Python'], None), 'Go工程师': (['Go'], None), 'Javascript工程师': (['Javascript'], None),
-        'Android开发工程师': (['Android'], None), 'IOS开发工程师': (['IOS'], None), 'BI工程师': (['BI'], None),
-        '软件开发': (['软件'], ['测试']), '人工智能': (['人工智能'], None),
-        '深度\\机器学习': (['学习'], None),
-        '数据': (['数据'], None), '算法': (['算法'], None), '测试': (['测试'], None),
-        '安全': (['安全'], None), '运维': (['运维'], None), 'UI': (['UI'], ['GUI']),
-        '区块链': (['区块链'], None), '网络': (['网络'], None), '硬件': (['硬件'], None), '物联网': (['物联网'], None), '游戏': (['游戏'], None)
-    }
-
-    for view_name, (include_kws, exclude_kws) in views_to_create.items():
-        include_cond = " OR ".join([f"title LIKE '%{kw}%'" for kw in include_kws])
-        exclude_cond = ""
-        if exclude_kws:
-            exclude_cond = " AND " + " AND ".join([f"title NOT LIKE '%{kw}%'" for kw in exclude_kws])
-
-        # 对视图名称进行转义，防止SQL注入（虽然这里是内部定义，但仍是好习惯）
-        safe_view_name = view_name.replace("'", "''")
-        sql = f"CREATE OR REPLACE VIEW `{safe_view_name}` AS SELECT * FROM qcwy WHERE ({include_cond}) {exclude_cond}"
 
+@ways
+def qcwy_create_job_views():
+    """
+    为每个职位分类创建同名的 SQL 视图 (VIEW)，供分析步骤按名称查询。
+    """
+    print("  -> 正在创建职位分类视图...")
+    for view_name in JOB_CATEGORY_RULES:
         try:
-            cursor.execute(sql)
+            _create_category_view(view_name)
             # 将成功创建的视图名称添加到全局可用视图列表中
             A.Analyze.available_views.append(view_name)
         except Exception as e:
@@ -191,12 +329,6 @@ def qcwy_create_other_views():
     创建一些特定的、用于宏观分析的视图，如“新兴职业”与“传统职业”。
     """
     print("  -> 正在创建其他分析视图...")
-    emerging_keywords = ['学习', '人工智能', '数据', '算法', '区块链', '视觉', '物联网', '自然语言']
-    emerging_cond = " OR ".join([f"title LIKE '%{kw}%'" for kw in emerging_keywords])
-
-    # 创建新兴职业视图
-    cursor.execute(f"CREATE OR REPLACE VIEW `新兴职业` AS SELECT * FROM qcwy WHERE {emerging_cond}")
-    # 创建传统职业视图
-    cursor.execute(f"CREATE OR REPLACE VIEW `传统职业` AS SELECT * FROM qcwy WHERE NOT ({emerging_cond})")
-    # 创建大数据职位视图
-    cursor.execute("CREATE OR REPLACE VIEW `大数据职位` AS SELECT * FROM qcwy WHERE title LIKE '%数据%'")
\ No newline at end of file
+    # 创建新兴职业、传统职业和大数据职位视图
+    for view_name in (EMERGING_CATEGORY, TRADITIONAL_CATEGORY, BIG_DATA_CATEGORY):
+        _create_category_view(view_name)
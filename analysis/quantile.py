@@ -0,0 +1,121 @@
+# /analysis/quantile.py
+
+# ==============================================================================
+#  数据分析模块 - 精确的流式分位数与箱线图统计
+# ==============================================================================
+#
+#  说明:
+#  图表 1 的箱线图原先把每个职位的薪资放进 Python 列表，再交给
+#  `pyecharts.Boxplot.prepare_data` 排序取分位数，为控制内存还用 `LIMIT 10000`
+#  只取了前一万条，实际上只是一个样本。此模块提供一个精确、可流式累加的聚合器:
+#
+#  1. 只保存 "不同取值 -> 出现次数" 的直方图。薪资已取整为元，不同取值的数量
+#     远小于职位数量，内存占用与数据总量无关。
+#  2. 数据可以分批 `add`（每批附带可选的权重），多个聚合器可以 `merge`，
+#     结果与一次性对全部数据排序完全相同，没有近似误差。
+#  3. 按累计次数定位任意位次的值 (`nth`)，在此基础上计算分位数和箱线图。
+#     `boxplot()` 的取值规则与 `prepare_data` 一致，可直接用于 pyecharts 的箱线图。
+#
+# ==============================================================================
+
+import numpy as np
+
+
+class QuantileAggregator(object):
+    """
+    精确的流式分位数聚合器。
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._sorted = None
+
+    def add(self, values, weights=None):
+        """
+        累加一批数据。
+
+        Args:
+            values (array-like): 数值，NaN 会被忽略。
+            weights (array-like): 每个数值出现的次数，默认均为 1。
+        """
+        values = np.asarray(values, dtype=float)
+        weights = np.ones(len(values), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        keep = ~np.isnan(values) & (weights > 0)
+        # 先在本批内合并相同的取值，再累加到直方图
+        unique, inverse = np.unique(values[keep], return_inverse=True)
+        totals = np.bincount(inverse, weights=weights[keep]) if unique.size else []
+        for value, count in zip(unique.tolist(), totals):
+            self._counts[value] = self._counts.get(value, 0) + int(count)
+        self._sorted = None
+        return self
+
+    def merge(self, other):
+        """把另一个聚合器的数据合并进来。"""
+        for value, count in other._counts.items():
+            self._counts[value] = self._counts.get(value, 0) + count
+        self._sorted = None
+        return self
+
+    def _table(self):
+        if self._sorted is None:
+            values = np.array(sorted(self._counts), dtype=float)
+            cumulative = np.array([self._counts[v] for v in values], dtype=np.int64).cumsum()
+            self._sorted = (values, cumulative)
+        return self._sorted
+
+    @property
+    def count(self):
+        """已累加的数据总数。"""
+        cumulative = self._table()[1]
+        return int(cumulative[-1]) if cumulative.size else 0
+
+    def trimmed(self):
+        """
+        返回去掉最小值和最大值（所有等于它们的数据）之后的新聚合器。
+        """
+        result = QuantileAggregator()
+        for value in sorted(self._counts)[1:-1]:
+            result._counts[value] = self._counts[value]
+        return result
+
+    def nth(self, i):
+        """
+        返回排序后第 i 个（从 0 开始，负数从末尾计）值，越界时与列表下标一样抛出 IndexError。
+        """
+        values, cumulative = self._table()
+        total = self.count
+        if i >= total or i < -total:
+            raise IndexError(i)
+        return float(values[np.searchsorted(cumulative, i % total, side='right')])
+
+    def quantile(self, q):
+        """
+        返回 q 分位数 (0 <= q <= 1)，在相邻两个值之间线性插值（与 numpy 的默认方法相同）。
+        """
+        position = q * (self.count - 1)
+        low = int(position)
+        if position == low:
+            return self.nth(low)
+        return self.nth(low) + (self.nth(low + 1) - self.nth(low)) * (position - low)
+
+    def boxplot(self):
+        """
+        计算箱线图数据 [最小值, Q1, 中位数, Q3, 最大值]，
+        规则与 `pyecharts.Boxplot.prepare_data` 相同（Q_i 位于第 i*(n+1)/4 个值）。
+
+        Returns:
+            list: 箱线图数据；数据不足以计算（prepare_data 会跳过该组）时返回 None。
+        """
+        try:
+            result = [self.nth(0)]
+            for i in range(1, 4):
+                n = i * (self.count + 1) / 4
+                m = n - int(n)
+                if m:
+                    result.append(self.nth(int(n) - 1) * (1 - m) + self.nth(int(n)) * m)
+                else:
+                    result.append(self.nth(int(n) - 1))
+            result.append(self.nth(-1))
+        except IndexError:
+            return None
+        return result
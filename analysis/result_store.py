@@ -0,0 +1,192 @@
+# /analysis/result_store.py
+
+# ==============================================================================
+#  数据分析模块 - 分析结果存储
+# ==============================================================================
+#
+#  说明:
+#  分析结果原先由 `analyze_data` 用 `str()` 转换成 Python 字面量写入 `conf.ini`，
+#  服务器读取时解析整个文件，再对每个参数调用 `eval`。这样既慢（例如 `chart.3.3`
+#  这样的大参数）、也不安全，写入和读取的编码不一致时还会得到乱码。
+#  此模块把分析结果保存为带格式版本号的 JSON 文件，每个图表一个文件。
+#
+#  核心功能:
+#  1. 版本化的快照: 每次分析把结果写入一个新的代目录 `<目录>/<代号>/`，其中每个图表
+#     一个 `<编号>.json`，以及记录格式版本、生成时间和图表列表的 `manifest.json`。
+#     代目录写完（并预渲染图表片段）之后，再原子地替换指针文件 `CURRENT`，
+#     读取方只会看到完整的旧快照或完整的新快照，分析期间读取不受影响。
+#  2. `create(results)` 创建新的一代，`publish(generation)` 切换 `CURRENT` 并清理
+#     过旧的代（保留最近的几代，正在读取旧快照的请求不会失败）。
+#  3. `read(chart)`: 只读取并解析当前快照中一个图表的文件，返回按顺序排列的参数列表。
+#  4. `version()`: 返回 (发布时间, 代号)，供图表缓存判断是否失效。
+#     格式版本与当前代码不一致的旧结果按 "尚未生成" 处理，需要重新运行分析。
+#
+# ==============================================================================
+
+import datetime
+import json
+import os
+import shutil
+import time
+
+# 结果文件的格式版本，文件结构变化时递增
+SCHEMA_VERSION = 1
+# 默认的结果目录
+RESULT_DIR = 'data/results'
+MANIFEST = 'manifest.json'
+# 指向当前快照的指针文件
+CURRENT = 'CURRENT'
+# 保留的快照代数（含当前一代）
+KEEP_GENERATIONS = 3
+
+
+def _to_builtin(obj):
+    """
+    json 序列化时的回调：把 numpy/pandas 的标量和数组转换为 Python 内置类型。
+    """
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    raise TypeError(f"无法序列化的分析结果类型: {type(obj).__name__}")
+
+
+def _write_json(path, data):
+    """先写入临时文件再原子替换，读取方只会看到完整的旧文件或新文件。"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=_to_builtin)
+    os.replace(tmp_path, path)
+
+
+def _split_key(key):
+    """'chart.3.2' -> ('3', 2)"""
+    _, chart, index = key.split('.')
+    return chart, int(index)
+
+
+class ResultStore(object):
+    """
+    按快照和图表存储的分析结果。
+
+    Args:
+        directory (str): 结果目录。
+        generation (str): 读取指定的一代；默认读取 `CURRENT` 指向的当前快照。
+    """
+
+    def __init__(self, directory=RESULT_DIR, generation=None):
+        self.directory = directory
+        self.generation = generation
+        self.current_path = os.path.join(directory, CURRENT)
+
+    def generation_path(self, generation):
+        """返回某一代快照的目录。"""
+        return os.path.join(self.directory, generation)
+
+    def current(self):
+        """返回当前快照的代号；尚未发布任何快照时返回 None。"""
+        try:
+            with open(self.current_path, encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def version(self):
+        """
+        返回当前分析结果的版本 (发布时间, 代号)；尚未发布任何快照时返回 None。
+        """
+        try:
+            published = os.stat(self.current_path).st_mtime
+        except OSError:
+            return None
+        generation = self.current()
+        return (published, generation) if generation else None
+
+    def create(self, results):
+        """
+        把一次分析的全部结果写入新的一代快照，此时尚未发布。
+
+        Args:
+            results (dict): 键为 'chart.<编号>.<序号>'，值为可 JSON 序列化的数据。
+
+        Returns:
+            str: 新快照的代号。
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        # 代号按时间排序；同一时刻创建多代时追加序号
+        base = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        generation, n = base, 0
+        while True:
+            try:
+                os.mkdir(self.generation_path(generation))
+                break
+            except FileExistsError:
+                n += 1
+                generation = f'{base}-{n}'
+
+        charts = {}
+        for key, value in results.items():
+            chart, index = _split_key(key)
+            charts.setdefault(chart, {})[index] = value
+
+        path = self.generation_path(generation)
+        for chart, values in charts.items():
+            # 参数按序号排列，遇到缺失的序号即停止，与图表函数依次读取参数的方式一致
+            params = []
+            while len(params) + 1 in values:
+                params.append(values[len(params) + 1])
+            _write_json(os.path.join(path, f'{chart}.json'),
+                        {'schema': SCHEMA_VERSION, 'chart': chart, 'params': params})
+
+        # manifest 最后写入，存在 manifest 的代才是完整的
+        _write_json(os.path.join(path, MANIFEST),
+                    {'schema': SCHEMA_VERSION, 'created': time.time(), 'charts': sorted(charts, key=int)})
+        return generation
+
+    def publish(self, generation):
+        """
+        原子地把 `CURRENT` 指向给定的一代，并删除过旧的快照。
+        """
+        tmp_path = f'{self.current_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(generation)
+        os.replace(tmp_path, self.current_path)
+        self.prune(generation)
+
+    def prune(self, current, keep=KEEP_GENERATIONS):
+        """
+        删除除最近 `keep` 代之外的快照目录，当前快照始终保留。
+        """
+        generations = sorted(name for name in os.listdir(self.directory)
+                             if os.path.isdir(self.generation_path(name)))
+        for name in generations[:-keep]:
+            if name != current:
+                shutil.rmtree(self.generation_path(name), ignore_errors=True)
+
+    def read(self, chart):
+        """
+        读取一个图表的参数列表。
+
+        Returns:
+            list: 按序号排列的参数；该快照中没有该图表的数据时返回空列表。
+
+        Raises:
+            FileNotFoundError: 结果尚未生成，或由不兼容的旧版本生成。
+        """
+        generation = self.generation or self.current()
+        if generation is None:
+            raise FileNotFoundError("尚未生成分析结果，请先运行数据分析")
+        path = self.generation_path(generation)
+        try:
+            with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"分析结果快照 {generation} 不存在或不完整")
+        if manifest.get('schema') != SCHEMA_VERSION:
+            raise FileNotFoundError("分析结果的格式版本已过期，请重新运行数据分析")
+
+        try:
+            with open(os.path.join(path, f'{chart}.json'), encoding='utf-8') as f:
+                return json.load(f)['params']
+        except FileNotFoundError:
+            return []
@@ -0,0 +1,141 @@
+# /jobs.py
+
+# ==============================================================================
+#  后台任务 - 爬虫与数据分析的任务队列和任务进程
+# ==============================================================================
+#
+#  说明:
+#  爬虫和数据分析原先以 `threading.Thread` 的形式运行在 Web 服务器进程中，
+#  与图表、接口请求争用同一个 GIL；Web 服务器以多进程方式运行时，每个进程
+#  还会各自启动任务。此模块把长时间运行的任务移到一个独立的任务进程中。
+#
+#  核心功能:
+#  1. `python jobs.py` 启动任务进程。它在本机地址上通过 `multiprocessing.managers`
+#     提供一个任务队列，收到的每个任务在进程内的后台线程中执行；
+#     数据分析任务依次执行，同一时间只运行一个。
+#  2. `submit(kind, params)`: Web 进程把任务 ('spider' 或 'analysis') 放入队列后立即返回。
+#     任务进程未启动时抛出 ConnectionError。
+#  3. 认证密钥: 管理器会反序列化收到的数据，因此不使用固定的默认密钥。
+#     任务进程首次启动时生成随机密钥，保存在只有当前用户可读写 (0600) 的
+#     `data/job_queue.key` 中，Web 进程从同一文件读取；也可以用环境变量
+#     JOB_QUEUE_AUTHKEY 指定。
+#  4. `run_job(kind, params)`: 实际执行任务，开发模式下服务器也在线程中直接调用它。
+#  爬虫进度通过 `data/crawl_metrics.json`、分析结果通过结果快照与 Web 进程共享，
+#  无论任务运行在哪个进程中，页面都能看到。
+#
+# ==============================================================================
+
+import os
+import queue
+import secrets
+import threading
+import traceback
+from multiprocessing.managers import BaseManager
+
+from analysis import analysis_main
+from spider import spider_main
+
+# 任务队列只监听本机地址；端口可以通过环境变量修改
+ADDRESS = ('127.0.0.1', int(os.environ.get('JOB_QUEUE_PORT', 50007)))
+# 任务进程生成的认证密钥文件
+AUTHKEY_FILE = 'data/job_queue.key'
+JOB_KINDS = ('spider', 'analysis')
+
+# 数据分析共享同一个数据库连接和结果目录，同一时间只运行一个
+_analysis_lock = threading.Lock()
+
+
+class JobManager(BaseManager):
+    """通过本机套接字共享任务队列的管理器。"""
+
+
+JobManager.register('get_queue')
+
+
+def load_authkey(path=AUTHKEY_FILE, create=False):
+    """
+    返回任务队列的认证密钥。环境变量 JOB_QUEUE_AUTHKEY 优先；否则读取密钥文件，
+    `create` 为 True 且文件不存在时生成随机密钥，以 0600 权限写入。
+
+    Raises:
+        ConnectionError: 密钥文件不存在（任务进程从未启动）且 `create` 为 False。
+    """
+    key = os.environ.get('JOB_QUEUE_AUTHKEY')
+    if key:
+        return key.encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        if not create:
+            raise ConnectionError(f"找不到任务队列密钥文件 {path}，任务进程尚未启动")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    key = secrets.token_hex(32).encode('ascii')
+    # O_EXCL: 多个任务进程同时启动时只有一个能创建文件
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+def run_job(kind, params=None):
+    """
+    执行一个任务，异常向上抛出。
+
+    Args:
+        kind (str): 'spider' 或 'analysis'。
+        params (dict): 爬虫参数，数据分析任务不需要。
+    """
+    if kind == 'spider':
+        spider_main.main(params)
+    elif kind == 'analysis':
+        with _analysis_lock:
+            analysis_main.Analyze.main()
+    else:
+        raise ValueError(f"未知的任务类型: {kind}")
+
+
+def submit(kind, params=None, address=ADDRESS, authkey=None):
+    """
+    把任务放入任务进程的队列后立即返回。
+
+    Raises:
+        ValueError: 未知的任务类型。
+        ConnectionError: 任务进程未启动。
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"未知的任务类型: {kind}")
+    manager = JobManager(address=address, authkey=authkey or load_authkey())
+    manager.connect()
+    manager.get_queue().put((kind, params))
+
+
+def _run_logged(kind, params):
+    print(f"任务开始: {kind}")
+    try:
+        run_job(kind, params)
+        print(f"任务完成: {kind}")
+    except Exception as e:
+        print(f"任务出错: {kind}: {e}")
+        traceback.print_exc()
+
+
+def serve(address=ADDRESS, authkey=None):
+    """
+    任务进程的主循环: 提供任务队列，并为每个收到的任务启动一个后台线程。
+    定时爬虫会一直运行，因此任务之间不互相等待（数据分析除外）。
+    """
+    jobs = queue.Queue()
+    JobManager.register('get_queue', callable=lambda: jobs)
+    server = JobManager(address=address, authkey=authkey or load_authkey(create=True)).get_server()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"任务进程已启动，监听 {address[0]}:{address[1]}")
+
+    while True:
+        kind, params = jobs.get()
+        threading.Thread(target=_run_logged, args=(kind, params), daemon=True).start()
+
+
+# --- 任务进程启动入口 ---
+if __name__ == '__main__':
+    serve()
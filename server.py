@@ -1,22 +1,31 @@
 # /.server.py
 
+import gzip
 import logging
 import os
 import threading
-import configparser
-from flask import Flask, render_template, request, url_for, jsonify
+from flask import Flask, render_template, request, url_for, jsonify, make_response, send_file
 
 # 导入项目内自定义模块
-from analysis import analysis_main, create_chart, interaction
-from spider import spider_main
+import jobs
+from analysis import chart_cache, create_chart, interaction, result_store
+from spider import csv_preview, crawl_metrics
 
 # --- Flask App 初始化与配置 ---
 
 app = Flask(__name__)
 # 设置静态文件缓存过期时间为0，确保在开发过程中对静态文件的修改能立即生效
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+# 后台任务的执行方式: 'thread' 在本进程的线程中执行（开发模式，`python server.py`）；
+# 'queue' 交给独立的任务进程 `jobs.py` 执行（生产模式，由 wsgi.py 设置）
+app.config.setdefault('JOB_BACKEND', 'thread')
 # 为模板中引用的JS文件设置远程主机路径
 REMOTE_HOST = "/static/js"
+# 爬虫结果的分页预览索引，在所有请求线程之间共享
+PREVIEW_INDEX = csv_preview.CsvRowIndex("data/qcwy.csv")
+# 分析结果存储，以及已渲染图表的缓存（分析结果更新后自动失效）
+RESULT_STORE = result_store.ResultStore()
+CHART_CACHE = chart_cache.ChartCache(RESULT_STORE)
 
 # --- 日志配置 ---
 
@@ -27,6 +36,43 @@ handler = logging.FileHandler(filename='log.txt', mode='a', encoding='utf-8')
 handler.setLevel(logging.WARNING)
 app.logger.addHandler(handler)
 
+# --- 后台任务 ---
+
+
+def start_job(kind, params=None):
+    """
+    在后台启动一个爬虫或数据分析任务，立即返回。
+
+    Returns:
+        bool: 任务是否已提交；生产模式下任务进程未启动时返回 False。
+    """
+    if app.config['JOB_BACKEND'] == 'queue':
+        try:
+            jobs.submit(kind, params)
+            return True
+        except ConnectionError as e:
+            app.logger.error(f"提交后台任务 {kind} 失败，任务进程 jobs.py 未启动: {e}")
+            return False
+
+    def run_in_thread():
+        print(f"后台任务 {kind} 开始...")
+        try:
+            jobs.run_job(kind, params)
+            print(f"后台任务 {kind} 完成！")
+        except Exception as e:
+            app.logger.error(f"后台任务 {kind} 出错: {e}", exc_info=True)
+            print(f"后台任务 {kind} 出错: {e}")
+            import traceback
+            traceback.print_exc()
+
+    threading.Thread(target=run_in_thread, daemon=True).start()
+    return True
+
+
+# 任务进程未启动时的提示
+JOB_QUEUE_DOWN = ("后台任务未能启动", "任务进程未运行，请先在服务器上执行 python jobs.py。")
+
+
 # --- 路由定义 ---
 
 
@@ -57,7 +103,16 @@ def get_spider():
     job_list = request.form.getlist('job')
     limit_per_task = int(request.form.get('limit', '999999'))
     use_concurrent = 'multithread' in request.form
+    # 工作者数量留空时由爬虫根据 CPU 核数自动决定
+    worker_count = int(request.form.get('workers') or 0) or None
+    backend = request.form.get('backend', 'auto')
+    engine = request.form.get('engine', 'pool')
+    # 可选的列式输出格式，留空表示只输出 CSV
+    columnar = request.form.get('columnar') or None
     enable_timer = 'enable_timer' in request.form
+    incremental = 'incremental' in request.form
+    # 断点续爬: 上一次相同参数的爬取中断时，从断点继续
+    resume = 'resume' in request.form
 
     # 构造定时器设置字典
     timer_settings = {
@@ -74,12 +129,20 @@ def get_spider():
         "job": job_list,
         "limit": limit_per_task,
         "concurrent": use_concurrent,
+        "workers": worker_count,
+        "backend": backend,
+        "engine": engine,
+        "incremental": incremental,
+        "columnar": columnar,
+        "resume": resume,
         "timer": timer_settings
     }
 
-    # 使用新线程在后台执行爬虫任务，避免阻塞 Web 服务器
-    spider_thread = threading.Thread(target=spider_main.main, args=(dict_parameter,), daemon=True)
-    spider_thread.start()
+    # 在后台执行爬虫任务，避免阻塞 Web 服务器
+    if not start_job('spider', dict_parameter):
+        title, message = JOB_QUEUE_DOWN
+        return render_template('task_feedback.html', title=title, message=message,
+                               back_url=url_for('ready_spider')), 503
 
     # 根据是否启用定时任务，向用户返回不同的反馈信息
     if enable_timer:
@@ -93,39 +156,52 @@ def get_spider():
 @app.route("/爬虫结果")
 def result_spider():
     """
-    展示爬虫抓取到的原始数据 HTML 文件。
-    如果文件不存在，则显示一个提示页面。
+    展示爬虫抓取到的原始数据预览页，数据由页面按需通过 /api/preview 分页加载。
+    如果数据文件不存在，则显示一个提示页面。
     """
-    file_path = os.path.join(app.root_path, 'static', 'html', 'data.html')
-    if os.path.exists(file_path):
-        # send_static_file 会处理正确的 MIME 类型
-        return app.send_static_file('html/data.html')
+    if os.path.exists(PREVIEW_INDEX.csv_path):
+        return render_template('preview.html', page_size=50)
     else:
         return render_template('no_res.html')
 
 
+@app.route("/api/preview")
+def preview_api():
+    """
+    分页读取爬虫结果。
+    参数: offset (起始行号), limit (行数), columns (逗号分隔的列名，可选)。
+    """
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', 50, type=int)
+    columns = [c for c in request.args.get('columns', '').split(',') if c]
+    return jsonify(PREVIEW_INDEX.page(offset, limit, columns))
+
+
+@app.route("/爬虫进度")
+def crawl_progress():
+    """
+    渲染爬虫实时进度页面，页面定时轮询 /api/crawl_metrics。
+    """
+    return render_template('progress.html')
+
+
+@app.route("/api/crawl_metrics")
+def crawl_metrics_api():
+    """
+    返回最近一次爬虫指标快照（吞吐量、在途请求、延迟直方图、错误数、预计剩余时间等）。
+    """
+    snapshot = crawl_metrics.read_snapshot()
+    return jsonify(snapshot or {"status": "idle"})
+
+
 @app.route("/分析")
 def analyse():
     """
     启动后台数据分析任务，并立即返回一个任务启动成功的反馈页面。
     """
-    def run_analysis_in_thread():
-        """
-        封装分析逻辑，以便在新线程中执行。
-        """
-        print("后台分析任务开始...")
-        try:
-            analysis_main.Analyze.main()
-            print("后台分析任务完成！")
-        except Exception as e:
-            app.logger.error(f"后台分析任务出错: {e}", exc_info=True)
-            print(f"后台分析任务出错: {e}")
-            import traceback
-            traceback.print_exc()
-
-    # 创建并启动后台分析线程
-    thread = threading.Thread(target=run_analysis_in_thread, daemon=True)
-    thread.start()
+    if not start_job('analysis'):
+        title, message = JOB_QUEUE_DOWN
+        return render_template('analysis_feedback.html', title=title, message=message), 503
     return render_template('analysis_feedback.html',
                            title="数据分析任务已启动",
                            message="我们正在后台处理数据，请稍后点击下方按钮查看结果。")
@@ -142,65 +218,61 @@ def showresult():
     return render_template("show_original.html", script_list=js_files, host=REMOTE_HOST)
 
 
+def render_chart(chart_id):
+    """
+    读取当前的分析结果，生成指定图表的 HTML 片段。只在缓存未命中时调用。
+    """
+    return create_chart.render(chart_id, RESULT_STORE)
+
+
+def send_fragment(path):
+    """
+    发送预渲染的 gzip 压缩片段。浏览器支持 gzip 时原样发送，否则解压后发送。
+    """
+    if 'gzip' in request.accept_encodings:
+        response = send_file(os.path.abspath(path), mimetype='text/html', conditional=True)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        with gzip.open(path, 'rb') as f:
+            response = make_response(f.read())
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.cache_control.no_cache = True
+    return response
+
+
 @app.route('/chart/<id>')
 def showresult1(id):
     """
-    根据提供的图表 ID, 动态生成并返回该图表的 HTML 片段。
+    根据提供的图表 ID, 返回该图表的 HTML 片段。
     这是一个被 /展示 页面 AJAX 请求的接口。
+    优先发送当前分析结果快照中预渲染的静态片段；
+    否则每次分析之后每个图表只渲染一次，之后直接返回缓存；
+    响应附带 ETag 和 Last-Modified，浏览器重复请求时返回 304。
     """
     try:
         chart_id = int(id)
-        all_chart_functions = create_chart.A.Analyze.chart_fn_list
-        conf = configparser.ConfigParser()
-        conf.read('conf.ini', encoding='utf-8')
-
-        if not conf.has_section('chart'):
-            raise FileNotFoundError("conf.ini中未找到[chart]节")
-
-        if chart_id >= len(all_chart_functions):
+        if chart_id >= len(create_chart.A.Analyze.chart_fn_list):
             return f"错误: 图表ID {chart_id} 超出范围。", 404
 
-        # 根据 ID 获取对应的图表生成函数
-        target_fn = all_chart_functions[chart_id]
-
-        def parameter_generator(fn, config):
-            """
-            一个生成器，用于从 conf.ini 文件中动态解析并提供图表函数所需的参数。
-            """
-            conf_chart = config['chart']
-            # 从函数名推断配置项的前缀，例如 't3' -> 'chart.3'
-            name = fn.__name__.replace('t', '')
-            i = 1
-            while True:
-                # 构造配置项的 key，如 chart.3.1, chart.3.2 ...
-                pa = f'chart.{name}.{i}'
-                value = conf_chart.get(pa)
-                if value is None:
-                    break  # 如果找不到配置项，则停止生成
-                # 使用 eval 执行字符串形式的参数，以支持列表、元组等复杂类型
-                yield eval(value)
-                i += 1
-
-        # 获取参数生成器
-        pa = parameter_generator(target_fn, conf)
-
-        # 调用图表函数并传入参数
-        chart_obj = target_fn(pa)
-        chart_obj.width = '100%'
-
-        # 对特定图表应用自定义的尺寸
-        if target_fn.__name__ in ['t3', 't12', 't21']:
-            chart_obj.width = 650
-            chart_obj.height = 500
-        elif target_fn.__name__ == 't6':
-            chart_obj.width = 1200
-            chart_obj.height = 600
-
-        # 渲染图表为可嵌入的 HTML
-        return chart_obj.render_embed()
+        # 当前快照中有预渲染的片段时，直接发送静态文件
+        version = CHART_CACHE.version()
+        if version:
+            path = create_chart.fragment_path(RESULT_STORE, version[1], chart_id)
+            if os.path.exists(path):
+                return send_fragment(path)
+
+        # 预渲染尚未完成或失败时，按需渲染并缓存
+        entry = CHART_CACHE.get(chart_id, render_chart)
+        response = make_response(entry.html)
+        response.set_etag(entry.etag)
+        if entry.last_modified:
+            response.last_modified = entry.last_modified
+        # 要求浏览器每次都向服务器验证，分析结果更新后能立即看到新图表
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
 
     except (StopIteration, KeyError, FileNotFoundError):
-        return f"<p style='color:red; text-align:center;'>生成图表(ID:{id})失败：分析数据不足或不存在。</p>"
+        return create_chart.MISSING_DATA_HTML.format(id=id)
     except Exception as e:
         app.logger.error(f"生成图表 {id} 时发生错误: {e}", exc_info=True)
         return f"生成图表时发生未知错误: {e}", 500
@@ -241,6 +313,8 @@ def us():
 
 
 # --- 应用启动入口 ---
+# 开发模式: 单进程的 Werkzeug 服务器，后台任务在本进程的线程中执行。
+# 生产环境请使用 wsgi.py（多进程 WSGI 服务器 + 独立的任务进程 jobs.py）。
 if __name__ == '__main__':
     # host='0.0.0.0' 使服务可以被局域网内其他设备访问
     # port=80 使用 HTTP 协议的默认端口
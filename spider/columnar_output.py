@@ -0,0 +1,159 @@
+# /spider/columnar_output.py
+
+# ==============================================================================
+#  爬虫模块 - 列式输出 (Parquet / Arrow IPC)
+# ==============================================================================
+#
+#  说明:
+#  WriterProcess 在写 CSV 的同时，可以选择把同样的数据写成列式文件。
+#  列式文件带有类型信息且经过压缩，分析阶段按列读取时远快于解析 CSV。
+#
+#  列类型:
+#  职位 ID、薪资上下限等数值以整数保存，发布日期以时间戳保存，指纹以 64 位无符号整数
+#  保存（与已见职位索引相同），读取时不需要再解析文本；只有标题、地点、描述等自由文本
+#  以字符串保存。job_id、issue_date、salary_min、salary_max 只写入列式文件，不写入 CSV。
+#
+#  输出位置:
+#  data/qcwy_columnar/part-<时间戳>.parquet 或 .arrow，每次爬取写一个分片文件。
+#  全量爬取会先清空该目录；增量爬取则追加新的分片，整个目录可作为一个数据集读取。
+#
+#  依赖:
+#  需要安装可选依赖 pyarrow；未安装时给出提示并跳过列式输出，不影响 CSV。
+#
+# ==============================================================================
+
+import datetime
+import os
+import shutil
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa, pq = None, None
+
+COLUMNAR_DIR = "data/qcwy_columnar"
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+# 发布日期的文本格式，例如 "2024-05-10 10:17:55"
+DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+
+def _as_text(value):
+    return None if value is None else str(value)
+
+
+def _as_int(value):
+    """把接口返回的数字或数字字符串转换为整数，缺失或无法解析时返回 None。"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_fingerprint(value):
+    """16 位十六进制指纹 -> 64 位无符号整数。"""
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_timestamp(value):
+    """把发布日期文本转换为 datetime，无法解析时返回 None。"""
+    if isinstance(value, datetime.datetime):
+        return value
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(str(value).strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+# 有明确类型的列: 列名 -> (Arrow 类型, 转换函数)；其余列均为自由文本，以字符串保存
+COLUMN_TYPES = {
+    "fingerprint": (lambda: pa.uint64(), _as_fingerprint),
+    "job_id": (lambda: pa.int64(), _as_int),
+    "salary_min": (lambda: pa.int32(), _as_int),
+    "salary_max": (lambda: pa.int32(), _as_int),
+    "issue_date": (lambda: pa.timestamp("s"), _as_timestamp),
+}
+
+
+def column_type(name):
+    """返回列的 (Arrow 类型, 转换函数)。"""
+    arrow_type, convert = COLUMN_TYPES.get(name, (lambda: pa.string(), _as_text))
+    return arrow_type(), convert
+
+
+def reset_columnar_dir(directory=COLUMNAR_DIR):
+    """
+    清空列式输出目录，全量爬取前调用。
+    """
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+
+
+class ColumnarSink(object):
+    """
+    把成批的结果字典写入一个列式分片文件。
+    每次 `write` 写入一个 row group（Parquet）或一个 record batch（Arrow IPC）。
+
+    Args:
+        fmt (str): 'parquet' 或 'arrow'。
+        fields (list): 列名列表，列类型见 `COLUMN_TYPES`，未列出的列以字符串保存。
+        directory (str): 输出目录。
+    """
+
+    def __init__(self, fmt, fields, directory=COLUMNAR_DIR):
+        if pa is None:
+            raise RuntimeError("未安装 pyarrow，无法输出列式文件。")
+        if fmt not in FORMATS:
+            raise ValueError(f"不支持的列式格式: {fmt}")
+        self.fmt = fmt
+        self.fields = list(fields)
+        self._columns = [(name,) + column_type(name) for name in self.fields]
+        self.schema = pa.schema([(name, arrow_type) for name, arrow_type, _ in self._columns])
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
+        self.path = os.path.join(directory, f"part-{stamp}-{os.getpid()}.{FORMATS[fmt]}")
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression="snappy")
+        else:
+            self._sink = pa.OSFile(self.path, "wb")
+            self._writer = pa.RecordBatchFileWriter(self._sink, self.schema)
+        self.rows = 0
+
+    def write(self, rows):
+        """
+        写入一批结果字典。
+        """
+        if not rows:
+            return
+        columns = [pa.array([convert(row.get(name)) for row in rows], type=arrow_type)
+                   for name, arrow_type, convert in self._columns]
+        batch = pa.RecordBatch.from_arrays(columns, schema=self.schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+        if self.fmt == "arrow":
+            self._sink.close()
+        print(f"列式文件已生成: {self.path} ({self.rows} 行)")
+
+
+def open_sink(fmt, fields, directory=COLUMNAR_DIR):
+    """
+    按配置创建列式输出；未配置格式或缺少 pyarrow 时返回 None。
+    """
+    if not fmt:
+        return None
+    try:
+        return ColumnarSink(fmt, fields, directory)
+    except (RuntimeError, ValueError) as e:
+        print(f"警告: {e} 将只输出 CSV。")
+        return None
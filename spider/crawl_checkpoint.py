@@ -0,0 +1,114 @@
+# /spider/crawl_checkpoint.py
+
+# ==============================================================================
+#  爬虫模块 - 断点续爬
+# ==============================================================================
+#
+#  说明:
+#  全量爬取可能持续数小时，进程崩溃或服务器重启后，原先只能从头再来。
+#  此模块把每个 (城市, 职位) 任务已完成的最后一页和已抓取数量记录在
+#  SQLite 数据库中，重新启动同一组参数的爬取时，跳过已完成的任务，
+#  未完成的任务从断点的下一页继续。
+#
+#  一致性:
+#  断点只由写入进程在数据落盘之后记录，因此断点永远不会超前于 CSV 中的数据。
+#  一次爬取正常结束后，断点被标记为已完成，下一次爬取（例如下一次定时任务）
+#  会重新开始，而不是被当作续爬。
+#
+# ==============================================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+
+# 默认的断点数据库文件
+CHECKPOINT_FILE = "data/crawl_checkpoint.db"
+
+
+def run_signature(city_list, job_list, limit, incremental):
+    """
+    计算一次爬取的参数签名。只有签名相同的爬取才会从断点继续。
+    """
+    key = json.dumps({"city": sorted(city_list), "job": sorted(job_list),
+                      "limit": limit, "incremental": bool(incremental)},
+                     ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore(object):
+    """
+    基于 SQLite 的断点存储。
+    `run_state` 表保存当前爬取的参数签名和状态，`task_checkpoint` 表保存每个任务的断点。
+    主进程读取断点，写入进程记录断点，二者各自持有连接。
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30)
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS run_state (name TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_checkpoint ("
+                " city TEXT NOT NULL, job TEXT NOT NULL,"
+                " page INTEGER NOT NULL, count INTEGER NOT NULL, done INTEGER NOT NULL,"
+                " PRIMARY KEY (city, job))")
+
+    def _get(self, name):
+        row = self.conn.execute("SELECT value FROM run_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set(self, name, value):
+        self.conn.execute("INSERT OR REPLACE INTO run_state (name, value) VALUES (?, ?)", (name, value))
+
+    def begin(self, signature, resume=True):
+        """
+        开始一次爬取。若上一次相同参数的爬取未正常结束且允许续爬，返回 True；
+        否则清空旧断点并返回 False。
+        """
+        if resume and self._get("signature") == signature and self._get("status") == "running":
+            return True
+        with self.conn:
+            self.conn.execute("DELETE FROM task_checkpoint")
+            self._set("signature", signature)
+            self._set("status", "running")
+        return False
+
+    def finished_tasks(self):
+        """
+        返回已完成的 (城市, 职位) 集合。
+        """
+        rows = self.conn.execute("SELECT city, job FROM task_checkpoint WHERE done = 1")
+        return {(city, job) for city, job in rows}
+
+    def resume_points(self):
+        """
+        返回未完成任务的断点: {(城市, 职位): (最后完成的页码, 已抓取数量)}。
+        """
+        rows = self.conn.execute("SELECT city, job, page, count FROM task_checkpoint WHERE done = 0")
+        return {(city, job): (page, count) for city, job, page, count in rows}
+
+    def record(self, checkpoints):
+        """
+        在一个事务中记录一组断点。
+
+        Args:
+            checkpoints (dict): {(城市, 职位): (页码, 已抓取数量, 是否完成)}。
+        """
+        if not checkpoints:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO task_checkpoint (city, job, page, count, done) VALUES (?, ?, ?, ?, ?)",
+                [(city, job, page, count, int(done)) for (city, job), (page, count, done) in checkpoints.items()])
+
+    def finish(self):
+        """
+        标记本次爬取已正常结束，之后的爬取将重新开始。
+        """
+        with self.conn:
+            self._set("status", "finished")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,199 @@
+# /spider/crawl_engine.py
+
+# ==============================================================================
+#  爬虫模块 - asyncio 协程抓取引擎
+# ==============================================================================
+#
+#  说明:
+#  原有的 Job51Spider 逐页串行请求：必须等第 N 页返回后才会请求第 N+1 页，
+#  而整个爬取过程几乎全部耗费在网络等待上。此引擎在单个进程内用 asyncio
+#  同时调度大量 (城市, 职位, 页码) 请求，让网络等待相互重叠。
+#
+#  核心机制:
+#  1. 全局并发上限: 一个 asyncio.Semaphore 控制同时在途的请求数量。
+#  2. 自适应限速: 每个请求都经过共享的 AdaptiveRateController，按主机调整
+#     请求间隔和并发数，失败的页面按抖动退避重试（见 rate_control.py）。
+#  3. 翻页流水线: 每个任务先请求第 1 页，之后以滑动窗口预取后续页面——每个任务
+#     最多同时有 `window` 个页面在途或等待处理，处理完一页再调度下一页，直到
+#     遇到空页、达到接口给出的总页数或进入已抓取过的区间。同时运行的任务数
+#     也不超过全局并发上限，因此挂起的请求和尚未处理的结果数量有上界。
+#  4. HTTP 请求本身由线程池中的 HttpTransport 完成（每个线程一个连接池会话），
+#     线程池的大小等于全局并发上限（原因见 `fetch_page`），
+#     结果按页码顺序、以“每页一批”的形式写入与 WriterProcess 相同的队列。
+#
+# ==============================================================================
+
+import asyncio
+import math
+from collections import deque
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from spider_transport import HttpTransport, build_search_url, extract_items, extract_total_count
+from crawl_state import TaskProgress
+from crawl_metrics import PAGE_ERRORS
+from rate_control import ThrottledTransport
+
+PAGE_SIZE = 20
+
+
+class AsyncCrawlEngine(object):
+    """
+    协程抓取引擎，在一个事件循环内并发执行所有 (城市, 职位) 任务。
+
+    Args:
+        queue: 结果队列，每页结果打包为一个批次放入，与 WriterProcess 对接。
+        context (CrawlContext): 本次爬取的共享设置（数量上限、增量模式等）。
+        controller (AdaptiveRateController): 共享的自适应限速控制器。
+        concurrency (int): 全局同时在途的请求数量上限（控制器的并发上限不会超过它）。
+        window (int): 每个任务同时在途或等待处理的页面数量上限。
+    """
+
+    def __init__(self, queue, context, controller, concurrency=16, window=4):
+        self.queue = queue
+        self.context = context
+        self.controller = controller
+        self.concurrency = max(1, concurrency)
+        self.window = max(1, window)
+        self._local = threading.local()
+        self._transports = []
+        self._transports_lock = threading.Lock()
+
+    # --- 线程池中执行的同步请求 ---
+
+    def _transport(self):
+        """
+        获取当前线程专属的 HttpTransport，requests.Session 不能跨线程共享。
+        限速和重试在线程中同步等待，不会阻塞事件循环。
+        """
+        transport = getattr(self._local, "transport", None)
+        if transport is None:
+            transport = ThrottledTransport(HttpTransport(pool_size=2), self.controller, self.context.metrics)
+            self._local.transport = transport
+            with self._transports_lock:
+                self._transports.append(transport)
+        return transport
+
+    def _fetch_sync(self, url):
+        try:
+            return self._transport().fetch_json(url)
+        except Exception as e:
+            return {"error": str(e)}
+
+    # --- 协程部分 ---
+
+    async def fetch_page(self, keyword, page, city_code):
+        """
+        在全局并发上限和自适应限速的约束下请求一页数据。
+
+        请求在线程池中执行，而没有使用 aiohttp 等异步 HTTP 库：HttpTransport 依赖
+        requests 的会话和浏览器获取的 cookies，限速控制器的状态保存在跨进程共享的
+        数组中，等待请求名额和退避重试都是同步的。线程池的大小等于全局并发上限，
+        拿到信号量的请求总能立即得到一个线程，实际并发由信号量（而不是线程池）决定。
+        """
+        url = build_search_url(keyword, page, city_code, PAGE_SIZE, self.context.sort_type)
+        async with self._semaphore:
+            return await self._loop.run_in_executor(self._executor, self._fetch_sync, url)
+
+    async def crawl_task(self, city, job, city_code):
+        """
+        执行单个 (城市, 职位) 任务，按页码顺序把结果放入队列。
+        """
+        limit = self.context.limit
+        max_pages = math.ceil(limit / PAGE_SIZE) if limit else 0
+        progress = TaskProgress(self.context, city, job)
+        # 断点续爬时从断点的下一页开始，任意一页的响应中都带有职位总数
+        first_page = progress.start_page
+        first = await self.fetch_page(job, first_page, city_code)
+        if self._consume(progress, first_page, first):
+            return progress.count
+        if max_pages <= first_page:
+            self.queue.put(progress.batch(first_page, [], done=True))
+            return progress.count
+
+        last_page = max_pages
+        total = extract_total_count(first)
+        if total is not None and not self.context.incremental:
+            # 已知总页数时不请求超出总数的页面；增量模式下依靠已见区间提前停止
+            last_page = min(max_pages, math.ceil(total / PAGE_SIZE))
+
+        # 滑动窗口预取：按页码顺序处理，遇到空页、错误、上限或已见区间时停止
+        pending = deque()
+        next_page = first_page + 1
+        try:
+            while True:
+                while next_page <= last_page and len(pending) < self.window:
+                    pending.append((next_page, asyncio.ensure_future(self.fetch_page(job, next_page, city_code))))
+                    next_page += 1
+                if not pending:
+                    break
+                page, future = pending.popleft()
+                if self._consume(progress, page, await future):
+                    return progress.count
+        finally:
+            for _, future in pending:
+                future.cancel()
+        self.queue.put(progress.batch(last_page, [], done=True))
+        print(f"[完成] {city}-{job} 所有页面已爬取完毕.")
+        return progress.count
+
+    def _consume(self, progress, page, data):
+        """
+        处理一页响应：把新职位（及断点信息）放入队列，返回任务是否应当结束。
+        请求出错时不标记任务完成，下次续爬会从这一页重新开始。
+        """
+        city, job = progress.city, progress.job
+        if "error" in data:
+            self.context.record(PAGE_ERRORS)
+            print(f"[错误] {city}-{job} 第 {page} 页请求API失败: {data['error']}")
+            return True
+        items = extract_items(data)
+        if not items:
+            self.queue.put(progress.batch(page, [], done=True))
+            print(f"[完成] {city}-{job} 所有页面已爬取完毕.")
+            return True
+        self.queue.put(progress.batch(page, progress.accept_page(items)))
+        print(f"[进度] {city}-{job} 第 {page} 页抓取成功，当前已抓取 {progress.count}/{self.context.limit} 条")
+        if progress.done:
+            progress.report_done()
+            return True
+        return False
+
+    async def _run_all(self, tasks):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # 同时运行的任务数不超过全局并发上限，其余任务等待空位
+        self._active = asyncio.Semaphore(self.concurrency)
+        coroutines = [self._guarded(city, job, city_code) for city, job, city_code in tasks]
+        return await asyncio.gather(*coroutines)
+
+    async def _guarded(self, city, job, city_code):
+        try:
+            async with self._active:
+                return await self.crawl_task(city, job, city_code)
+        except Exception as e:
+            print(f"协程任务 '{city}-{job}' 发生严重错误: {e}")
+            return 0
+
+    def run(self, tasks):
+        """
+        在一个新的事件循环中执行所有任务，阻塞直到全部完成。
+
+        Args:
+            tasks (list): (城市, 职位, 城市代码) 三元组列表。
+
+        Returns:
+            int: 本次抓取的职位总数。
+        """
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        # 协程中通过 self._loop 调度线程池（Python 3.6 没有 asyncio.get_running_loop）
+        self._loop = loop
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            counts = loop.run_until_complete(self._run_all(tasks))
+        finally:
+            self._executor.shutdown(wait=True)
+            for transport in self._transports:
+                transport.close()
+            loop.close()
+        return sum(counts)
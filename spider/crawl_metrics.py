@@ -0,0 +1,113 @@
+# /spider/crawl_metrics.py
+
+# ==============================================================================
+#  爬虫模块 - 实时进度与吞吐量指标
+# ==============================================================================
+#
+#  说明:
+#  爬虫原先只通过 print() 报告进度，启动后无法得知每秒写入多少条、有多少请求
+#  在途、失败了多少次以及大概还要多久。此模块提供一组所有爬虫进程共享的计数器，
+#  由写入进程定期汇总为 JSON 快照文件，Flask 应用读取该文件提供接口和进度页面。
+#
+#  数据流:
+#  1. 生产者（工作者进程、协程引擎线程）更新共享计数器: 请求数、在途请求数、
+#     请求延迟直方图、成功/失败的页面数、抓取到的职位数。
+#  2. 写入进程更新写入数、重复数、已完成任务数，并根据收到的批次维护每个任务的
+#     页数和数量；每隔几秒把全部指标原子地写入 data/crawl_metrics.json。
+#  3. 服务器只读取该文件，因此爬虫无论运行在后台线程还是独立进程中都可以被观察。
+#
+# ==============================================================================
+
+import json
+import os
+import time
+from multiprocessing import Array
+
+# 默认的指标快照文件
+METRICS_FILE = "data/crawl_metrics.json"
+
+# 共享数组中的计数器
+(TASKS_TOTAL, TASKS_DONE, PAGES, PAGE_ERRORS, REQUESTS, REQUEST_ERRORS, RETRIES, IN_FLIGHT,
+ ITEMS_FETCHED, ITEMS_WRITTEN, DUPLICATES, STARTED_AT, LATENCY_SUM) = range(13)
+COUNTER_NAMES = ["tasks_total", "tasks_done", "pages", "page_errors", "requests", "request_errors",
+                 "retries", "in_flight", "items_fetched", "items_written", "duplicates"]
+# 请求延迟直方图的桶上界（秒），最后一个桶收集超过最大上界的请求
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+HISTOGRAM_START = 13
+
+
+class CrawlMetrics(object):
+    """
+    所有爬虫进程共享的指标计数器，保存在 multiprocessing.Array 中。
+
+    Args:
+        tasks_total (int): 本次需要执行的任务数。
+    """
+
+    def __init__(self, tasks_total=0):
+        values = [0.0] * (HISTOGRAM_START + len(LATENCY_BUCKETS) + 1)
+        values[TASKS_TOTAL] = tasks_total
+        values[STARTED_AT] = time.time()
+        self._values = Array('d', values)
+
+    def add(self, field, amount=1):
+        with self._values.get_lock():
+            self._values[field] += amount
+
+    def observe_latency(self, seconds, ok=True):
+        """
+        记录一次请求的延迟和结果。
+        """
+        bucket = len(LATENCY_BUCKETS)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                bucket = i
+                break
+        with self._values.get_lock():
+            self._values[REQUESTS] += 1
+            self._values[LATENCY_SUM] += seconds
+            self._values[HISTOGRAM_START + bucket] += 1
+            if not ok:
+                self._values[REQUEST_ERRORS] += 1
+
+    def snapshot(self):
+        """
+        读取所有计数器，并计算耗时、平均延迟和预计剩余时间。
+        """
+        with self._values.get_lock():
+            values = list(self._values)
+        data = {name: int(values[i]) for i, name in enumerate(COUNTER_NAMES)}
+        elapsed = max(time.time() - values[STARTED_AT], 1e-6)
+        data["started_at"] = values[STARTED_AT]
+        data["elapsed"] = round(elapsed, 1)
+        data["items_per_second"] = round(values[ITEMS_WRITTEN] / elapsed, 2)
+        data["pages_per_second"] = round(values[PAGES] / elapsed, 2)
+        data["avg_latency"] = round(values[LATENCY_SUM] / values[REQUESTS], 3) if values[REQUESTS] else None
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        data["latency_histogram"] = dict(zip(labels, (int(v) for v in values[HISTOGRAM_START:])))
+        # 以已完成任务的平均耗时估算剩余时间
+        remaining = values[TASKS_TOTAL] - values[TASKS_DONE]
+        data["eta"] = round(elapsed / values[TASKS_DONE] * remaining, 1) if values[TASKS_DONE] else None
+        return data
+
+
+def write_snapshot(data, path=METRICS_FILE):
+    """
+    原子地写入指标快照，读取方不会读到写了一半的文件。
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path=METRICS_FILE):
+    """
+    读取最近一次的指标快照，没有快照时返回 None。
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,365 @@
+# /spider/crawl_state.py
+
+# ==============================================================================
+#  爬虫模块 - 爬取状态与增量索引
+# ==============================================================================
+#
+#  说明:
+#  此模块保存跨任务、跨进程、跨多次运行共享的爬取状态。
+#
+#  核心组件:
+#  1. CrawlContext : 一次爬取中所有任务共享的设置，会被传给每个工作者进程。
+#  2. TaskProgress : 单个 (城市, 职位) 任务的进度，负责把一页职位转换为结果，
+#                    并判断任务何时应当结束（达到上限或进入已抓取过的区间）。
+#  3. SeenJobIndex : 持久化的“已见职位”索引，以职位指纹为键，支撑增量爬取。
+#  4. KeywordDeduplicator : 写入前的跨关键词/跨城市去重阶段，同时记录每条
+#                    唯一职位被哪些关键词搜到。
+#
+# ==============================================================================
+
+import csv
+import os
+from array import array
+from bisect import bisect_left
+
+from spider_transport import SORT_DEFAULT, SORT_LATEST, to_result
+from crawl_metrics import ITEMS_FETCHED, PAGES
+
+# 默认的已见职位索引文件
+SEEN_INDEX_FILE = "data/seen_jobs.idx"
+# 每条唯一职位匹配到的关键词列表
+KEYWORDS_FILE = "data/qcwy_keywords.csv"
+
+
+def fingerprint_to_int(fingerprint):
+    """
+    把 16 位十六进制的职位指纹转换为 64 位整数，便于紧凑存储。
+    """
+    return int(fingerprint, 16)
+
+
+# ==============================
+#  已见职位索引
+# ==============================
+class SeenJobIndex(object):
+    """
+    持久化的已见职位索引。
+    文件是连续存放的 64 位无符号整数（本机字节序），每个整数是一条职位的指纹，
+    只会追加写入。加载后以有序数组的形式保存在内存中，每条仅占 8 字节，
+    查询使用二分查找。
+    """
+
+    def __init__(self, path=SEEN_INDEX_FILE):
+        self.path = path
+        self._keys = array('Q')
+
+    @classmethod
+    def load(cls, path=SEEN_INDEX_FILE):
+        """
+        从文件加载索引，文件不存在时返回空索引。
+        """
+        index = cls(path)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                raw = f.read()
+            # 忽略末尾不完整的记录（例如写入过程中进程被终止）
+            raw = raw[:len(raw) - len(raw) % index._keys.itemsize]
+            index._keys.frombytes(raw)
+            index._keys = array('Q', sorted(set(index._keys)))
+        return index
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __contains__(self, fingerprint):
+        key = fingerprint_to_int(fingerprint)
+        i = bisect_left(self._keys, key)
+        return i < len(self._keys) and self._keys[i] == key
+
+    @staticmethod
+    def append(path, fingerprints):
+        """
+        把新的职位指纹追加到索引文件。只应由唯一的写入进程调用。
+        """
+        if not fingerprints:
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "ab") as f:
+            f.write(array('Q', (fingerprint_to_int(fp) for fp in fingerprints)).tobytes())
+
+    @staticmethod
+    def reset(path=SEEN_INDEX_FILE):
+        """
+        删除索引文件。全量爬取会重写 CSV，索引也随之重建。
+        """
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# ==============================
+#  跨关键词去重
+# ==============================
+class KeywordDeduplicator(object):
+    """
+    写入前的去重阶段。
+    同一职位会被多个关键词（如 "Java" 与 "后端开发"）或多个城市（如 "全国" 与具体城市）
+    重复搜到。此类以职位指纹为键，只放行第一次出现的职位，并记录每条唯一职位
+    被哪些关键词搜到。
+
+    存储方式与已见职位索引相同：指纹保存在有序的 `array('Q')` 中，每条 8 字节，
+    查询使用二分查找；关键词以位掩码保存在平行的 `array('Q')` 中，每个关键词
+    分配一个位号，每条职位占 `_words` 个 64 位字（关键词超过 64 个时自动加宽）。
+    新职位先放入一个小的缓冲字典，积累到 `merge_every` 条后再一次性合并进有序数组，
+    避免每次插入都移动整个数组。
+    """
+
+    def __init__(self, merge_every=4096):
+        self.merge_every = merge_every
+        self._keywords = []      # 位号 -> 关键词
+        self._keyword_bits = {}  # 关键词 -> 位号
+        self._keys = array('Q')  # 有序的指纹整数
+        self._masks = array('Q')  # 与 _keys 平行的关键词位掩码，每条 _words 个字
+        self._words = 1
+        self._pending = {}       # 尚未合并的新职位: 指纹整数 -> 关键词位掩码
+        self.duplicates = 0      # 被拦截的重复职位数量
+
+    def _bit(self, keyword):
+        bit = self._keyword_bits.get(keyword)
+        if bit is None:
+            bit = len(self._keywords)
+            if bit >= 64 * self._words:
+                self._widen()
+            self._keywords.append(keyword)
+            self._keyword_bits[keyword] = bit
+        return bit
+
+    def _widen(self):
+        """位掩码增加一个 64 位字，容纳更多关键词。"""
+        words, masks = self._words, self._masks
+        self._masks = array('Q')
+        for i in range(0, len(masks), words):
+            self._masks.extend(masks[i:i + words])
+            self._masks.append(0)
+        self._words += 1
+
+    def _find(self, key):
+        """返回指纹在有序数组中的位置，不存在时返回 -1。"""
+        i = bisect_left(self._keys, key)
+        return i if i < len(self._keys) and self._keys[i] == key else -1
+
+    def _merge(self, items):
+        """
+        把按指纹排序、且不在有序数组中的 (指纹, 位掩码) 合并进有序数组。
+        """
+        words, old_keys, old_masks = self._words, self._keys, self._masks
+        keys, masks = array('Q'), array('Q')
+        i = 0
+        for key, mask in items:
+            j = bisect_left(old_keys, key, i)
+            keys.extend(old_keys[i:j])
+            masks.extend(old_masks[i * words:j * words])
+            keys.append(key)
+            masks.extend((mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(words))
+            i = j
+        keys.extend(old_keys[i:])
+        masks.extend(old_masks[i * words:])
+        self._keys, self._masks = keys, masks
+
+    def _flush(self):
+        if self._pending:
+            self._merge(sorted(self._pending.items()))
+            self._pending = {}
+
+    def _add(self, key, bit):
+        """
+        给一条职位添加关键词，职位第一次出现时返回 True。
+        """
+        i = self._find(key)
+        if i >= 0:
+            self._masks[i * self._words + bit // 64] |= 1 << (bit % 64)
+            return False
+        mask = self._pending.get(key)
+        self._pending[key] = (mask or 0) | 1 << bit
+        if mask is not None:
+            return False
+        if len(self._pending) >= self.merge_every:
+            self._flush()
+        return True
+
+    def accept(self, fingerprint, keyword):
+        """
+        登记一条职位，第一次出现时返回 True（应写入），重复时返回 False。
+        """
+        if self._add(fingerprint_to_int(fingerprint), self._bit(keyword)):
+            return True
+        self.duplicates += 1
+        return False
+
+    def seed(self, keys):
+        """
+        把已写入的职位（整数指纹）登记为已见，但不记录关键词。
+        断点续爬时用已见职位索引初始化，避免重复写入崩溃前已经保存的职位。
+        """
+        self._flush()
+        new = sorted(set(key for key in keys if self._find(key) < 0))
+        self._merge((key, 0) for key in new)
+
+    def __len__(self):
+        return len(self._keys) + len(self._pending)
+
+    def keywords_of(self, key):
+        mask = self._pending.get(key)
+        if mask is None:
+            mask, i = 0, self._find(key)
+            if i >= 0:
+                for w in range(self._words):
+                    mask |= self._masks[i * self._words + w] << (64 * w)
+        return [kw for i, kw in enumerate(self._keywords) if mask >> i & 1]
+
+    def load(self, path=KEYWORDS_FILE):
+        """
+        读取之前保存的关键词记录，使增量爬取时的关键词可以与历史记录合并。
+        """
+        if not os.path.exists(path):
+            return
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                key = fingerprint_to_int(row["fingerprint"])
+                for keyword in filter(None, row["keywords"].split("|")):
+                    self._add(key, self._bit(keyword))
+
+    def save(self, path=KEYWORDS_FILE):
+        """
+        保存每条唯一职位匹配到的关键词，格式为 `fingerprint,keywords`（关键词以 | 分隔）。
+        """
+        self._flush()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(["fingerprint", "keywords"])
+            for key in self._keys:
+                writer.writerow([f"{key:016x}", "|".join(self.keywords_of(key))])
+        os.replace(tmp_path, path)
+
+
+# ==============================
+#  爬取上下文
+# ==============================
+class CrawlContext(object):
+    """
+    一次爬取中所有任务共享的设置。
+    该对象会被传递到每个工作者进程中，因此只保存可以被 pickle 的简单属性；
+    已见职位索引在各进程中第一次使用时才加载。
+
+    Args:
+        limit (int): 每个任务的最大抓取数量。
+        incremental (bool): 是否为增量模式。增量模式下跳过已见职位，并在连续
+            遇到 `stop_after_known` 条已见职位时停止翻页。
+        seen_index_path (str): 已见职位索引文件路径。
+        stop_after_known (int): 增量模式下，连续遇到多少条已见职位后停止翻页。
+        resume (dict): 断点续爬时未完成任务的断点，{(城市, 职位): (最后完成的页码, 已抓取数量)}。
+        metrics (CrawlMetrics): 共享的进度指标，为 None 时不记录。
+    """
+
+    def __init__(self, limit, incremental=False, seen_index_path=SEEN_INDEX_FILE, stop_after_known=20,
+                 resume=None, metrics=None):
+        self.limit = limit
+        self.incremental = incremental
+        self.seen_index_path = seen_index_path
+        self.stop_after_known = stop_after_known
+        self.resume = resume or {}
+        self.metrics = metrics
+        self._seen = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_seen"] = None  # 索引不随进程传递，由子进程自行加载
+        return state
+
+    @property
+    def seen(self):
+        if self._seen is None:
+            self._seen = SeenJobIndex.load(self.seen_index_path)
+        return self._seen
+
+    @property
+    def sort_type(self):
+        # 增量模式按发布时间排序，新职位排在前面，遇到已见职位即可停止翻页
+        return SORT_LATEST if self.incremental else SORT_DEFAULT
+
+    def is_known(self, fingerprint):
+        return self.incremental and fingerprint in self.seen
+
+    def record(self, field, amount=1):
+        """
+        更新一个共享指标计数器（字段见 crawl_metrics.py），未启用指标时忽略。
+        """
+        if self.metrics is not None:
+            self.metrics.add(field, amount)
+
+
+# ==============================
+#  单个任务的进度
+# ==============================
+class TaskProgress(object):
+    """
+    单个 (城市, 职位) 任务的进度。
+    Job51Spider 和协程引擎都通过它来处理每一页数据，保证两种引擎的行为一致。
+    断点续爬时，从上下文中的断点恢复已抓取数量和起始页码。
+    """
+
+    def __init__(self, context, city, job):
+        self.context = context
+        self.city = city
+        self.job = job
+        last_page, count = context.resume.get((city, job), (0, 0))
+        self.start_page = last_page + 1  # 本次从哪一页开始抓取
+        self.count = count     # 已抓取（写入）的数量
+        self.known_run = 0     # 连续遇到的已见职位数量
+        self.done = None       # 结束原因: 'limit'、'known' 或 None
+
+    def accept_page(self, items):
+        """
+        处理一页职位，返回需要写入的结果字典列表，并在需要时设置 `done`。
+        """
+        results = []
+        for item in items:
+            if self.count >= self.context.limit:
+                break
+            result = to_result(item, self.job)
+            if self.context.is_known(result["fingerprint"]):
+                self.known_run += 1
+                if self.known_run >= self.context.stop_after_known:
+                    self.done = "known"
+                    break
+                continue
+            self.known_run = 0
+            results.append(result)
+            self.count += 1
+        if self.count >= self.context.limit:
+            self.done = "limit"
+        self.context.record(PAGES)
+        self.context.record(ITEMS_FETCHED, len(results))
+        return results
+
+    def batch(self, page, results, done=False):
+        """
+        把一页的结果打包为一个批次，整批放入队列，减少跨进程传输的次数。
+        批次同时携带断点信息（页码、已抓取数量、任务是否完成），由写入进程在数据落盘后记录。
+        没有新职位的页面也应放入一个空批次，以便推进断点。
+        """
+        return {"city": self.city, "job": self.job, "page": page, "count": self.count,
+                "done": done or self.done is not None, "items": results}
+
+    def report_done(self):
+        """
+        打印任务提前结束的原因。
+        """
+        if self.done == "limit":
+            print(f"[数量限制] {self.city}-{self.job} 已抓取 {self.count} 条，达到 {self.context.limit} 的上限，任务提前结束。")
+        elif self.done == "known":
+            print(f"[增量] {self.city}-{self.job} 连续遇到 {self.known_run} 条已抓取过的职位，停止翻页。")
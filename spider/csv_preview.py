@@ -0,0 +1,193 @@
+# /spider/csv_preview.py
+
+# ==============================================================================
+#  爬虫模块 - CSV 分页预览
+# ==============================================================================
+#
+#  说明:
+#  原先的预览方式是把整个 CSV 读入内存，生成一个包含全部行（含完整职位描述）
+#  的静态 HTML，数据量大时页面可达数百 MB。此模块改为由服务器按页读取 CSV：
+#  浏览器每次只请求一页数据，可选择只返回部分列。
+#
+#  字节偏移索引:
+#  为了让跳转到任意一页都是 O(1)，为 CSV 建立“每条记录起始字节偏移”的索引，
+#  以 64 位无符号整数数组保存在 `<csv 文件名>.idx` 中。翻到第 N 页时，
+#  直接 seek 到对应偏移，只读取这一页的字节。
+#
+#  记录边界按引号奇偶判断：换行符只有在引号之外时才是记录的结束，
+#  因此职位描述中的换行不会被误认为新的一行。
+#  CSV 只会被追加（增量爬取），索引也只扫描新追加的部分；若 CSV 被重写
+#  （全量爬取），通过文件开头的校验值发现并重建索引。
+#
+# ==============================================================================
+
+import csv
+import io
+import os
+import threading
+import zlib
+from array import array
+
+# 扫描 CSV 时每次读取的字节数
+CHUNK_SIZE = 1 << 20
+# 用于校验 CSV 是否被重写的文件开头字节数
+HEAD_BYTES = 1 << 16
+# 每页最多返回的行数
+MAX_PAGE_SIZE = 500
+
+
+def index_path_for(csv_path):
+    return f"{csv_path}.idx"
+
+
+def remove_index(csv_path):
+    """
+    删除 CSV 对应的偏移索引。全量爬取重写 CSV 之前调用。
+    """
+    path = index_path_for(csv_path)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class CsvRowIndex(object):
+    """
+    CSV 记录的字节偏移索引，第 0 条记录为表头。
+    索引文件格式: [已扫描字节数, 校验字节数, 校验值, 记录0偏移, 记录1偏移, ...]。
+    同一进程内可被多个请求线程共享。
+    """
+
+    def __init__(self, csv_path, index_path=None):
+        self.csv_path = csv_path
+        self.index_path = index_path or index_path_for(csv_path)
+        self._lock = threading.Lock()
+        self._reset()
+        self._loaded_mtime = None
+
+    def _reset(self):
+        self.covered = 0          # 已扫描（均为完整记录）的字节数
+        self.head_len = 0         # 计算校验值所用的文件开头字节数
+        self.head_crc = 0
+        self.offsets = array('Q')
+
+    # --- 索引的加载、校验与保存 ---
+
+    def _load(self):
+        self._reset()
+        if not os.path.exists(self.index_path):
+            self._loaded_mtime = None
+            return
+        raw = array('Q')
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+        raw.frombytes(data[:len(data) - len(data) % raw.itemsize])
+        if len(raw) >= 3:
+            self.covered, self.head_len, self.head_crc = raw[0], raw[1], raw[2]
+            self.offsets = raw[3:]
+        self._loaded_mtime = os.path.getmtime(self.index_path)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            array('Q', [self.covered, self.head_len, self.head_crc]).tofile(f)
+            self.offsets.tofile(f)
+        os.replace(tmp_path, self.index_path)
+        self._loaded_mtime = os.path.getmtime(self.index_path)
+
+    def _head_crc(self, f, length):
+        f.seek(0)
+        return zlib.crc32(f.read(length))
+
+    def _valid(self, f, size):
+        if self.covered > size:
+            return False
+        return self.head_len == 0 or self._head_crc(f, self.head_len) == self.head_crc
+
+    # --- 扫描 ---
+
+    def _scan(self, f, size):
+        """
+        从已扫描的位置继续，找出新追加的完整记录的起始偏移。
+        末尾不完整的记录（写入进程正在写）不计入，下次再扫描。
+        """
+        f.seek(self.covered)
+        record_start = self.covered
+        position = self.covered
+        in_quotes = False
+        tail = b""
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (tail + chunk).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                # 转义的双引号 "" 会让奇偶性翻转两次，结果不变
+                if line.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                position += len(line) + 1
+                if not in_quotes:
+                    self.offsets.append(record_start)
+                    record_start = position
+        self.covered = record_start
+        if self.head_len < HEAD_BYTES:
+            self.head_len = min(HEAD_BYTES, self.covered)
+            self.head_crc = self._head_crc(f, self.head_len)
+
+    def refresh(self):
+        """
+        使索引与 CSV 文件保持一致：必要时加载、重建或增量扫描。
+        """
+        if not os.path.exists(self.csv_path):
+            self._reset()
+            return
+        index_mtime = os.path.getmtime(self.index_path) if os.path.exists(self.index_path) else None
+        if index_mtime != self._loaded_mtime:
+            self._load()
+        size = os.path.getsize(self.csv_path)
+        with open(self.csv_path, "rb") as f:
+            if not self._valid(f, size):
+                self._reset()
+            if size > self.covered:
+                before = (self.covered, len(self.offsets))
+                self._scan(f, size)
+                if (self.covered, len(self.offsets)) != before:
+                    self._save()
+
+    # --- 读取 ---
+
+    def _read_records(self, f, first, count):
+        start = self.offsets[first]
+        end = self.offsets[first + count] if first + count < len(self.offsets) else self.covered
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8-sig" if start == 0 else "utf-8", errors="replace")
+        return list(csv.reader(io.StringIO(text, newline="")))
+
+    def page(self, offset=0, limit=50, columns=None):
+        """
+        读取一页数据。
+
+        Args:
+            offset (int): 起始行号（不含表头，从 0 开始）。
+            limit (int): 行数，最多 MAX_PAGE_SIZE。
+            columns (list): 需要返回的列名，为空时返回全部列。
+
+        Returns:
+            dict: {"total": 总行数, "offset", "limit", "columns": 列名, "rows": 行列表}。
+        """
+        with self._lock:
+            self.refresh()
+            total = max(0, len(self.offsets) - 1)
+            offset = min(max(0, offset), total)
+            limit = min(max(0, limit), MAX_PAGE_SIZE, total - offset)
+            if not self.offsets:
+                return {"total": 0, "offset": 0, "limit": 0, "columns": [], "rows": []}
+            with open(self.csv_path, "rb") as f:
+                header = self._read_records(f, 0, 1)[0]
+                rows = self._read_records(f, offset + 1, limit) if limit else []
+        selected = [i for i, name in enumerate(header) if not columns or name in columns]
+        return {
+            "total": total, "offset": offset, "limit": limit,
+            "columns": [header[i] for i in selected],
+            "rows": [[row[i] if i < len(row) else "" for i in selected] for row in rows],
+        }
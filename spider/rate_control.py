@@ -0,0 +1,210 @@
+# /spider/rate_control.py
+
+# ==============================================================================
+#  爬虫模块 - 自适应限速与退避重试
+# ==============================================================================
+#
+#  说明:
+#  固定的 sleep 要么太保守（浪费吞吐量），要么太激进（被封）。此模块提供一个
+#  被所有工作者（进程或线程）共享的自适应控制器，按主机统计延迟和错误率，
+#  动态调整请求间隔和并发数，目标是在不被封禁的前提下获得最高的持续吞吐量。
+#
+#  控制策略 (AIMD, 与 TCP 拥塞控制相同的思路):
+#  1. 加性增: 每次成功的请求都会让并发上限增加 1/并发上限（约每轮 +1），
+#             请求间隔减少一个固定步长；若延迟明显高于历史最低延迟，则保持不变。
+#  2. 乘性减: 请求出错时并发上限减半、请求间隔加倍；同一轮（约一个平均延迟）
+#             内的多次错误只触发一次减半，避免一批并发错误把速率压到最低。
+#  3. 退避重试: 失败的请求按“全抖动”指数退避重试，即在 [0, min(上限, 基数*2^n)]
+#             内随机等待，避免多个工作者同时重试造成新的请求峰值。
+#
+#  共享方式:
+#  所有状态保存在 multiprocessing.Array 中，在创建工作者进程时传入，
+#  各进程和线程看到的是同一份计数，因此限速对整个爬虫生效，而不是每个进程各自限速。
+#
+# ==============================================================================
+
+import random
+import time
+from multiprocessing import Array
+from urllib.parse import urlparse
+
+from spider_transport import API_URL
+import crawl_metrics
+
+# 每个主机在共享数组中占用的字段（进度指标的字段使用 crawl_metrics.IN_FLIGHT 等，二者互不相同）
+(INTERVAL, NEXT_SLOT, CONCURRENCY, IN_FLIGHT, LATENCY, LATENCY_MIN,
+ ERROR_RATE, LAST_DECREASE, REQUESTS, ERRORS) = range(10)
+FIELD_COUNT = 10
+
+# 等待并发名额时的轮询间隔（秒）
+POLL_INTERVAL = 0.05
+# 指数加权移动平均的平滑系数
+EWMA_ALPHA = 0.2
+
+
+class AdaptiveRateController(object):
+    """
+    按主机的自适应限速控制器，可在进程间共享。
+
+    Args:
+        hosts (tuple): 需要单独控制的主机名，其他主机共用最后一个槽位。
+        rate (float): 初始的每秒请求数。
+        max_rate (float): 每秒请求数的上限。
+        min_rate (float): 每秒请求数的下限。
+        concurrency (int): 初始的并发上限。
+        max_concurrency (int): 并发上限的最大值。
+    """
+
+    def __init__(self, hosts=(urlparse(API_URL).netloc,), rate=5, max_rate=20, min_rate=0.1,
+                 concurrency=4, max_concurrency=16):
+        self.hosts = list(hosts)
+        self.min_interval = 1.0 / max_rate
+        self.max_interval = 1.0 / min_rate
+        self.interval_step = self.min_interval / 2
+        self.max_concurrency = max(1, max_concurrency)
+        initial = [0.0] * FIELD_COUNT
+        initial[INTERVAL] = min(self.max_interval, max(self.min_interval, 1.0 / rate if rate else 0.0))
+        initial[CONCURRENCY] = float(min(max(1, concurrency), self.max_concurrency))
+        self._state = Array('d', initial * (len(self.hosts) + 1))
+
+    def _slot(self, url):
+        host = urlparse(url).netloc
+        index = self.hosts.index(host) if host in self.hosts else len(self.hosts)
+        return index * FIELD_COUNT
+
+    def acquire(self, url):
+        """
+        等待直到可以向该主机发出请求：既有空闲的并发名额，也满足请求间隔。
+        """
+        base = self._slot(url)
+        while True:
+            with self._state.get_lock():
+                s = self._state.get_obj()
+                if s[base + IN_FLIGHT] < int(s[base + CONCURRENCY]):
+                    now = time.time()
+                    slot = max(now, s[base + NEXT_SLOT])
+                    s[base + NEXT_SLOT] = slot + s[base + INTERVAL]
+                    s[base + IN_FLIGHT] += 1
+                    break
+            time.sleep(POLL_INTERVAL)
+        if slot > now:
+            time.sleep(slot - now)
+
+    def release(self, url, latency, ok):
+        """
+        报告一次请求的结果，并据此调整该主机的请求间隔和并发上限。
+        """
+        base = self._slot(url)
+        with self._state.get_lock():
+            s = self._state.get_obj()
+            s[base + IN_FLIGHT] = max(0.0, s[base + IN_FLIGHT] - 1)
+            s[base + REQUESTS] += 1
+            s[base + LATENCY] = latency if s[base + LATENCY] == 0 else (
+                (1 - EWMA_ALPHA) * s[base + LATENCY] + EWMA_ALPHA * latency)
+            s[base + ERROR_RATE] = (1 - EWMA_ALPHA) * s[base + ERROR_RATE] + EWMA_ALPHA * (0.0 if ok else 1.0)
+            if ok:
+                if s[base + LATENCY_MIN] == 0 or latency < s[base + LATENCY_MIN]:
+                    s[base + LATENCY_MIN] = latency
+                # 延迟明显升高说明服务器开始吃力，此时只保持不再加速
+                if s[base + LATENCY] <= 2 * s[base + LATENCY_MIN]:
+                    s[base + CONCURRENCY] = min(self.max_concurrency,
+                                                s[base + CONCURRENCY] + 1.0 / s[base + CONCURRENCY])
+                    s[base + INTERVAL] = max(self.min_interval, s[base + INTERVAL] - self.interval_step)
+            else:
+                s[base + ERRORS] += 1
+                now = time.time()
+                # 同一轮内的多次错误只减速一次
+                if now - s[base + LAST_DECREASE] >= max(s[base + LATENCY], s[base + INTERVAL]):
+                    s[base + LAST_DECREASE] = now
+                    s[base + CONCURRENCY] = max(1.0, s[base + CONCURRENCY] / 2)
+                    s[base + INTERVAL] = min(self.max_interval, max(s[base + INTERVAL] * 2, self.min_interval))
+
+    def snapshot(self):
+        """
+        返回每个主机当前的控制状态，便于打印或监控。
+        """
+        with self._state.get_lock():
+            s = list(self._state.get_obj())
+        result = {}
+        for i, host in enumerate(self.hosts + ["*"]):
+            base = i * FIELD_COUNT
+            result[host] = {
+                "rate": round(1.0 / s[base + INTERVAL], 2) if s[base + INTERVAL] else None,
+                "concurrency": int(s[base + CONCURRENCY]),
+                "in_flight": int(s[base + IN_FLIGHT]),
+                "latency": round(s[base + LATENCY], 3),
+                "error_rate": round(s[base + ERROR_RATE], 3),
+                "requests": int(s[base + REQUESTS]),
+                "errors": int(s[base + ERRORS]),
+            }
+        return result
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    计算第 `attempt` 次重试前的等待时间（全抖动指数退避）。
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ThrottledTransport(object):
+    """
+    为任意传输层加上自适应限速和退避重试。
+    每次请求前向控制器申请名额，请求后报告延迟和结果；失败的请求按退避策略重试。
+
+    Args:
+        transport: 被包装的传输层对象（具有 `fetch_json` 和 `close` 方法）。
+        controller (AdaptiveRateController): 共享的限速控制器。
+        metrics (CrawlMetrics): 共享的进度指标，记录在途请求数、延迟和重试次数，可为 None。
+        retries (int): 失败后最多重试的次数。
+    """
+
+    def __init__(self, transport, controller, metrics=None, retries=3, backoff_base=1.0, backoff_cap=30.0):
+        self.transport = transport
+        self.controller = controller
+        self.metrics = metrics
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    @property
+    def name(self):
+        return self.transport.name
+
+    def fetch_json(self, url):
+        """
+        请求指定 URL 并返回 JSON 数据，重试耗尽后返回最后一次的错误字典。
+        """
+        attempt = 0
+        while True:
+            self.controller.acquire(url)
+            self._record(crawl_metrics.IN_FLIGHT, 1)
+            start = time.time()
+            try:
+                data = self.transport.fetch_json(url)
+            except Exception:
+                # 会话本身出错（如浏览器崩溃）时交给调用方重建会话，但仍要归还名额
+                self._finish(url, time.time() - start, False)
+                raise
+            ok = "error" not in data
+            self._finish(url, time.time() - start, ok)
+            if ok or attempt >= self.retries:
+                return data
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+            attempt += 1
+            self._record(crawl_metrics.RETRIES, 1)
+            print(f"[重试] 请求失败: {data['error']}，{delay:.1f} 秒后进行第 {attempt} 次重试。")
+            time.sleep(delay)
+
+    def _record(self, field, amount):
+        if self.metrics is not None:
+            self.metrics.add(field, amount)
+
+    def _finish(self, url, latency, ok):
+        self.controller.release(url, latency, ok)
+        self._record(crawl_metrics.IN_FLIGHT, -1)
+        if self.metrics is not None:
+            self.metrics.observe_latency(latency, ok)
+
+    def close(self):
+        self.transport.close()
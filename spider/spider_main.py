@@ -6,19 +6,31 @@ import threading
 import queue
 import csv
 import os
+import sys
 import configparser
 from multiprocessing import Process, Queue, freeze_support
-from selenium import webdriver
+
+# 确保无论以脚本方式运行，还是以 `spider.spider_main` 方式被导入，都能找到同目录下的子模块
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
 
 # 导入自定义工具模块
 # from spider.tool import timer # 注意：此模块在当前代码中未被使用
+from spider_transport import SORT_DEFAULT, build_search_url, create_transport, extract_items
+from crawl_state import KEYWORDS_FILE, CrawlContext, KeywordDeduplicator, SeenJobIndex, TaskProgress
+from crawl_engine import AsyncCrawlEngine
+from columnar_output import open_sink, reset_columnar_dir
+from crawl_checkpoint import CHECKPOINT_FILE, CheckpointStore, run_signature
+from rate_control import AdaptiveRateController, ThrottledTransport
+from csv_preview import remove_index
+from crawl_metrics import (METRICS_FILE, DUPLICATES, ITEMS_WRITTEN, PAGE_ERRORS, TASKS_DONE,
+                           CrawlMetrics, write_snapshot)
 
 # --- 1. 读取城市代码配置 ---
 
 # 创建配置解析器实例
 config = configparser.ConfigParser()
-# 获取当前文件所在目录
-current_dir = os.path.dirname(os.path.abspath(__file__))
 # 构造配置文件的完整路径
 conf_path = os.path.join(current_dir, 'conf.ini')
 # 读取配置文件
@@ -42,18 +54,12 @@ def get_city_code(city_name: str) -> str:
         return "000000"
 
 
-# --- 2. 配置 Selenium WebDriver 选项 ---
-
-options = webdriver.ChromeOptions()
-# 禁用 'navigator.webdriver' 标志，防止被网站检测为自动化程序
-options.add_argument("--disable-blink-features=AutomationControlled")
-# options.add_argument("--headless")  # 无头模式，后台运行浏览器，可根据需要启用
-options.add_argument("--start-maximized")  # 启动时最大化窗口
-options.add_argument("--no-sandbox")  # 在容器化环境中运行时需要
-options.add_argument("--disable-gpu")  # 禁用GPU加速，某些环境下可避免问题
-options.add_argument("--disable-dev-shm-usage")  # 解决 Docker 或 CI 环境中的资源限制问题
-# 禁用不必要的日志输出
-options.add_experimental_option('excludeSwitches', ['enable-logging'])
+# CSV 文件的列，与 analysis/input_data.py 中导入的列顺序一致。
+# fingerprint 为职位指纹，用于关联 qcwy_keywords.csv 中记录的全部匹配关键词。
+CSV_FIELDS = ["provider", "keyword", "title", "place", "salary", "experience", "education",
+              "companytype", "industry", "description", "fingerprint"]
+# 列式文件的列：在 CSV 的列之外，还保存接口提供的职位 ID、发布日期和薪资上下限（带类型）。
+COLUMNAR_FIELDS = CSV_FIELDS + ["job_id", "issue_date", "salary_min", "salary_max"]
 
 
 # ==============================
@@ -64,32 +70,28 @@ class BaseSpider(object):
     爬虫基类，封装通用属性和方法。
     """
 
-    def __init__(self, city, job, city_code, queue, driver):
+    def __init__(self, city, job, city_code, queue, transport):
         self.city = city
         self.job = job
         self.city_code = city_code
         self.queue = queue
-        self.driver = driver
+        self.transport = transport
 
-    def request_json(self, keyword, page_num=1, jobArea="000000"):
+    def request_json(self, keyword, page_num=1, jobArea="000000", sort_type=SORT_DEFAULT):
         """
-        通过执行异步 JavaScript `fetch` 请求来获取招聘数据。
-        这种方式比 Selenium 直接操作页面元素更高效且不易被检测。
+        通过传输层请求招聘数据 API。
+        具体是走浏览器内的 `fetch` 还是 HTTP 连接池，由传入的 transport 决定。
 
         Args:
             keyword (str): 搜索的职位关键词。
             page_num (int): 请求的页码。
             jobArea (str): 城市代码。
+            sort_type (int): 排序方式，增量模式下按发布时间排序。
 
         Returns:
             dict: API返回的JSON数据，或在出错时返回包含'error'键的字典。
         """
-        script = f"""
-        var done = arguments[0];
-        fetch("https://we.51job.com/api/job/search-pc?api_key=51job&keyword={keyword}&searchType=2&sortType=0&pageNum={page_num}&pageSize=20&jobArea={jobArea}")
-            .then(r => r.json()).then(data => done(data)).catch(err => done({{'error': err.toString()}}));
-        """
-        return self.driver.execute_async_script(script)
+        return self.transport.fetch_json(build_search_url(keyword, page_num, jobArea, sort_type=sort_type))
 
 
 # ==============================
@@ -98,94 +100,100 @@ class BaseSpider(object):
 class Job51Spider(BaseSpider):
     """
     针对前程无忧网（51job.com）的爬虫实现。
-    继承自 BaseSpider，并添加了抓取数量限制的逻辑。
+    继承自 BaseSpider，并添加了抓取数量限制和增量爬取的逻辑（由 TaskProgress 负责）。
     """
 
-    def __init__(self, city, job, city_code, queue, driver, limit):
-        super().__init__(city, job, city_code, queue, driver)
-        self.limit = limit  # 每个任务的最大抓取数量
-        self.count = 0      # 当前任务已抓取数量
+    def __init__(self, city, job, city_code, queue, transport, context):
+        super().__init__(city, job, city_code, queue, transport)
+        self.context = context
+        self.limit = context.limit  # 每个任务的最大抓取数量
+        self.count = 0              # 当前任务已抓取数量
 
     def run(self):
         """
         爬虫主执行逻辑。
-        循环翻页，直到没有更多数据或达到数量上限。
+        循环翻页，直到没有更多数据、达到数量上限，或在增量模式下进入已抓取过的区间。
+        断点续爬时从断点的下一页开始；请求出错时不标记任务完成，以便下次续爬。
         """
-        # 初始访问页面，主要是为了建立会话和获取cookies
-        self.driver.get(f"https://we.51job.com/pc/search?jobArea={self.city_code}")
-        time.sleep(3)
-        page = 1
-        while True:
-            # 检查是否已达到抓取数量上限
-            if self.count >= self.limit:
-                print(f"[数量限制] {self.city}-{self.job} 已抓取 {self.count} 条，达到 {self.limit} 的上限，任务提前结束。")
-                break
-
-            data = self.request_json(self.job, page, self.city_code)
+        progress = TaskProgress(self.context, self.city, self.job)
+        self.count = progress.count
+        page = progress.start_page
+        while progress.done is None:
+            data = self.request_json(self.job, page, self.city_code, self.context.sort_type)
 
+            # 传输层已按退避策略重试过，仍然失败时放弃本任务，留待下次断点续爬
             if "error" in data:
-                print(f"[错误] 请求API失败: {data['error']}")
+                self.context.record(PAGE_ERRORS)
+                print(f"[错误] {self.city}-{self.job} 第 {page} 页请求API失败: {data['error']}")
                 break
 
-            jobs = data.get("resultbody", {}).get("job", {}).get("items", [])
+            jobs = extract_items(data)
             if not jobs:
+                self.queue.put(progress.batch(page, [], done=True))
                 print(f"[完成] {self.city}-{self.job} 所有页面已爬取完毕.")
                 break
 
-            for job in jobs:
-                if self.count >= self.limit:
-                    break
-                # 解析并构造结果字典
-                result = {
-                    "provider": "前程无忧网", "keyword": self.job, "title": job.get("jobName"),
-                    "place": job.get("jobAreaString"), "salary": job.get("provideSalaryString"),
-                    "experience": job.get("workYearString"), "education": job.get("degreeString"),
-                    "companytype": job.get("companyTypeString"),
-                    "industry": f"{job.get('companyIndustryType1Str')} / {job.get('companyIndustryType2Str')}",
-                    "description": job.get("jobDescribe")
-                }
-                self.queue.put(result)
-                self.count += 1
+            # 解析并构造结果字典，已见过的职位在增量模式下会被跳过；
+            # 整页结果连同断点信息作为一个批次放入队列
+            self.queue.put(progress.batch(page, progress.accept_page(jobs)))
+            self.count = progress.count
 
             print(f"[进度] {self.city}-{self.job} 第 {page} 页抓取成功，当前已抓取 {self.count}/{self.limit} 条")
             page += 1
+        progress.report_done()
         return "over"
 
 
 # ==============================
-#  进程：爬虫任务 (生产者)
+#  进程：常驻爬虫工作者 (生产者)
 # ==============================
-class SpiderProcess(Process):
+class SpiderWorker(Process):
     """
-    将单个爬虫任务（例如“北京-Java”）封装在一个独立的进程中。
-    这是实现并发爬取的关键，每个进程都有自己的 WebDriver 实例，避免了线程安全问题。
+    常驻的爬虫工作进程，组成固定大小的工作者池。
+    每个工作者在整个生命周期内只持有一个传输层会话（HTTP 连接池或浏览器），
+    从共享的任务队列中不断领取 (城市, 职位) 任务执行，直到收到停止信号。
+    这样浏览器/连接数量被限制为工作者数量，也省去了每个任务的启动和预热开销。
+    所有工作者共享同一个自适应限速控制器，请求速率对整个爬虫统一调节。
     """
 
-    def __init__(self, city, job, queue, limit):
+    def __init__(self, worker_id, task_queue, queue, context, controller, backend="auto"):
         super().__init__()
-        self.city = city
-        self.job = job
+        self.worker_id = worker_id
+        self.task_queue = task_queue
         self.queue = queue
-        self.limit = limit
+        self.context = context
+        self.controller = controller
+        self.backend = backend
 
     def run(self):
         """
         进程启动后执行的方法。
         """
-        process_driver = None
+        transport = None
+        finished = 0
         try:
-            # 每个进程必须创建自己的 WebDriver 实例
-            process_driver = webdriver.Chrome(options=options)
-            city_code = get_city_code(self.city)
-            print(f"启动爬虫进程: 城市='{self.city}', 职位='{self.job}', 数量上限={self.limit}")
-            spider = Job51Spider(self.city, self.job, city_code, self.queue, process_driver, self.limit)
-            spider.run()
-        except Exception as e:
-            print(f"爬虫进程 '{self.city}-{self.job}' 发生严重错误: {e}")
+            while True:
+                task = self.task_queue.get()
+                # 收到停止信号，说明任务队列已经取空
+                if task == "STOP":
+                    break
+                city, job = task
+                try:
+                    # 传输层会话按需创建；若上一个任务导致会话损坏，则在此处重建
+                    if transport is None:
+                        transport = ThrottledTransport(create_transport(self.backend), self.controller,
+                                                       self.context.metrics)
+                    run_task(city, job, self.queue, transport, self.context)
+                    finished += 1
+                except Exception as e:
+                    print(f"工作者 #{self.worker_id} 执行任务 '{city}-{job}' 时发生严重错误: {e}")
+                    # 丢弃可能已损坏的会话，下一个任务将重新创建
+                    close_quietly(transport)
+                    transport = None
         finally:
-            # 确保进程结束时浏览器被正确关闭
-            if process_driver:
-                process_driver.quit()
+            # 确保进程结束时浏览器/连接被正确关闭
+            close_quietly(transport)
+            print(f"工作者 #{self.worker_id} 退出，共完成 {finished} 个任务。")
 
 
 # ==============================
@@ -194,14 +202,50 @@ class SpiderProcess(Process):
 class WriterProcess(Process):
     """
     独立的写文件进程。
-    从队列中获取爬虫进程产生的数据，并写入CSV文件。
+    从队列中成批获取爬虫产生的数据（每页一批），经过去重阶段后缓冲，
+    攒够一定行数再成块写入 CSV 以及可选的列式文件。
     这种“生产者-消费者”模式可以避免多进程写文件冲突，并提高效率。
+    写入进程也是已见职位索引和断点的唯一写入者，每写入一块就记录其中职位的指纹，
+    以及这些数据对应的任务断点。
+    同时负责每隔几秒把共享的进度指标汇总写入指标快照文件，供服务器展示。
     """
 
-    def __init__(self, queue, filename="data/qcwy.csv"):
+    def __init__(self, queue, filename="data/qcwy.csv", append=False, seen_index_path=None,
+                 keywords_file=KEYWORDS_FILE, columnar=None, flush_rows=500,
+                 checkpoint_file=None, resumed=False, metrics=None, controller=None,
+                 metrics_file=METRICS_FILE, metrics_interval=2):
         super().__init__()
         self.queue = queue
         self.filename = filename
+        self.append = append
+        self.seen_index_path = seen_index_path
+        self.keywords_file = keywords_file
+        self.checkpoint_file = checkpoint_file
+        self.resumed = resumed        # 是否为断点续爬，续爬时用已见职位索引初始化去重阶段
+        self.columnar = columnar      # 可选的列式输出格式: 'parquet'、'arrow' 或 None
+        self.flush_rows = flush_rows  # 缓冲区达到多少行时写盘
+        self.metrics = metrics
+        self.controller = controller
+        self.metrics_file = metrics_file
+        self.metrics_interval = metrics_interval  # 指标快照的写入间隔（秒）
+
+    def report(self, status, tasks):
+        """
+        汇总共享指标、队列深度、限速状态和每个任务的进度，写入指标快照文件。
+        """
+        if self.metrics is None or not self.metrics_file:
+            return
+        data = self.metrics.snapshot()
+        try:
+            data["queue_depth"] = self.queue.qsize()
+        except NotImplementedError:  # macOS 不支持 qsize
+            data["queue_depth"] = None
+        data["status"] = status
+        data["updated_at"] = time.time()
+        data["rate_control"] = self.controller.snapshot() if self.controller else {}
+        data["tasks"] = [{"city": city, "job": job, "page": page, "count": count, "done": done}
+                         for (city, job), (page, count, done) in sorted(tasks.items())]
+        write_snapshot(data, self.metrics_file)
 
     def run(self):
         """
@@ -209,115 +253,119 @@ class WriterProcess(Process):
         """
         # 确保目录存在
         os.makedirs(os.path.dirname(self.filename), exist_ok=True)
-        with open(self.filename, "w", newline="", encoding="utf-8-sig") as f:
-            fieldnames = ["provider", "keyword", "title", "place", "salary", "experience", "education",
-                          "companytype", "industry", "description"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-
+        # 增量模式下追加到已有文件，只有新文件才写表头
+        append = self.append and os.path.exists(self.filename) and os.path.getsize(self.filename) > 0
+        # 去重阶段：同一职位只写入一次，并记录它被哪些关键词搜到
+        dedup = KeywordDeduplicator()
+        if append:
+            dedup.load(self.keywords_file)
+        if append and self.resumed and self.seen_index_path:
+            dedup.seed(SeenJobIndex.load(self.seen_index_path))
+        sink = open_sink(self.columnar, COLUMNAR_FIELDS)
+        store = CheckpointStore(self.checkpoint_file) if self.checkpoint_file else None
+        buffer = []
+        checkpoints = {}  # 尚未记录的断点: {(城市, 职位): (页码, 已抓取数量, 是否完成)}
+        tasks = {}        # 本次运行中每个任务的最新进度，格式同上，用于指标快照
+        self.report("running", tasks)
+        last_report = time.time()
+        with open(self.filename, "a" if append else "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if not append:
+                writer.writeheader()
+
+            def flush():
+                if buffer:
+                    writer.writerows(buffer)
+                    # 先保证 CSV 落盘，再记录指纹，避免索引中出现 CSV 里没有的职位
+                    f.flush()
+                    if self.seen_index_path:
+                        SeenJobIndex.append(self.seen_index_path, [row["fingerprint"] for row in buffer])
+                    if sink:
+                        sink.write(buffer)
+                    if self.metrics is not None:
+                        self.metrics.add(ITEMS_WRITTEN, len(buffer))
+                    del buffer[:]
+                # 数据落盘之后才记录断点，断点永远不会超前于已保存的数据
+                if store:
+                    store.record(checkpoints)
+                checkpoints.clear()
+
+            idle_seconds = 0
             while True:
+                if time.time() - last_report >= self.metrics_interval:
+                    self.report("running", tasks)
+                    last_report = time.time()
                 try:
-                    # 从队列中获取数据，设置60秒超时
-                    item = self.queue.get(timeout=60)
-                    # 收到停止信号，结束循环
-                    if item == "STOP":
-                        print("写入进程收到停止信号，即将退出。")
-                        break
-                    writer.writerow(item)
+                    # 每秒检查一次队列，空闲时顺便把缓冲区写盘
+                    batch = self.queue.get(timeout=1)
                 except queue.Empty:
+                    flush()
+                    idle_seconds += 1
                     # 如果60秒内队列中没有新数据，则认为所有爬虫已结束
-                    print("写入进程长时间未收到数据，自动停止。")
+                    if idle_seconds >= 60:
+                        print("写入进程长时间未收到数据，自动停止。")
+                        break
+                    continue
+                idle_seconds = 0
+                # 收到停止信号，结束循环
+                if batch == "STOP":
+                    print("写入进程收到停止信号，即将退出。")
                     break
+                duplicates = dedup.duplicates
+                for item in batch["items"]:
+                    if dedup.accept(item["fingerprint"], item["keyword"]):
+                        buffer.append(item)
+                key = (batch["city"], batch["job"])
+                if self.metrics is not None:
+                    self.metrics.add(DUPLICATES, dedup.duplicates - duplicates)
+                    if batch["done"] and not tasks.get(key, (0, 0, False))[2]:
+                        self.metrics.add(TASKS_DONE)
+                checkpoints[key] = tasks[key] = (batch["page"], batch["count"], batch["done"])
+                if len(buffer) >= self.flush_rows:
+                    flush()
+            flush()
+        if sink:
+            sink.close()
+        if store:
+            store.close()
+        self.report("finished", tasks)
+        if self.keywords_file:
+            dedup.save(self.keywords_file)
+        print(f"写入进程共保存 {len(dedup)} 条唯一职位，拦截重复职位 {dedup.duplicates} 条。")
 
 
 # ==============================
-#  HTML 生成函数
+#  单个任务执行函数
 # ==============================
-def generate_html_from_csv(csv_file="data/qcwy.csv", html_file="static/html/data.html"):
+def run_task(city, job, queue, transport, context):
     """
-    读取CSV文件内容，并生成一个简单的HTML表格页面用于数据预览。
+    使用一个已创建的传输层会话执行单个 (城市, 职位) 爬虫任务。
+    工作者池和串行模式共用此函数，会话由调用方负责创建和关闭。
     """
-    os.makedirs(os.path.dirname(html_file), exist_ok=True)
-    rows = []
-    headers = []
-    try:
-        with open(csv_file, 'r', encoding='utf-8-sig') as f:
-            reader = csv.reader(f)
-            headers = next(reader)
-            rows = list(reader)
-    except (FileNotFoundError, StopIteration):
-        print(f"警告: CSV文件 '{csv_file}' 为空或不存在，将生成一个空的HTML表格。")
-        if not headers:
-            headers = ["provider", "keyword", "title", "place", "salary", "experience",
-                       "education", "companytype", "industry", "description"]
-
-    # 拼接HTML字符串
-    html_content = [
-        '<!DOCTYPE html>', '<html lang="zh-CN">', '<head>',
-        '    <meta charset="UTF-8">', '<meta name="viewport" content="width=device-width, initial-scale=1.0">',
-        '<title>招聘数据展示</title>', '<style>',
-        'body { font-family: Arial, sans-serif; margin: 20px; }',
-        'table { width: 100%; border-collapse: collapse; margin-top: 20px; }',
-        'th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }',
-        'th { background-color: #f2f2f2; }',
-        'tr:nth-child(even) { background-color: #f9f9f9; }',
-        'tr:hover { background-color: #f1f1f1; }', '</style>',
-        '</head>', '<body>', '<h1>招聘数据展示</h1>', '<table>', '<thead>', '<tr>'
-    ]
-    for header in headers:
-        html_content.append(f'<th>{header}</th>')
-    html_content.extend(['</tr>', '</thead>', '<tbody>'])
-    for row in rows:
-        html_content.append('<tr>')
-        for cell in row:
-            html_content.append(f'<td>{cell}</td>')
-        html_content.append('</tr>')
-    html_content.extend(['</tbody>', '</table>', '</body>', '''
-        <!-- 通用导航栏 -->
-        <div class="navbar">
-            <a href="/" class="nav-button">返回主页</a>
-        </div>
-        <style>
-            .navbar {
-                position: fixed; top: 0; left: 0; width: 100%;
-                background-color: #333; padding: 10px 20px;
-                box-shadow: 0 2px 5px rgba(0,0,0,0.2); z-index: 1000;
-                box-sizing: border-box; /* 确保 padding 不会撑大宽度 */
-            }
-            .nav-button {
-                color: white; text-decoration: none; padding: 8px 15px;
-                border-radius: 5px; transition: background-color 0.3s;
-            }
-            .nav-button:hover { background-color: #555; }
-            /* 为页面主体增加上边距，防止被导航栏遮挡 */
-            body { padding-top: 60px; }
-        </style>
-        ''', '</html>'])
-
-    with open(html_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(html_content))
-    print(f"HTML报告已生成: {html_file}")
+    city_code = get_city_code(city)
+    print(f"启动任务: 城市='{city}', 职位='{job}', 数量上限={context.limit}")
+    spider = Job51Spider(city, job, city_code, queue, transport, context)
+    return spider.run()
 
 
-# ==============================
-#  串行任务执行函数
-# ==============================
-def run_single_task(city, job, queue, limit):
+def close_quietly(transport):
     """
-    在主进程中按顺序执行单个爬虫任务。用于非并发模式。
+    关闭传输层会话，忽略关闭过程中的异常（会话可能已经损坏）。
     """
-    process_driver = None
+    if transport is None:
+        return
     try:
-        process_driver = webdriver.Chrome(options=options)
-        city_code = get_city_code(city)
-        print(f"【串行模式】启动任务: 城市='{city}', 职位='{job}', 数量上限={limit}")
-        spider = Job51Spider(city, job, city_code, queue, process_driver, limit)
-        spider.run()
-    except Exception as e:
-        print(f"串行任务 '{city}-{job}' 发生严重错误: {e}")
-    finally:
-        if process_driver:
-            process_driver.quit()
+        transport.close()
+    except Exception:
+        pass
+
+
+def default_worker_count(task_count):
+    """
+    计算工作者池的默认大小：不超过 CPU 核数，也不超过任务数。
+    浏览器方式下每个工作者持有一个 Chrome 实例，内存紧张时应通过 `workers` 参数调小。
+    """
+    return max(1, min(os.cpu_count() or 1, task_count))
 
 
 # ==============================
@@ -326,8 +374,8 @@ def run_single_task(city, job, queue, limit):
 def run_crawl_once(dict_parameter: dict):
     """
     执行一次完整的爬取流程。
-    该函数负责解析参数、准备文件、启动生产者（爬虫）和消费者（写入）进程，
-    并最终生成HTML报告。
+    该函数负责解析参数、准备文件、启动生产者（爬虫）和消费者（写入）进程。
+    结果预览由服务器按页读取 CSV（见 csv_preview.py），不再生成静态 HTML。
     """
     # --- 1. 定义默认的城市和职位关键词列表 ---
     # 如果用户没有提供，则使用这些丰富的默认值
@@ -362,46 +410,111 @@ def run_crawl_once(dict_parameter: dict):
     # --- 3. 获取其他参数 ---
     limit_per_task = dict_parameter.get("limit", 999999)
     use_concurrent = dict_parameter.get("concurrent", True)
+    tasks = [(city, job) for city in city_list for job in job_list]
+    backend = dict_parameter.get("backend") or "auto"
+    # 抓取引擎: 'pool' 为多进程工作者池，'async' 为单进程协程引擎（仅支持 HTTP 方式）
+    engine = dict_parameter.get("engine") or "pool"
+
+    # 增量模式: 保留已有数据，只追加新职位；全量模式: 清空数据并重建已见职位索引
+    incremental = dict_parameter.get("incremental", False)
+
+    # 断点续爬: 上一次相同参数的爬取未正常结束时，跳过已完成的任务，未完成的任务从断点继续
+    checkpoint = CheckpointStore(CHECKPOINT_FILE)
+    resumed = checkpoint.begin(run_signature(city_list, job_list, limit_per_task, incremental),
+                               resume=dict_parameter.get("resume", True))
+    resume_points = {}
+    if resumed:
+        finished = checkpoint.finished_tasks()
+        resume_points = checkpoint.resume_points()
+        tasks = [task for task in tasks if task not in finished]
+        print(f"模式: 断点续爬，跳过 {len(finished)} 个已完成的任务，{len(resume_points)} 个任务从断点继续。")
+    # 所有爬虫进程共享的进度指标，由写入进程定期写入 data/crawl_metrics.json
+    metrics = CrawlMetrics(tasks_total=len(tasks))
+    context = CrawlContext(limit_per_task, incremental=incremental,
+                           stop_after_known=dict_parameter.get("stop_after_known", 20),
+                           resume=resume_points, metrics=metrics)
+    worker_count = dict_parameter.get("workers") or default_worker_count(len(tasks))
+    # 所有工作者（进程或线程）共享的自适应限速控制器，`rate` 为初始的每秒请求数
+    max_concurrency = dict_parameter.get("concurrency", 16)
+    controller = AdaptiveRateController(rate=dict_parameter.get("rate", 5),
+                                        max_rate=dict_parameter.get("max_rate", 20),
+                                        concurrency=min(worker_count, max_concurrency),
+                                        max_concurrency=max_concurrency)
 
     # --- 4. 准备文件和启动写入进程 ---
     csv_file = "data/qcwy.csv"
-    html_file = "static/html/data.html"
     os.makedirs("data", exist_ok=True)
-    os.makedirs("static/html", exist_ok=True)
-    if os.path.exists(csv_file): os.remove(csv_file)
-    if os.path.exists(html_file): os.remove(html_file)
+    if incremental:
+        print(f"模式: 增量爬取，已见职位索引中共有 {len(context.seen)} 条记录。")
+    elif not resumed:
+        if os.path.exists(csv_file): os.remove(csv_file)
+        remove_index(csv_file)
+        if os.path.exists(KEYWORDS_FILE): os.remove(KEYWORDS_FILE)
+        SeenJobIndex.reset(context.seen_index_path)
+        reset_columnar_dir()
 
     q = Queue()
-    writer = WriterProcess(q, filename=csv_file)
+    writer = WriterProcess(q, filename=csv_file, append=incremental or resumed,
+                           seen_index_path=context.seen_index_path, columnar=dict_parameter.get("columnar"),
+                           checkpoint_file=CHECKPOINT_FILE, resumed=resumed,
+                           metrics=metrics, controller=controller)
     writer.start()
 
-    # --- 5. 根据配置启动爬虫（并发或串行） ---
-    if use_concurrent:
-        processes = []
-        for city in city_list:
-            for job in job_list:
-                p = SpiderProcess(city, job, q, limit_per_task)
-                processes.append(p)
-                p.start()
-                # 增加短暂延时，避免瞬间启动大量浏览器实例，降低被封禁风险
+    # --- 5. 根据配置启动爬虫（协程、并发或串行） ---
+    if use_concurrent and engine == "async" and backend != "selenium":
+        async_engine = AsyncCrawlEngine(q, context, controller, concurrency=max_concurrency)
+        print(f"启动协程抓取引擎，共 {len(tasks)} 个任务。")
+        total = async_engine.run([(city, job, get_city_code(city)) for city, job in tasks])
+        print(f"协程抓取引擎已执行完毕，共抓取 {total} 条。")
+    elif use_concurrent:
+        # 所有任务先放入共享任务队列，再为每个工作者追加一个停止信号
+        task_queue = Queue()
+        for task in tasks:
+            task_queue.put(task)
+        for _ in range(worker_count):
+            task_queue.put("STOP")
+
+        print(f"启动 {worker_count} 个爬虫工作者，共 {len(tasks)} 个任务。")
+        workers = []
+        for worker_id in range(worker_count):
+            p = SpiderWorker(worker_id, task_queue, q, context, controller, backend)
+            workers.append(p)
+            p.start()
+            # 浏览器方式下错开启动时间，避免同时启动多个 Chrome 造成瞬时资源峰值
+            if backend == "selenium":
                 time.sleep(1.5)
-        # 等待所有爬虫进程执行完毕
-        for p in processes:
+        # 等待所有工作者执行完毕
+        for p in workers:
             p.join()
-        print("所有并发爬虫进程已执行完毕。")
+        print("所有并发爬虫工作者已执行完毕。")
     else:
-        # 串行执行
-        for city in city_list:
-            for job in job_list:
-                run_single_task(city, job, q, limit_per_task)
+        # 串行执行：整个过程只使用一个传输层会话
+        transport = None
+        try:
+            for city, job in tasks:
+                try:
+                    if transport is None:
+                        transport = ThrottledTransport(create_transport(backend), controller, context.metrics)
+                    run_task(city, job, q, transport, context)
+                except Exception as e:
+                    print(f"串行任务 '{city}-{job}' 发生严重错误: {e}")
+                    close_quietly(transport)
+                    transport = None
+        finally:
+            close_quietly(transport)
         print("所有串行爬虫任务已执行完毕。")
 
-    # --- 6. 结束写入进程并生成HTML报告 ---
+    # --- 6. 结束写入进程 ---
     q.put("STOP")  # 发送停止信号
     writer.join()  # 等待写入进程结束
     print("写入进程已结束.")
-
-    generate_html_from_csv(csv_file, html_file)
+    for host, state in controller.snapshot().items():
+        if state["requests"]:
+            print(f"限速统计 [{host}]: 共 {state['requests']} 次请求，失败 {state['errors']} 次，"
+                  f"最终速率 {state['rate']} 次/秒，并发 {state['concurrency']}，平均延迟 {state['latency']} 秒")
+    # 本次爬取正常结束，下一次爬取将重新开始
+    checkpoint.finish()
+    checkpoint.close()
 
 
 # ==============================
@@ -0,0 +1,349 @@
+# /spider/spider_transport.py
+
+# ==============================================================================
+#  爬虫模块 - 请求传输层
+# ==============================================================================
+#
+#  说明:
+#  此模块封装了“如何把一次 API 请求发送到 51job”这件事，爬虫类只需要调用
+#  `transport.fetch_json(url)`，而不关心底层是浏览器还是 HTTP 客户端。
+#  同时集中存放 51job API 的 URL 构造和响应解析，供各种爬虫引擎共用。
+#
+#  可选的传输方式 (backend):
+#  1. 'http'     : 基于 requests.Session 的无浏览器传输，使用连接池和 keep-alive。
+#                  仅当接口拒绝请求（返回非 JSON）时，才启动一次浏览器获取 cookies。
+#  2. 'selenium' : 原有方式，在 Chrome 中执行 JS `fetch`，作为兜底方案保留。
+#  3. 'auto'     : 默认值。优先使用 'http'，连续失败后自动切换到 'selenium'。
+#
+# ==============================================================================
+
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Selenium 只在浏览器传输或获取 cookies 时才需要，未安装时 'http' 方式仍然可用
+try:
+    from selenium import webdriver
+except ImportError:
+    webdriver = None
+
+# --- 1. 目标网站地址 ---
+
+API_URL = "https://we.51job.com/api/job/search-pc"
+SEARCH_PAGE_URL = "https://we.51job.com/pc/search"
+
+# 浏览器获取到的 cookies 缓存文件，供所有工作者共享，避免每个进程都启动浏览器
+COOKIE_FILE = "data/51job_cookies.json"
+
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"),
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9",
+    "Referer": SEARCH_PAGE_URL,
+}
+
+
+# 搜索结果排序方式: 0 为综合排序，1 为按发布时间从新到旧（增量爬取使用）
+SORT_DEFAULT = 0
+SORT_LATEST = 1
+
+
+def build_search_url(keyword, page_num=1, job_area="000000", page_size=20, sort_type=SORT_DEFAULT):
+    """
+    构造 51job 职位搜索 API 的完整 URL。
+    关键词会被正确编码，例如 'C++' 不会被误解析为 'C  '。
+    """
+    params = {
+        "api_key": "51job", "keyword": keyword, "searchType": 2, "sortType": sort_type,
+        "pageNum": page_num, "pageSize": page_size, "jobArea": job_area,
+    }
+    return f"{API_URL}?{urlencode(params)}"
+
+
+def extract_items(data):
+    """
+    从 API 响应中取出职位列表，没有数据时返回空列表。
+    """
+    return data.get("resultbody", {}).get("job", {}).get("items", []) or []
+
+
+def extract_total_count(data):
+    """
+    从 API 响应中取出符合条件的职位总数，接口未提供时返回 None。
+    """
+    try:
+        return int(data.get("resultbody", {}).get("job", {}).get("totalCount"))
+    except (TypeError, ValueError):
+        return None
+
+
+def job_fingerprint(item):
+    """
+    计算职位的稳定指纹（16 位十六进制字符串）。
+    优先使用接口返回的职位 ID；没有 ID 时，用职位名、公司、地点和薪资的规范化组合计算，
+    因此同一职位无论被哪个关键词或城市搜到，指纹都相同。
+    """
+    job_id = item.get("jobId")
+    if job_id:
+        key = f"51job:{job_id}"
+    else:
+        parts = (item.get("jobName"), item.get("fullCompanyName") or item.get("companyName"),
+                 item.get("jobAreaString"), item.get("provideSalaryString"))
+        key = "|".join(" ".join(str(p or "").split()).lower() for p in parts)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def to_result(item, keyword):
+    """
+    把 API 返回的单个职位转换为写入 CSV 的结果字典。
+    `fingerprint` 字段也写入 CSV（见 CSV_FIELDS 的最后一列）：写入进程用它维护已见职位索引，
+    导入数据库时它作为 `job_key` 唯一键，增量导入据此更新已有职位、去除重复行。
+    `job_id`、`issue_date`、`salary_min`、`salary_max` 保留接口的原始值，只写入列式文件
+    （见 COLUMNAR_FIELDS），由列式输出转换为整数和时间戳。
+    """
+    return {
+        "provider": "前程无忧网", "keyword": keyword, "title": item.get("jobName"),
+        "place": item.get("jobAreaString"), "salary": item.get("provideSalaryString"),
+        "experience": item.get("workYearString"), "education": item.get("degreeString"),
+        "companytype": item.get("companyTypeString"),
+        "industry": f"{item.get('companyIndustryType1Str')} / {item.get('companyIndustryType2Str')}",
+        "description": item.get("jobDescribe"),
+        "fingerprint": job_fingerprint(item),
+        "job_id": item.get("jobId"), "issue_date": item.get("issueDateString"),
+        "salary_min": item.get("jobSalaryMin"), "salary_max": item.get("jobSalaryMax")
+    }
+
+
+# --- 2. Selenium WebDriver 配置 ---
+
+def chrome_options():
+    """
+    生成 Chrome 启动选项。
+    """
+    options = webdriver.ChromeOptions()
+    # 禁用 'navigator.webdriver' 标志，防止被网站检测为自动化程序
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    # options.add_argument("--headless")  # 无头模式，后台运行浏览器，可根据需要启用
+    options.add_argument("--start-maximized")  # 启动时最大化窗口
+    options.add_argument("--no-sandbox")  # 在容器化环境中运行时需要
+    options.add_argument("--disable-gpu")  # 禁用GPU加速，某些环境下可避免问题
+    options.add_argument("--disable-dev-shm-usage")  # 解决 Docker 或 CI 环境中的资源限制问题
+    # 禁用不必要的日志输出
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    return options
+
+
+def create_driver():
+    """
+    创建一个新的 WebDriver 会话并完成预热。
+    预热即访问一次搜索页，以建立会话和获取 cookies，之后同一个会话可以反复调用 API。
+    """
+    if webdriver is None:
+        raise RuntimeError("未安装 selenium，无法使用浏览器方式抓取，请改用 'http' 方式。")
+    driver = webdriver.Chrome(options=chrome_options())
+    warm_up_driver(driver)
+    return driver
+
+
+def warm_up_driver(driver, city_code="000000", timeout=3.0):
+    """
+    访问 51job 搜索页以建立会话、获取 cookies。
+    每个 WebDriver 会话只需要执行一次，而不是每个任务执行一次。
+    页面加载后轮询 cookies，一旦拿到即返回，最多等待 `timeout` 秒，而不是固定等待。
+    """
+    driver.get(f"{SEARCH_PAGE_URL}?jobArea={city_code}")
+    deadline = time.time() + timeout
+    while not driver.get_cookies() and time.time() < deadline:
+        time.sleep(0.2)
+
+
+# ==============================
+#  传输方式：浏览器内 fetch
+# ==============================
+class SeleniumTransport(object):
+    """
+    在 Chrome 中执行异步 JavaScript `fetch` 来请求 API。
+    浏览器会话在第一次请求时才创建，并在整个生命周期内复用。
+    """
+    name = "selenium"
+
+    def __init__(self, driver=None):
+        self._driver = driver
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = create_driver()
+        return self._driver
+
+    def fetch_json(self, url):
+        """
+        请求指定 URL 并返回 JSON 数据，出错时返回包含 'error' 键的字典。
+        """
+        script = f"""
+        var done = arguments[0];
+        fetch({json.dumps(url)})
+            .then(r => r.json()).then(data => done(data)).catch(err => done({{'error': err.toString()}}));
+        """
+        return self.driver.execute_async_script(script)
+
+    def close(self):
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            finally:
+                self._driver = None
+
+
+# ==============================
+#  传输方式：HTTP 连接池
+# ==============================
+class HttpTransport(object):
+    """
+    基于 requests.Session 的无浏览器传输方式。
+    Session 自带连接池并保持 keep-alive，同一工作者的所有请求复用 TCP/TLS 连接。
+    当接口返回非 JSON（通常是被要求先访问页面）时，才启动一次浏览器获取 cookies，
+    获取后立即关闭浏览器，并把 cookies 缓存到文件供其他工作者复用。
+    """
+    name = "http"
+
+    def __init__(self, pool_size=10, timeout=15, cookie_file=COOKIE_FILE):
+        self.timeout = timeout
+        self.cookie_file = cookie_file
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._bootstrapped = False
+        self._load_cookies()
+
+    def fetch_json(self, url):
+        """
+        请求指定 URL 并返回 JSON 数据，出错时返回包含 'error' 键的字典。
+        """
+        data = self._get(url)
+        if "error" in data and data.get("retry_with_cookies") and not self._bootstrapped:
+            # 接口拒绝了无 cookies 的请求，借助浏览器获取一次 cookies 后重试
+            try:
+                self.bootstrap_cookies()
+            except Exception as e:
+                return {"error": f"通过浏览器获取 cookies 失败: {e}"}
+            data = self._get(url)
+        data.pop("retry_with_cookies", None)
+        return data
+
+    def _get(self, url):
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            return {"error": str(e)}
+        try:
+            return response.json()
+        except ValueError:
+            return {"error": f"HTTP {response.status_code}: 接口返回了非 JSON 内容", "retry_with_cookies": True}
+
+    def bootstrap_cookies(self):
+        """
+        启动一次浏览器，预热后把 cookies 和 User-Agent 复制到 Session 中，然后关闭浏览器。
+        """
+        self._bootstrapped = True
+        print("HTTP 传输: 正在通过浏览器获取 cookies...")
+        driver = create_driver()
+        try:
+            cookies = driver.get_cookies()
+            user_agent = driver.execute_script("return navigator.userAgent")
+        finally:
+            driver.quit()
+        self._apply_cookies(cookies, user_agent)
+        self._save_cookies(cookies, user_agent)
+
+    def _apply_cookies(self, cookies, user_agent=None):
+        for c in cookies:
+            self.session.cookies.set(c["name"], c["value"], domain=c.get("domain"), path=c.get("path", "/"))
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+
+    def _load_cookies(self):
+        if not self.cookie_file or not os.path.exists(self.cookie_file):
+            return
+        try:
+            with open(self.cookie_file, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self._apply_cookies(saved.get("cookies", []), saved.get("user_agent"))
+        except (ValueError, OSError) as e:
+            print(f"警告: 读取 cookies 缓存失败，将忽略: {e}")
+
+    def _save_cookies(self, cookies, user_agent):
+        if not self.cookie_file:
+            return
+        os.makedirs(os.path.dirname(self.cookie_file) or ".", exist_ok=True)
+        tmp_file = f"{self.cookie_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"cookies": cookies, "user_agent": user_agent}, f, ensure_ascii=False)
+        # 先写临时文件再替换，避免多个工作者同时写入时读到半个文件
+        os.replace(tmp_file, self.cookie_file)
+
+    def close(self):
+        self.session.close()
+
+
+# ==============================
+#  传输方式：自动选择
+# ==============================
+class AutoTransport(object):
+    """
+    优先使用 HTTP 传输；连续失败达到阈值后，切换到浏览器传输并不再切回。
+    """
+
+    def __init__(self, max_failures=3):
+        self.max_failures = max_failures
+        self.failures = 0
+        self.http = HttpTransport()
+        self.selenium = None
+
+    @property
+    def name(self):
+        return "selenium" if self.selenium else "http"
+
+    def fetch_json(self, url):
+        if self.selenium is not None:
+            return self.selenium.fetch_json(url)
+        data = self.http.fetch_json(url)
+        if "error" not in data:
+            self.failures = 0
+            return data
+        self.failures += 1
+        if self.failures >= self.max_failures and webdriver is not None:
+            print(f"HTTP 传输连续失败 {self.failures} 次，切换为浏览器传输。")
+            self.selenium = SeleniumTransport()
+            return self.selenium.fetch_json(url)
+        return data
+
+    def close(self):
+        self.http.close()
+        if self.selenium is not None:
+            self.selenium.close()
+
+
+def create_transport(backend="auto"):
+    """
+    根据名称创建传输层实例。
+
+    Args:
+        backend (str): 'auto'、'http' 或 'selenium'。
+
+    Returns:
+        具有 `fetch_json(url)` 和 `close()` 方法的传输层对象。
+    """
+    if backend == "selenium":
+        return SeleniumTransport()
+    if backend == "http":
+        return HttpTransport()
+    return AutoTransport()
@@ -0,0 +1,134 @@
+# /tests/test_csv_preview.py
+
+# ==============================================================================
+#  测试 - CSV 分页预览的字节偏移索引
+# ==============================================================================
+#
+#  说明:
+#  `CsvRowIndex` 按引号奇偶判断记录边界，只扫描新追加的部分，并通过文件开头的
+#  校验值发现 CSV 被重写。此测试用与爬虫相同的方式（utf-8-sig、csv 模块默认的
+#  \r\n 换行）写入 CSV，覆盖多行字段、转义引号、未写完的记录、增量扫描与重写检测。
+#
+# ==============================================================================
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'spider'))
+
+from csv_preview import CsvRowIndex, index_path_for, remove_index
+
+HEADER = ['title', 'place', 'description']
+
+
+class CsvRowIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'qcwy.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, rows, mode='w', header=True):
+        with open(self.path, mode, newline='', encoding='utf-8-sig' if mode == 'w' else 'utf-8') as f:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(HEADER)
+            writer.writerows(rows)
+
+    def append_raw(self, text):
+        with open(self.path, 'ab') as f:
+            f.write(text.encode('utf-8'))
+
+    def test_quoted_newlines_and_escaped_quotes(self):
+        rows = [
+            ['数据分析师', '上海', '岗位职责:\n1. 数据清洗\n2. 报表'],
+            ['算法工程师', '北京', '要求 "熟悉" Python,\n"有经验"优先'],
+            ['Java开发', '深圳', ''],
+        ]
+        self.write(rows)
+        page = CsvRowIndex(self.path).page(0, 10)
+        self.assertEqual(page['total'], 3)
+        self.assertEqual(page['columns'], HEADER)
+        self.assertEqual(page['rows'], rows)
+
+    def test_page_offset_limit_and_columns(self):
+        rows = [[f'职位{i}', '上海', f'描述\n第{i}条'] for i in range(10)]
+        self.write(rows)
+        index = CsvRowIndex(self.path)
+
+        page = index.page(offset=7, limit=5, columns=['title'])
+        self.assertEqual((page['total'], page['offset'], page['limit']), (10, 7, 3))
+        self.assertEqual(page['columns'], ['title'])
+        self.assertEqual(page['rows'], [['职位7'], ['职位8'], ['职位9']])
+
+        page = index.page(offset=50, limit=5)
+        self.assertEqual((page['offset'], page['limit'], page['rows']), (10, 0, []))
+
+    def test_incomplete_tail_is_not_indexed(self):
+        self.write([['职位0', '上海', 'a']])
+        # 写入进程正在写一条记录：引号尚未闭合
+        self.append_raw('职位1,北京,"第一行\r\n第二')
+        index = CsvRowIndex(self.path)
+        self.assertEqual(index.page(0, 10)['total'], 1)
+
+        self.append_raw('行"\r\n')
+        page = index.page(0, 10)
+        self.assertEqual(page['total'], 2)
+        self.assertEqual(page['rows'][1], ['职位1', '北京', '第一行\r\n第二行'])
+
+    def test_appended_rows_are_scanned_incrementally(self):
+        self.write([['职位0', '上海', 'a']])
+        index = CsvRowIndex(self.path)
+        index.page()
+        covered = index.covered
+        self.assertEqual(covered, os.path.getsize(self.path))
+
+        self.write([['职位1', '北京', 'b\nc']], mode='a', header=False)
+        page = index.page()
+        self.assertEqual(page['total'], 2)
+        self.assertEqual(index.offsets[2], covered)
+
+        # 索引文件被保存，新的实例直接复用，不需要重新扫描
+        self.assertTrue(os.path.exists(index_path_for(self.path)))
+        reloaded = CsvRowIndex(self.path)
+        reloaded._load()
+        self.assertEqual(list(reloaded.offsets), list(index.offsets))
+        self.assertEqual(reloaded.page()['rows'], page['rows'])
+
+    def test_rewritten_csv_is_detected_by_head_crc(self):
+        self.write([['职位0', '上海', 'a'], ['职位1', '北京', 'b']])
+        index = CsvRowIndex(self.path)
+        self.assertEqual(index.page()['total'], 2)
+
+        # 全量爬取重写 CSV：文件更长，但开头的内容不同
+        rows = [['新职位0', '广州', 'x'], ['新职位1', '杭州', 'y'], ['新职位2', '成都', 'z']]
+        self.write(rows)
+        page = index.page()
+        self.assertEqual(page['total'], 3)
+        self.assertEqual(page['rows'], rows)
+
+    def test_shorter_csv_is_rebuilt(self):
+        self.write([['职位0', '上海', 'a' * 100], ['职位1', '北京', 'b' * 100]])
+        index = CsvRowIndex(self.path)
+        index.page()
+        self.write([['职位2', '广州', 'c']])
+        self.assertEqual(index.page()['rows'], [['职位2', '广州', 'c']])
+
+    def test_missing_csv_and_removed_index(self):
+        index = CsvRowIndex(self.path)
+        self.assertEqual(index.page()['total'], 0)
+        self.write([['职位0', '上海', 'a']])
+        index.page()
+        remove_index(self.path)
+        self.assertFalse(os.path.exists(index_path_for(self.path)))
+        self.assertEqual(CsvRowIndex(self.path).page()['total'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
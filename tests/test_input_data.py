@@ -0,0 +1,139 @@
+# /tests/test_input_data.py
+
+# ==============================================================================
+#  测试 - 增量导入的提取与水位
+# ==============================================================================
+#
+#  说明:
+#  `input_data` 只导入 CSV 中水位之后的完整记录，并把新的字节偏移和文件开头的
+#  校验值记录为水位。此测试覆盖 `extract_delta` 的记录边界、连续两次增量提取、
+#  CSV 重写的检测，以及水位的读取与写入（使用记录 SQL 的假游标，不连接数据库）。
+#
+# ==============================================================================
+
+import csv
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+
+import input_data
+
+
+class FakeCursor(object):
+    """记录执行的 SQL 和参数，`fetchone` 依次返回给定的行。"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((' '.join(sql.split()), params))
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+
+class ExtractDeltaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.csv_path = os.path.join(self.directory, 'qcwy.csv')
+        self.delta_path = os.path.join(self.directory, 'qcwy_delta.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, rows, mode='w'):
+        with open(self.csv_path, mode, newline='', encoding='utf-8-sig' if mode == 'w' else 'utf-8') as f:
+            writer = csv.writer(f)
+            if mode == 'w':
+                writer.writerow(['title', 'description'])
+            writer.writerows(rows)
+
+    def read_delta(self):
+        with open(self.delta_path, newline='', encoding='utf-8-sig') as f:
+            return list(csv.reader(f))
+
+    def test_first_extract_includes_all_complete_records(self):
+        self.write([['数据分析师', '职责:\n1. 清洗\n2. 报表'], ['算法工程师', '熟悉 "Python"']])
+        new_offset, rows = input_data.extract_delta(self.csv_path, self.delta_path, 0)
+        self.assertEqual(rows, 2)
+        self.assertEqual(new_offset, os.path.getsize(self.csv_path))
+        self.assertEqual(self.read_delta(), [['title', 'description'],
+                                             ['数据分析师', '职责:\n1. 清洗\n2. 报表'],
+                                             ['算法工程师', '熟悉 "Python"']])
+
+    def test_second_extract_starts_at_watermark(self):
+        self.write([['职位0', 'a']])
+        offset, _ = input_data.extract_delta(self.csv_path, self.delta_path, 0)
+
+        self.write([['职位1', 'b\nc'], ['职位2', 'd']], mode='a')
+        new_offset, rows = input_data.extract_delta(self.csv_path, self.delta_path, offset)
+        self.assertEqual(rows, 2)
+        self.assertEqual(new_offset, os.path.getsize(self.csv_path))
+        # 增量文件总是带表头，只包含水位之后的记录
+        self.assertEqual(self.read_delta(), [['title', 'description'], ['职位1', 'b\nc'], ['职位2', 'd']])
+
+        _, rows = input_data.extract_delta(self.csv_path, self.delta_path, new_offset)
+        self.assertEqual(rows, 0)
+
+    def test_incomplete_tail_is_left_for_next_time(self):
+        self.write([['职位0', 'a']])
+        complete = os.path.getsize(self.csv_path)
+        with open(self.csv_path, 'ab') as f:
+            f.write('职位1,"尚未写完\r\n的描述'.encode('utf-8'))
+
+        new_offset, rows = input_data.extract_delta(self.csv_path, self.delta_path, 0)
+        self.assertEqual((new_offset, rows), (complete, 1))
+
+    def test_rewrite_detection(self):
+        self.write([['职位0', 'a'], ['职位1', 'b']])
+        offset = os.path.getsize(self.csv_path)
+        head_len = min(input_data.HEAD_BYTES, offset)
+        head_crc = input_data._head_crc(self.csv_path, head_len)
+
+        self.assertFalse(input_data._csv_rewritten(self.csv_path, 0, 0, 0))
+        self.assertFalse(input_data._csv_rewritten(self.csv_path, offset, head_len, head_crc))
+        self.write([['职位2', 'c']], mode='a')
+        self.assertFalse(input_data._csv_rewritten(self.csv_path, offset, head_len, head_crc))
+
+        # 全量爬取重写了 CSV：开头的内容不同
+        self.write([['新职位0', 'x'], ['新职位1', 'y'], ['新职位2', 'z']])
+        self.assertTrue(input_data._csv_rewritten(self.csv_path, offset, head_len, head_crc))
+        # 重写后的文件比水位短
+        self.write([])
+        self.assertTrue(input_data._csv_rewritten(self.csv_path, offset, head_len, head_crc))
+
+
+class WatermarkTest(unittest.TestCase):
+
+    def test_missing_watermark(self):
+        self.assertEqual(input_data.get_watermark(FakeCursor()), (0, 0, 0, 0, 0))
+
+    def test_read_watermark(self):
+        cursor = FakeCursor([(1024, 512, 12345, 3, 2)])
+        self.assertEqual(input_data.get_watermark(cursor), (1024, 512, 12345, 3, 2))
+        sql, params = cursor.executed[0]
+        self.assertIn(f'FROM `{input_data.WATERMARK_TABLE}`', sql)
+        self.assertEqual(params, (input_data.CSV_FILE_NAME,))
+
+    def test_write_watermark_keeps_processed_batch_by_default(self):
+        cursor = FakeCursor()
+        input_data._write_watermark(cursor, 2048, 1024, 999, 4)
+        sql, params = cursor.executed[0]
+        self.assertIn('ON DUPLICATE KEY UPDATE', sql)
+        self.assertIn('processed_batch = COALESCE(%s, processed_batch)', sql)
+        self.assertEqual(params, (input_data.CSV_FILE_NAME, 2048, 1024, 999, 4, None, None))
+
+    def test_write_watermark_with_processed_batch(self):
+        cursor = FakeCursor()
+        input_data._write_watermark(cursor, 2048, 1024, 999, 4, processed_batch=4)
+        self.assertEqual(cursor.executed[0][1], (input_data.CSV_FILE_NAME, 2048, 1024, 999, 4, 4, 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+# /tests/test_keyword_dedup.py
+
+# ==============================================================================
+#  测试 - 跨关键词去重
+# ==============================================================================
+#
+#  说明:
+#  `KeywordDeduplicator` 只放行第一次出现的职位，并记录每条唯一职位被哪些关键词
+#  搜到。此测试覆盖有序数组与缓冲字典的合并、超过 64 个关键词时位掩码的加宽、
+#  断点续爬时的 `seed`，以及关键词记录的保存与加载。
+#
+# ==============================================================================
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'spider'))
+
+from crawl_state import KeywordDeduplicator
+
+
+def fp(n):
+    """第 n 条职位的指纹。"""
+    return f'{n:016x}'
+
+
+class KeywordDeduplicatorTest(unittest.TestCase):
+
+    def test_first_occurrence_is_accepted(self):
+        dedup = KeywordDeduplicator()
+        self.assertTrue(dedup.accept(fp(1), 'Java'))
+        self.assertFalse(dedup.accept(fp(1), '后端开发'))
+        self.assertFalse(dedup.accept(fp(1), 'Java'))
+        self.assertTrue(dedup.accept(fp(2), 'Java'))
+        self.assertEqual(len(dedup), 2)
+        self.assertEqual(dedup.duplicates, 2)
+        self.assertEqual(dedup.keywords_of(1), ['Java', '后端开发'])
+        self.assertEqual(dedup.keywords_of(2), ['Java'])
+        self.assertEqual(dedup.keywords_of(3), [])
+
+    def test_merged_and_pending_entries_behave_the_same(self):
+        # merge_every=3: 一部分职位已合并进有序数组，一部分仍在缓冲字典中
+        dedup = KeywordDeduplicator(merge_every=3)
+        for n in (50, 10, 40, 30, 20):
+            self.assertTrue(dedup.accept(fp(n), 'a'))
+        for n in (10, 20, 30, 40, 50):
+            self.assertFalse(dedup.accept(fp(n), 'b'))
+            self.assertEqual(dedup.keywords_of(n), ['a', 'b'])
+        self.assertEqual(len(dedup), 5)
+        self.assertEqual(dedup.duplicates, 5)
+
+    def test_more_than_64_keywords(self):
+        dedup = KeywordDeduplicator(merge_every=2)
+        keywords = [f'kw{i}' for i in range(130)]
+        dedup.accept(fp(1), keywords[0])
+        dedup.accept(fp(2), keywords[1])
+        dedup.accept(fp(3), keywords[2])
+        # 位掩码加宽之后，已合并职位的关键词保持不变，并能继续添加新的关键词
+        for keyword in keywords[3:]:
+            dedup.accept(fp(1), keyword)
+        self.assertEqual(dedup.keywords_of(1), [keywords[0]] + keywords[3:])
+        self.assertEqual(dedup.keywords_of(2), [keywords[1]])
+        self.assertEqual(dedup.keywords_of(3), [keywords[2]])
+
+    def test_seed_marks_jobs_as_seen_without_keywords(self):
+        dedup = KeywordDeduplicator()
+        dedup.accept(fp(5), 'Java')
+        dedup.seed([3, 5, 7, 3])
+        self.assertEqual(len(dedup), 3)
+        self.assertEqual(dedup.keywords_of(3), [])
+        self.assertEqual(dedup.keywords_of(5), ['Java'])
+        self.assertFalse(dedup.accept(fp(7), 'Python'))
+        self.assertEqual(dedup.keywords_of(7), ['Python'])
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'data', 'qcwy_keywords.csv')
+            dedup = KeywordDeduplicator(merge_every=2)
+            for n, keyword in ((9, 'Java'), (1, 'Python'), (9, '后端开发'), (4, 'Java')):
+                dedup.accept(fp(n), keyword)
+            dedup.save(path)
+
+            with open(path, encoding='utf-8-sig') as f:
+                self.assertEqual(f.read().splitlines(), [
+                    'fingerprint,keywords',
+                    f'{fp(1)},Python',
+                    f'{fp(4)},Java',
+                    f'{fp(9)},Java|后端开发',
+                ])
+
+            # 增量爬取时加载历史记录，新的关键词与历史记录合并
+            loaded = KeywordDeduplicator()
+            loaded.load(path)
+            self.assertEqual(len(loaded), 3)
+            self.assertFalse(loaded.accept(fp(4), '数据'))
+            self.assertEqual(sorted(loaded.keywords_of(4)), ['Java', '数据'])
+            self.assertEqual(sorted(loaded.keywords_of(9)), ['Java', '后端开发'])
+        finally:
+            shutil.rmtree(directory)
+
+    def test_load_missing_file(self):
+        dedup = KeywordDeduplicator()
+        dedup.load(os.path.join(tempfile.gettempdir(), 'no-such-dir', 'qcwy_keywords.csv'))
+        self.assertEqual(len(dedup), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+# /tests/test_keyword_matcher.py
+
+# ==============================================================================
+#  测试 - 多关键词单次扫描匹配
+# ==============================================================================
+#
+#  说明:
+#  `KeywordMatcher.find` 的结果必须与对每个关键词分别做子串判断（原先的 LIKE
+#  '%关键词%'）相同，`count` 的结果必须与逐个关键词统计相同。此测试使用相互
+#  重叠的关键词（一个是另一个的前缀、后缀或子串）和随机文本与逐个判断比较。
+#
+# ==============================================================================
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+
+from keyword_matcher import KeywordMatcher
+
+# 相互重叠的关键词，用于检查失败指针和输出集合的合并
+KEYWORDS = ['he', 'she', 'his', 'hers', '数据', '大数据', '数据库', '据库', 'Java', 'JavaScript', '工程师', '师']
+
+
+def brute_force(keywords, text, ignore_case=True):
+    if ignore_case:
+        return {kw for kw in keywords if kw.lower() in text.lower()}
+    return {kw for kw in keywords if kw in text}
+
+
+def per_keyword_counts(keywords, texts, weights):
+    """逐个关键词统计包含它的文本的权重之和，不含没有出现的关键词。"""
+    counts = {}
+    for kw in keywords:
+        total = sum(w for text, w in zip(texts, weights) if isinstance(text, str) and kw.lower() in text.lower())
+        if total:
+            counts[kw] = total
+    return counts
+
+
+class KeywordMatcherFindTest(unittest.TestCase):
+
+    def test_overlapping_keywords(self):
+        matcher = KeywordMatcher(KEYWORDS)
+        self.assertEqual(matcher.find('ushers'), {'she', 'he', 'hers'})
+        self.assertEqual(matcher.find('大数据库工程师'), {'数据', '大数据', '数据库', '据库', '工程师', '师'})
+        self.assertEqual(matcher.find('前端 JavaScript'), {'Java', 'JavaScript'})
+        self.assertEqual(matcher.find('销售经理'), set())
+
+    def test_matches_substring_checks_on_random_text(self):
+        rng = random.Random(3)
+        alphabet = ['h', 'e', 's', 'r', 'i', '数', '据', '库', '大', 'J', 'a', 'v', 'S', '工', '程', '师', ' ']
+        for ignore_case in (True, False):
+            matcher = KeywordMatcher(KEYWORDS, ignore_case=ignore_case)
+            for _ in range(2000):
+                text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                if ignore_case and rng.random() < 0.5:
+                    text = text.upper()
+                self.assertEqual(matcher.find(text), brute_force(KEYWORDS, text, ignore_case), repr(text))
+
+    def test_case_handling(self):
+        self.assertEqual(KeywordMatcher(['java']).find('JAVA开发'), {'java'})
+        self.assertEqual(KeywordMatcher(['Java'], ignore_case=False).find('JAVA开发'), set())
+        # 返回关键词的原始写法
+        self.assertEqual(KeywordMatcher(['Java']).find('java开发'), {'Java'})
+
+    def test_empty_and_missing_text(self):
+        matcher = KeywordMatcher(KEYWORDS)
+        for text in ('', None, float('nan')):
+            self.assertEqual(matcher.find(text), set())
+
+    def test_duplicate_and_empty_keywords(self):
+        matcher = KeywordMatcher(['数据', '数据', ''])
+        self.assertEqual(matcher.find('数据分析'), {'数据'})
+        self.assertEqual(KeywordMatcher([]).find('数据分析'), set())
+
+
+class KeywordMatcherCountTest(unittest.TestCase):
+
+    def test_each_text_counts_once(self):
+        matcher = KeywordMatcher(['数据'])
+        self.assertEqual(matcher.count(['数据数据', '大数据', 'Java']), {'数据': 2})
+
+    def test_weighted_counts_match_per_keyword_counts(self):
+        rng = random.Random(4)
+        parts = ['大数据', '数据库', 'Java', 'JavaScript', '工程师', '销售', 'hers', '']
+        texts = [''.join(rng.choice(parts) for _ in range(3)) for _ in range(500)] + [None, float('nan')]
+        weights = [rng.randint(1, 9) for _ in texts]
+
+        matcher = KeywordMatcher(KEYWORDS)
+        self.assertEqual(matcher.count(texts, weights), per_keyword_counts(KEYWORDS, texts, weights))
+        self.assertEqual(matcher.count(texts), per_keyword_counts(KEYWORDS, texts, [1] * len(texts)))
+
+    def test_empty_input(self):
+        self.assertEqual(KeywordMatcher(KEYWORDS).count([]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+# /tests/test_normalize.py
+
+# ==============================================================================
+#  测试 - 薪资与工作经验的向量化解析
+# ==============================================================================
+#
+#  说明:
+#  `normalize` 的解析规则必须与原先 `qcwy_clean_salary_and_experience` 中逐行
+#  解析的实现完全一致。此测试保留原先的逐行实现作为参照，对典型写法、边界情况
+#  和随机组合的字符串逐一比较两者的结果。
+#
+# ==============================================================================
+
+import math
+import os
+import random
+import re
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+
+import normalize
+
+
+# --- 原先逐行解析的实现（逻辑与原代码相同） ---
+
+def legacy_salary(salary_str):
+    min_pay, max_pay, ave_pay = None, None, None
+    if salary_str:
+        multiplier = 1
+        if '年' in salary_str:
+            multiplier = 1 / 12  # 年薪转月薪
+        elif '天' in salary_str:
+            multiplier = 30      # 日薪转月薪
+        unit_multiplier = 1
+        if '万' in salary_str:
+            unit_multiplier = 10000
+        elif '千' in salary_str:
+            unit_multiplier = 1000
+
+        numbers = re.findall(r'(\d+\.?\d*)', salary_str)
+        if len(numbers) == 2:
+            min_val = float(numbers[0]) * unit_multiplier * multiplier
+            max_val = float(numbers[1]) * unit_multiplier * multiplier
+            min_pay, max_pay, ave_pay = round(min_val), round(max_val), round((min_val + max_val) / 2)
+        elif len(numbers) == 1:
+            val = float(numbers[0]) * unit_multiplier * multiplier
+            min_pay = max_pay = ave_pay = round(val)
+    return min_pay, max_pay, ave_pay
+
+
+def legacy_experience(exp_str):
+    exp_num_str = None
+    if exp_str:
+        exp_numbers = re.findall(r'\d+', exp_str)
+        if len(exp_numbers) == 2:
+            exp_num_str = str((int(exp_numbers[0]) + int(exp_numbers[1])) // 2)
+        elif len(exp_numbers) == 1:
+            exp_num_str = exp_numbers[0]
+        elif any(kw in exp_str for kw in ['无', '不限', '应届']) or exp_str == '':
+            exp_num_str = '0'
+    return exp_num_str
+
+
+SALARIES = [
+    None, '', '面议', '1.5-2万/月', '15万/年', '200元/天', '8千-1.2万/月', '6-8千/月',
+    '10-20万/年', '1.5千/天', '3000-4500元/月', '0.5元/天', '2.5千', '1-1.5万·13薪',
+    '1.2-1.8万/月\n绩效另计', '12.', '1-2-3万', '万元', '150元/天起', '7k-9k',
+]
+EXPERIENCES = [
+    None, '', '无需经验', '经验不限', '应届生', '1年经验', '3-4年经验', '5-7年经验',
+    '10年以上经验', '在校生/应届生', '1-3-5年', '两年', '无经验\n1年优先', '1年',
+]
+
+
+def random_strings(tokens, count, seed):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(tokens) for _ in range(rng.randint(0, 5))) for _ in range(count)]
+
+
+def same(a, b):
+    """比较两个薪资数值，NaN 与 None 视为相同。"""
+    if a is None or (isinstance(a, float) and math.isnan(a)):
+        return b is None or (isinstance(b, float) and math.isnan(b))
+    return b is not None and float(a) == float(b)
+
+
+class NormalizeSalaryTest(unittest.TestCase):
+
+    def check(self, values):
+        result = normalize.normalize_salary(pd.Series(values, dtype=object))
+        for i, value in enumerate(values):
+            expected = legacy_salary(value)
+            actual = tuple(result.iloc[i][['min_pay', 'max_pay', 'ave_pay']])
+            self.assertTrue(all(same(a, e) for a, e in zip(actual, expected)),
+                            f"{value!r}: {actual} != {expected}")
+
+    def test_matches_legacy_parser(self):
+        self.check(SALARIES)
+
+    def test_matches_legacy_parser_on_random_strings(self):
+        tokens = ['1', '2.5', '0.5', '15', '-', '万', '千', '元', '/月', '/年', '/天', '.', '·', '\n', '薪']
+        self.check(random_strings(tokens, 2000, seed=1))
+
+    def test_keeps_index(self):
+        salary = pd.Series(['1-2万/月', '面议'], index=[10, 20], dtype=object)
+        result = normalize.normalize_salary(salary)
+        self.assertEqual(list(result.index), [10, 20])
+        self.assertEqual(list(result.columns), ['min_pay', 'max_pay', 'ave_pay'])
+        self.assertEqual(list(result.loc[10]), [10000, 20000, 15000])
+        self.assertTrue(result.loc[20].isnull().all())
+
+
+class NormalizeExperienceTest(unittest.TestCase):
+
+    def check(self, values):
+        result = normalize.normalize_experience(pd.Series(values, dtype=object))
+        for i, value in enumerate(values):
+            self.assertEqual(result.iloc[i], legacy_experience(value), repr(value))
+
+    def test_matches_legacy_parser(self):
+        self.check(EXPERIENCES)
+
+    def test_matches_legacy_parser_on_random_strings(self):
+        tokens = ['1', '3', '10', '-', '年', '经验', '无', '不限', '应届', '以上', '\n', '/']
+        self.check(random_strings(tokens, 2000, seed=2))
+
+
+if __name__ == '__main__':
+    unittest.main()
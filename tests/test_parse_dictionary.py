@@ -0,0 +1,108 @@
+# /tests/test_parse_dictionary.py
+
+# ==============================================================================
+#  测试 - 持久化的薪资/经验解析字典
+# ==============================================================================
+#
+#  说明:
+#  预处理步骤只解析字典表中尚未出现的原始字符串，把结果（包括无法解析的字符串）
+#  连同解析规则的版本号写入字典表。此测试用记录 SQL 的假游标代替数据库，
+#  检查查询条件、写入的行、分批写入以及旧版本条目的清除。
+#
+# ==============================================================================
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+
+import analysis_main as A
+import normalize
+import process_data
+
+
+class FakeCursor(object):
+    """记录执行的 SQL，`fetchall` 返回给定的行。"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.inserted = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((' '.join(sql.split()), params))
+
+    def executemany(self, sql, rows):
+        self.inserted.append((' '.join(sql.split()), list(rows)))
+
+    def fetchall(self):
+        return self.rows
+
+
+class ParseDictionaryTest(unittest.TestCase):
+
+    def setUp(self):
+        # 预处理模块在 main() 中才设置全局游标，测试时换成假游标
+        self.cursor = FakeCursor()
+        for patcher in (mock.patch.object(process_data, 'cursor', self.cursor, create=True),
+                        mock.patch.object(A.Analyze, 'job_table', 'qcwy')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def extend(self, rows, table, column, parse, processed_batch=3):
+        self.cursor.rows = [(raw,) for raw in rows]
+        added = process_data._extend_dictionary(table, column, parse, processed_batch)
+        return added, self.cursor
+
+    def test_only_strings_missing_from_dictionary_are_queried(self):
+        A.Analyze.job_table = 'qcwy_build'
+        _, cursor = self.extend([], process_data.SALARY_DICT_TABLE, 'salary', normalize.normalize_salary)
+        sql, params = cursor.executed[0]
+        self.assertIn(f'FROM `qcwy_build` q LEFT JOIN `{process_data.SALARY_DICT_TABLE}` d', sql)
+        self.assertIn('WHERE q.ingest_batch > %s AND d.raw IS NULL', sql)
+        self.assertEqual(params, (3,))
+
+    def test_nothing_new(self):
+        added, cursor = self.extend([], process_data.SALARY_DICT_TABLE, 'salary', normalize.normalize_salary)
+        self.assertEqual(added, 0)
+        self.assertEqual(cursor.inserted, [])
+
+    def test_salary_entries_include_unparseable_strings(self):
+        added, cursor = self.extend(['1-2万/月', '面议'], process_data.SALARY_DICT_TABLE, 'salary',
+                                    normalize.normalize_salary)
+        self.assertEqual(added, 2)
+        sql, rows = cursor.inserted[0]
+        self.assertTrue(sql.startswith(f'INSERT IGNORE INTO `{process_data.SALARY_DICT_TABLE}` '
+                                       f'(raw, min_pay, max_pay, ave_pay, version)'))
+        self.assertEqual(rows, [('1-2万/月', 10000.0, 20000.0, 15000.0, normalize.VERSION),
+                                ('面议', None, None, None, normalize.VERSION)])
+
+    def test_experience_entries(self):
+        _, cursor = self.extend(['3-4年经验', '无需经验', '两年'], process_data.EXPERIENCE_DICT_TABLE,
+                                'experience', normalize.normalize_experience)
+        sql, rows = cursor.inserted[0]
+        self.assertIn('(raw, experience, version)', sql)
+        self.assertEqual(rows, [('3-4年经验', '3', normalize.VERSION),
+                                ('无需经验', '0', normalize.VERSION),
+                                ('两年', None, normalize.VERSION)])
+
+    def test_entries_are_written_in_batches(self):
+        with mock.patch.object(process_data, 'NORM_BATCH_SIZE', 2):
+            added, cursor = self.extend([f'{i}千/月' for i in range(5)], process_data.SALARY_DICT_TABLE,
+                                        'salary', normalize.normalize_salary)
+        self.assertEqual(added, 5)
+        self.assertEqual([len(rows) for _, rows in cursor.inserted], [2, 2, 1])
+
+    def test_stale_versions_are_dropped(self):
+        process_data._create_parse_dictionaries()
+        deletes = [(sql, params) for sql, params in self.cursor.executed if sql.startswith('DELETE')]
+        self.assertEqual(deletes, [
+            (f'DELETE FROM `{process_data.SALARY_DICT_TABLE}` WHERE version <> %s', (normalize.VERSION,)),
+            (f'DELETE FROM `{process_data.EXPERIENCE_DICT_TABLE}` WHERE version <> %s', (normalize.VERSION,)),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
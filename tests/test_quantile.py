@@ -0,0 +1,97 @@
+# /tests/test_quantile.py
+
+# ==============================================================================
+#  测试 - 精确的流式分位数与箱线图统计
+# ==============================================================================
+#
+#  说明:
+#  `QuantileAggregator` 只保存 "取值 -> 次数" 的直方图，`boxplot()` 的结果必须与
+#  原先的做法——把每个职位的薪资展开为列表交给 `pyecharts.Boxplot.prepare_data`——
+#  完全相同。此测试对随机的带权重数据逐组比较，并覆盖去掉最值、分批累加与合并。
+#
+# ==============================================================================
+
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+from pyecharts import Boxplot
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+
+from quantile import QuantileAggregator
+
+
+def expand(values, weights):
+    """把带权重的数据展开为逐个职位的列表，即原先交给 prepare_data 的输入。"""
+    return np.repeat(values, weights).tolist()
+
+
+def legacy_boxplot(data):
+    """原先的计算方式；数据不足时 prepare_data 会跳过该组，此处返回 None。"""
+    result = Boxplot.prepare_data([data])
+    return result[0] if result else None
+
+
+class QuantileAggregatorTest(unittest.TestCase):
+
+    def random_groups(self, seed, count=300):
+        rng = random.Random(seed)
+        for _ in range(count):
+            size = rng.randint(0, 12)
+            # 取值较少，保证有大量重复的薪资
+            values = [rng.choice([3000, 4500, 6000, 8000.5, 10000, 15000, 25000]) for _ in range(size)]
+            weights = [rng.randint(1, 5) for _ in range(size)]
+            yield values, weights
+
+    def test_boxplot_matches_prepare_data(self):
+        for values, weights in self.random_groups(seed=1):
+            box = QuantileAggregator().add(values, weights).boxplot()
+            self.assertEqual(box, legacy_boxplot(expand(values, weights)), (values, weights))
+
+    def test_small_groups(self):
+        for data in ([], [5000], [5000, 6000], [5000, 6000, 7000], [1, 2, 3, 4, 5]):
+            self.assertEqual(QuantileAggregator().add(data).boxplot(), legacy_boxplot(data), data)
+
+    def test_trimmed_boxplot_matches_legacy_f1(self):
+        # 原先的 f1 去掉等于最高和最低薪资的职位后再交给 prepare_data
+        for values, weights in self.random_groups(seed=2):
+            a = np.repeat(values, weights)
+            legacy = a[(a != a.max()) & (a != a.min())].tolist() if a.size > 0 else []
+            box = QuantileAggregator().add(values, weights).trimmed().boxplot()
+            self.assertEqual(box, legacy_boxplot(legacy), (values, weights))
+
+    def test_batches_and_merge_equal_single_pass(self):
+        values = [random.Random(3).randint(1, 50) * 1000 for _ in range(200)]
+        whole = QuantileAggregator().add(values)
+
+        batched = QuantileAggregator()
+        for i in range(0, len(values), 30):
+            batched.add(values[i:i + 30])
+        merged = QuantileAggregator().add(values[:77]).merge(QuantileAggregator().add(values[77:]))
+
+        for aggregator in (batched, merged):
+            self.assertEqual(aggregator.count, whole.count)
+            self.assertEqual(aggregator.boxplot(), whole.boxplot())
+
+    def test_nan_and_zero_weights_are_ignored(self):
+        aggregator = QuantileAggregator().add([1000, float('nan'), 2000, 3000], [1, 5, 0, 2])
+        self.assertEqual(aggregator.count, 3)
+        self.assertEqual([aggregator.nth(i) for i in range(3)], [1000, 3000, 3000])
+
+    def test_nth_and_quantile(self):
+        data = [random.Random(4).randint(0, 20) for _ in range(101)]
+        aggregator = QuantileAggregator().add(data)
+        ordered = sorted(data)
+        for i in (0, 1, 50, 100, -1, -101):
+            self.assertEqual(aggregator.nth(i), ordered[i])
+        with self.assertRaises(IndexError):
+            aggregator.nth(101)
+        for q in (0, 0.1, 0.25, 0.5, 0.9, 1):
+            self.assertAlmostEqual(aggregator.quantile(q), float(np.percentile(data, q * 100)))
+
+
+if __name__ == '__main__':
+    unittest.main()
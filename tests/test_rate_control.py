@@ -0,0 +1,73 @@
+# /tests/test_rate_control.py
+
+# ==============================================================================
+#  测试 - 限速传输层与进度指标
+# ==============================================================================
+#
+#  说明:
+#  `ThrottledTransport` 在请求期间更新共享的进度指标。限速控制器的每主机字段
+#  与进度指标的字段编号不同，此测试确认请求只更新正确的计数器
+#  (在途请求数、重试数)，不会误写页面错误数等其他计数器。
+#
+# ==============================================================================
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'spider'))
+
+from crawl_metrics import CrawlMetrics
+from rate_control import AdaptiveRateController, ThrottledTransport
+
+
+class FakeTransport(object):
+    """依次返回给定的响应，并在每次请求时记录当时的指标快照。"""
+    name = 'fake'
+
+    def __init__(self, metrics, responses):
+        self.metrics = metrics
+        self.responses = list(responses)
+        self.during = []
+
+    def fetch_json(self, url):
+        self.during.append(self.metrics.snapshot())
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+class ThrottledTransportMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = CrawlMetrics()
+        self.controller = AdaptiveRateController(rate=1000, max_rate=1000)
+
+    def test_one_fetch_updates_in_flight_only(self):
+        transport = FakeTransport(self.metrics, [{"data": 1}])
+        ThrottledTransport(transport, self.controller, self.metrics).fetch_json('https://example.com/a')
+
+        during, after = transport.during[0], self.metrics.snapshot()
+        self.assertEqual(during['in_flight'], 1)
+        self.assertEqual(during['page_errors'], 0)
+        self.assertEqual(after['in_flight'], 0)
+        self.assertEqual(after['page_errors'], 0)
+        self.assertEqual(after['requests'], 1)
+
+    def test_retry_updates_retries_only(self):
+        transport = FakeTransport(self.metrics, [{"error": "busy"}, {"data": 1}])
+        ThrottledTransport(transport, self.controller, self.metrics,
+                           backoff_base=0, backoff_cap=0).fetch_json('https://example.com/a')
+
+        after = self.metrics.snapshot()
+        self.assertEqual(after['retries'], 1)
+        self.assertEqual(after['in_flight'], 0)
+        self.assertEqual(after['page_errors'], 0)
+        self.assertEqual(after['tasks_done'], 0)
+        self.assertEqual(after['requests'], 2)
+        self.assertEqual(after['request_errors'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# /tests/test_result_store.py
+
+# ==============================================================================
+#  测试 - 分析结果的版本化快照
+# ==============================================================================
+#
+#  说明:
+#  `ResultStore` 把每次分析的结果写入新的一代快照目录，发布时原子地替换 `CURRENT`，
+#  并清理过旧的代。此测试覆盖快照的写入格式、发布前后的读取、固定读取某一代、
+#  旧代的清理以及格式版本不一致的旧结果。
+#
+# ==============================================================================
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'analysis'))
+
+from result_store import CURRENT, MANIFEST, SCHEMA_VERSION, ResultStore
+
+
+class ResultStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = ResultStore(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_create_writes_one_file_per_chart(self):
+        generation = self.store.create({
+            'chart.3.2': ['数据分析师'], 'chart.3.1': ['上海', '北京'],
+            'chart.10.1': [1], 'chart.10.3': [3],  # 缺少序号 2，序号 3 不会被读取
+        })
+        path = self.store.generation_path(generation)
+        with open(os.path.join(path, '3.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {'schema': SCHEMA_VERSION, 'chart': '3',
+                                            'params': [['上海', '北京'], ['数据分析师']]})
+        with open(os.path.join(path, '10.json'), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['params'], [[1]])
+        with open(os.path.join(path, MANIFEST), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['charts'], ['3', '10'])
+
+    def test_numpy_values_are_converted(self):
+        generation = self.store.create({'chart.1.1': np.array([1.5, 2.5]), 'chart.1.2': np.int64(7)})
+        self.assertEqual(ResultStore(self.directory, generation).read(1), [[1.5, 2.5], 7])
+
+    def test_nothing_is_visible_before_publish(self):
+        self.assertIsNone(self.store.version())
+        generation = self.store.create({'chart.4.1': ['上海']})
+        self.assertIsNone(self.store.current())
+        with self.assertRaises(FileNotFoundError):
+            self.store.read(4)
+
+        self.store.publish(generation)
+        self.assertEqual(self.store.current(), generation)
+        self.assertEqual(self.store.version()[1], generation)
+        self.assertEqual(self.store.read(4), [['上海']])
+        self.assertEqual(self.store.read(5), [])  # 该快照中没有此图表
+
+    def test_publish_switches_readers_to_new_generation(self):
+        old = self.store.create({'chart.4.1': ['旧']})
+        self.store.publish(old)
+        pinned = ResultStore(self.directory, old)
+        new = self.store.create({'chart.4.1': ['新']})
+        self.store.publish(new)
+
+        self.assertEqual(self.store.read(4), [['新']])
+        self.assertNotEqual(self.store.version()[1], old)
+        # 正在读取旧快照的请求仍能读到完整的旧数据
+        self.assertEqual(pinned.read(4), [['旧']])
+        self.assertFalse([name for name in os.listdir(self.directory) if name.endswith('.tmp')])
+
+    def test_prune_keeps_recent_generations_and_current(self):
+        generations = [self.store.create({'chart.4.1': [i]}) for i in range(5)]
+        self.assertEqual(len(set(generations)), 5)
+        self.store.publish(generations[0])
+        # 当前快照即使较旧也不会被删除
+        remaining = sorted(name for name in os.listdir(self.directory) if name != CURRENT)
+        self.assertEqual(remaining, sorted([generations[0]] + generations[2:]))
+
+        self.store.publish(generations[4])
+        remaining = sorted(name for name in os.listdir(self.directory) if name != CURRENT)
+        self.assertEqual(remaining, generations[2:])
+
+    def test_outdated_schema_is_treated_as_missing(self):
+        generation = self.store.create({'chart.4.1': ['上海']})
+        self.store.publish(generation)
+        manifest = os.path.join(self.store.generation_path(generation), MANIFEST)
+        with open(manifest, 'w', encoding='utf-8') as f:
+            json.dump({'schema': SCHEMA_VERSION - 1, 'charts': ['4']}, f)
+        with self.assertRaises(FileNotFoundError):
+            self.store.read(4)
+
+    def test_incomplete_generation_is_rejected(self):
+        generation = self.store.create({'chart.4.1': ['上海']})
+        os.remove(os.path.join(self.store.generation_path(generation), MANIFEST))
+        with self.assertRaises(FileNotFoundError):
+            ResultStore(self.directory, generation).read(4)
+
+
+if __name__ == '__main__':
+    unittest.main()
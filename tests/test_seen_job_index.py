@@ -0,0 +1,74 @@
+# /tests/test_seen_job_index.py
+
+# ==============================================================================
+#  测试 - 已见职位索引
+# ==============================================================================
+#
+#  说明:
+#  `SeenJobIndex` 把职位指纹以 64 位整数追加写入索引文件，加载后以有序数组查询。
+#  此测试覆盖追加与加载、重复指纹、末尾不完整的记录以及重置。
+#
+# ==============================================================================
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'spider'))
+
+from crawl_state import SeenJobIndex, fingerprint_to_int
+
+
+class SeenJobIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'data', 'seen_jobs.idx')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_missing_file_loads_empty(self):
+        index = SeenJobIndex.load(self.path)
+        self.assertEqual(len(index), 0)
+        self.assertNotIn('00000000000000ff', index)
+
+    def test_append_then_load(self):
+        SeenJobIndex.append(self.path, ['00000000000000ff', 'ffffffffffffffff'])
+        SeenJobIndex.append(self.path, ['0000000000000001', '00000000000000ff'])
+
+        index = SeenJobIndex.load(self.path)
+        # 重复追加的指纹只保留一份，数组保持有序，供二分查找使用
+        self.assertEqual(list(index), [1, 0xff, 0xffffffffffffffff])
+        self.assertIn('ffffffffffffffff', index)
+        self.assertIn('0000000000000001', index)
+        self.assertNotIn('0000000000000002', index)
+
+    def test_append_nothing_does_not_create_file(self):
+        SeenJobIndex.append(self.path, [])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_truncated_record_is_ignored(self):
+        SeenJobIndex.append(self.path, ['00000000000000aa', '00000000000000bb'])
+        # 模拟写入过程中进程被终止，文件末尾只写了半条记录
+        with open(self.path, 'ab') as f:
+            f.write(b'\x01\x02\x03')
+
+        index = SeenJobIndex.load(self.path)
+        self.assertEqual(list(index), [0xaa, 0xbb])
+
+    def test_reset_removes_file(self):
+        SeenJobIndex.append(self.path, ['00000000000000aa'])
+        SeenJobIndex.reset(self.path)
+        self.assertFalse(os.path.exists(self.path))
+        SeenJobIndex.reset(self.path)  # 文件不存在时什么也不做
+
+    def test_fingerprint_to_int(self):
+        self.assertEqual(fingerprint_to_int('ffffffffffffffff'), 2 ** 64 - 1)
+        self.assertEqual(fingerprint_to_int('0000000000000010'), 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+# /wsgi.py
+
+# ==============================================================================
+#  生产环境入口 - 多进程 WSGI 服务
+# ==============================================================================
+#
+#  说明:
+#  `python server.py` 使用单进程的 Werkzeug 开发服务器，爬虫和数据分析也在同一个
+#  进程的线程中运行。生产环境使用此文件，由 WSGI 服务器以多个进程处理请求，
+#  图表和接口请求可以利用多个 CPU 核心；长时间运行的任务交给独立的任务进程。
+#
+#  部署步骤:
+#  1. 启动任务进程（只需一个）:  python jobs.py
+#  2. 启动 Web 服务:
+#     - Linux:   gunicorn -w 4 -b 0.0.0.0:80 wsgi:app
+#     - Windows: python wsgi.py   （使用 waitress，单进程多线程）
+#  Web 进程只把任务放入任务进程的队列，不再自己执行爬虫和数据分析。
+#
+# ==============================================================================
+
+import os
+
+from server import app
+
+# 后台任务交给任务进程 jobs.py 执行
+app.config['JOB_BACKEND'] = 'queue'
+
+
+# --- waitress 启动入口 ---
+if __name__ == '__main__':
+    try:
+        from waitress import serve
+    except ImportError:
+        print("未安装 waitress，请执行 pip install waitress；Linux 上也可以使用 gunicorn -w 4 -b 0.0.0.0:80 wsgi:app")
+        raise SystemExit(1)
+    serve(app, host='0.0.0.0', port=int(os.environ.get('PORT', 80)), threads=int(os.environ.get('THREADS', 8)))